@@ -0,0 +1,6 @@
+"""python -m androidToolbox：无界面模式入口，参数见 androidToolbox.cli"""
+import sys
+
+from androidToolbox.cli import main
+
+sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+无界面模式：不导入任何 GUI 模块，在后台运行 LogcatService / NetworkService / MonitorService，
+以 JSON Lines（每行一个 JSON 对象）输出到标准输出或文件，适合在测试机房的主机上批量运行。
+
+    python -m androidToolbox --logcat --monitor 5 --network 3 --output farm.jsonl
+    python main.py --headless --all --agent 10 --duration 600
+
+每条记录都带 type、serial、ts 字段；启动时先输出一条 type=startup 的记录，
+包含导入、初始化、首次拿到设备列表的耗时（毫秒），可配合 --*-budget 参数做启动耗时检查。
+"""
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from androidToolbox.core.adb import ADBManager
+
+_IMPORTED = time.perf_counter()
+
+# 等待首次设备列表的最长时间（秒）
+DEVICE_SYNC_TIMEOUT = 5
+# 检查 logcat 是否需要在设备重连后续读的间隔（秒）
+WATCH_INTERVAL = 1
+# 无界面模式下每台设备的日志存储只用于续读去重，预算很小
+LOGCAT_MEMORY_BUDGET = 4 * 1024 * 1024
+# 预算超标时的退出码
+EXIT_OVER_BUDGET = 3
+
+
+class JsonLinesWriter:
+    """线程安全的 JSON Lines 输出，每条记录一行，写完即刷新"""
+
+    def __init__(self, out):
+        self._out = out
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        text = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                       for record in records)
+        with self._lock:
+            self._out.write(text)
+            self._out.flush()
+            self.records += len(records)
+
+
+class DeviceSink:
+    """
+    某台设备的输出：接口与 SessionRecorder 一致（record / record_many），
+    可直接挂到 LogcatService.recorder 上，logcat 行在解析线程中直接写出
+    """
+
+    def __init__(self, writer, serial):
+        self.writer = writer
+        self.serial = serial
+
+    def record(self, stream, payload, ts=None):
+        self.record_many(stream, [payload], ts)
+
+    def record_many(self, stream, payloads, ts=None):
+        ts = time.time() if ts is None else ts
+        if stream == "logcat":
+            payloads = ({"line": line.decode('utf-8', errors='replace').rstrip("\r\n")} for line in payloads)
+        head = {"type": stream, "serial": self.serial, "ts": round(ts, 3)}
+        self.writer.write_many([{**head, **payload} for payload in payloads])
+
+
+class HeadlessRunner:
+    """按设备启动各项采集，输出统一经过 JsonLinesWriter"""
+
+    def __init__(self, args, writer):
+        self.args = args
+        self.writer = writer
+        # 周期采集用的调度器（asyncio 导入较慢），只在需要 --monitor / --network 时创建
+        self.scheduler = None
+        self.stop_event = threading.Event()
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    # ============ 设备 ============
+
+    def start(self, serials):
+        if self.args.monitor or self.args.network:
+            from androidToolbox.core.scheduler import ProbeScheduler
+            self.scheduler = ProbeScheduler().start()
+        for serial in serials:
+            self.attach(serial)
+        ADBManager.device_registry().subscribe(self._on_device_event, replay=False)
+
+    def _on_device_event(self, event):
+        self.writer.write({"type": "device", "serial": event.serial, "ts": round(time.time(), 3),
+                           "event": event.kind, "state": event.state})
+        if self.args.all and event.online:
+            self.attach(event.serial)
+
+    def attach(self, serial):
+        """为设备启动采集（已启动的忽略）"""
+        with self._lock:
+            if serial in self.devices or self.stop_event.is_set():
+                return
+            self.devices[serial] = device = {"sink": DeviceSink(self.writer, serial)}
+        args, sink = self.args, device["sink"]
+
+        if args.logcat:
+            from androidToolbox.services.logcat_filter import LogcatFilter
+            from androidToolbox.services.logcat_service import LogcatService
+            service = LogcatService(serial, memory_budget=LOGCAT_MEMORY_BUDGET, indexed=False)
+            service.recorder = sink
+            log_filter = LogcatFilter.parse(args.logcat_filter) if args.logcat_filter else None
+            device["logcat"] = service
+            # 打不开时由 run() 在设备在线期间继续重试；设备缓存默认不清空，机房设备上可能还有其他采集在读
+            self._start(sink, "logcat", service.start_capture, log_filter=log_filter,
+                        clear_device=args.logcat_clear)
+
+        if args.monitor:
+            from androidToolbox.services.monitor_service import MonitorService
+
+            def on_monitor(sample, error):
+                if error is not None:
+                    sink.record("error", {"source": "monitor", "error": str(error)})
+                elif sample is not None:
+                    sink.record("monitor", {"resources": sample["resources"], "metrics": sample["metrics"]})
+                    sink.record("network", sample["network"])
+
+            self.scheduler.add(f"monitor:{serial}", lambda: self._when_online(serial, MonitorService.sample),
+                               args.monitor, on_monitor, deadline=max(5, args.monitor * 2))
+
+        if args.network:
+            from androidToolbox.services.network_service import NetworkService
+
+            def on_network(status, error):
+                if error is not None:
+                    sink.record("error", {"source": "network", "error": str(error)})
+                elif status:
+                    sink.record("network", status)
+
+            self.scheduler.add(f"network:{serial}",
+                               lambda: self._when_online(serial, NetworkService.analyze_network_status),
+                               args.network, on_network, deadline=max(5, args.network * 2))
+
+        if args.agent:
+            from androidToolbox.services.monitor_agent import MonitorAgent
+            device["agent"] = MonitorAgent(serial, args.agent, on_sample=lambda sample: sink.record(
+                "agent", {"metrics": sample["metrics"], "load": sample["load"]}, sample["ts"]))
+            self._start(sink, "agent", device["agent"].start)
+
+    @staticmethod
+    def _start(sink, source, start, **kwargs):
+        """启动 adb 流；打不开（OSError）时输出一条 error 记录，不让异常结束整个运行"""
+        try:
+            start(**kwargs)
+        except OSError as e:
+            sink.record("error", {"source": source, "error": str(e)})
+
+    @staticmethod
+    def _online(serial):
+        return ADBManager.device_registry().is_online(serial)
+
+    @classmethod
+    def _when_online(cls, serial, probe):
+        """调度器线程：设备在线时执行 probe(serial)，否则返回 None（回调据此跳过本轮）"""
+        return probe(serial) if cls._online(serial) else None
+
+    # ============ 运行 ============
+
+    def run(self, duration=None):
+        """阻塞运行直到 stop() 或 duration 秒后；期间负责设备重连后的续读"""
+        deadline = None if duration is None else time.monotonic() + duration
+        while not self.stop_event.wait(WATCH_INTERVAL):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            with self._lock:
+                devices = list(self.devices.items())
+            for serial, device in devices:
+                if not self._online(serial):
+                    continue
+                service = device.get("logcat")
+                if service is not None and not service.is_running():
+                    self._start(device["sink"], "logcat", service.start_capture,
+                                log_filter=service.log_filter, resume=True)
+                agent = device.get("agent")
+                if agent is not None and not agent.running:
+                    self._start(device["sink"], "agent", agent.start)
+        self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        with self._lock:
+            devices = list(self.devices.values())
+        for device in devices:
+            if "logcat" in device:
+                device["logcat"].close()
+            if "agent" in device:
+                device["agent"].stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m androidToolbox",
+                                     description="Android Toolbox 无界面模式，以 JSON Lines 输出采集数据")
+    parser.add_argument("-s", "--serial", action="append", default=[], help="目标设备，可重复指定")
+    parser.add_argument("--all", action="store_true", help="采集全部在线设备，并自动接入之后连上的设备")
+    parser.add_argument("--adb", help="adb 路径（默认按界面模式的规则检测）")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    parser.add_argument("--logcat", action="store_true", help="转发 logcat")
+    parser.add_argument("--logcat-filter", default="", help="logcat 过滤条件（语法同界面的过滤框）")
+    parser.add_argument("--logcat-clear", action="store_true",
+                        help="开始转发前清空设备的 logcat 缓存（默认保留，从缓存中现有的日志开始输出）")
+    parser.add_argument("--monitor", type=float, metavar="SECS", help="每 SECS 秒采集一次资源与网络状态")
+    parser.add_argument("--network", type=float, metavar="SECS", help="每 SECS 秒采集一次网络状态")
+    parser.add_argument("--agent", type=float, metavar="HZ", help="启动设备端采样代理，按 HZ 频率输出")
+    parser.add_argument("--metrics-dump", metavar="FILE", help="定期把 adb 命令耗时统计追加到 FILE")
+    parser.add_argument("--metrics-interval", type=float, default=60, metavar="SECS",
+                        help="命令统计的写入间隔，默认 60 秒")
+    parser.add_argument("--duration", type=float, metavar="SECS", help="运行 SECS 秒后退出")
+    parser.add_argument("--import-budget", type=float, metavar="MS", help="导入耗时预算（毫秒）")
+    parser.add_argument("--startup-budget", type=float, metavar="MS",
+                        help="启动耗时预算（毫秒，从导入开始到拿到设备列表）")
+    parser.add_argument("--strict-budgets", action="store_true", help=f"超出预算时以退出码 {EXIT_OVER_BUDGET} 退出")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not (args.logcat or args.monitor or args.network or args.agent):
+        args.monitor = 5
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'a', encoding='utf-8')
+    writer = JsonLinesWriter(out)
+
+    init_started = time.perf_counter()
+    adb_source = ADBManager.init(args.adb)
+    registry = ADBManager.device_registry()
+    initialized = time.perf_counter()
+    synced = registry.wait_synced(DEVICE_SYNC_TIMEOUT)
+    contacted = time.perf_counter()
+
+    startup = {
+        "type": "startup", "ts": round(time.time(), 3), "adb": adb_source,
+        "import_ms": round((_IMPORTED - _STARTED) * 1000, 1),
+        "init_ms": round((initialized - init_started) * 1000, 1),
+        "first_device_ms": round((contacted - initialized) * 1000, 1) if synced else None,
+        "startup_ms": round((contacted - _STARTED) * 1000, 1),
+        "devices": registry.devices(),
+    }
+    over = []
+    if args.import_budget is not None and startup["import_ms"] > args.import_budget:
+        over.append("import")
+    if args.startup_budget is not None and (not synced or startup["startup_ms"] > args.startup_budget):
+        over.append("startup")
+    startup["over_budget"] = over
+    writer.write(startup)
+    if over and args.strict_budgets:
+        return EXIT_OVER_BUDGET
+
+    serials = list(dict.fromkeys(args.serial))
+    if not serials:
+        online = registry.online()
+        serials = online if args.all else online[:1]
+    if not serials and not args.all:
+        writer.write({"type": "error", "serial": None, "ts": round(time.time(), 3), "error": "没有在线设备"})
+        return 1
+
+    runner = HeadlessRunner(args, writer)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: runner.stop_event.set())
+    if args.metrics_dump:
+        ADBManager.start_metrics_dump(args.metrics_dump, args.metrics_interval)
+    runner.start(serials)
+    try:
+        runner.run(args.duration)
+    finally:
+        ADBManager.metrics.stop_dump()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
 """Android Toolbox Core - ADB 管理模块"""
 
 from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.adb_client import AdbClient, AdbProtocolError
+from androidToolbox.core.cache import TTLCache
+from androidToolbox.core.devices import DeviceEvent, DeviceRegistry, OnlineDevices
+from androidToolbox.core.metrics import CommandMetrics
+from androidToolbox.core.probe import ProbeBundle
+from androidToolbox.core.trace import StartupTrace
 
-__all__ = ["ADBManager"]
+__all__ = ["ADBManager", "AdbClient", "AdbProtocolError", "CommandMetrics", "DeviceEvent", "DeviceRegistry", "OnlineDevices", "ProbeBundle", "StartupTrace", "TTLCache"]
@@ -1,14 +1,59 @@
 import os
+import shlex
 import subprocess
 import threading
+import time
+
+from androidToolbox.core.adb_client import AdbClient, AdbProtocolError
+from androidToolbox.core.cache import MISSING, TTLCache
+from androidToolbox.core.devices import DeviceEvent, DeviceRegistry
+from androidToolbox.core.metrics import CommandMetrics, command_family
+from androidToolbox.core.pool import PoolExhausted, TransportPool
+from androidToolbox.core.shell_session import ShellSession, ShellSessionError, ShellSessionTimeout
+from androidToolbox.core.stream import AdbStream
 
 class ADBManager:
     # 自动检测当前目录下是否有 adb，没有则尝试系统变量
     _ADB_PATH = "adb"
-    
+    # 优先直接通过 socket 与本机 adb server 通信（server 未运行时自动回退）
+    use_socket = True
+    _client = AdbClient()
+    # "shell ..." 命令是否走常驻 shell 会话（失败时自动回退到一次性进程）
+    use_session = True
+    # 会话启动失败后的冷却时间（秒），避免设备离线时每次调用都白白多启动一个进程
+    SESSION_RETRY_INTERVAL = 10
+    # 借用会话的最长等待时间（秒），超时后改走一次性执行
+    SESSION_BORROW_TIMEOUT = 1
+    _session_retry_at = {}
+    _session_lock = threading.Lock()
+    _pool = None
+    _registry = None
+    # 二进制 logcat 模式下单次读取的块大小
+    LOGCAT_CHUNK_SIZE = 64 * 1024
+    # 幂等查询的结果缓存：(命令前缀, 有效期秒)，按顺序匹配，未列出的命令（如 logcat、ping）不缓存
+    CACHE_TTLS = (
+        ("devices", 1),
+        ("shell getprop", 300),
+        ("shell df", 30),
+        ("shell dumpsys telephony.registry", 2),
+        ("shell dumpsys wifi", 2),
+        ("shell cat /proc/meminfo", 1),
+    )
+    use_cache = True
+    cache = TTLCache(max_entries=256)
+    # 实际发往设备的命令（未命中缓存的 run() 与 run_script()）按类别统计耗时、错误与输出大小
+    metrics = CommandMetrics()
+
     @classmethod
-    def init(cls):
-        """初始化：检测 ADB 路径"""
+    def init(cls, adb_path=None):
+        """初始化：检测 ADB 路径（adb_path 或环境变量 ANDROIDTOOLBOX_ADB 可显式指定，如模拟 adb）"""
+        # 路径可能变化，旧路径启动的会话与缓存的结果不再复用
+        cls.close_sessions()
+        cls.cache.invalidate()
+        adb_path = adb_path or os.environ.get("ANDROIDTOOLBOX_ADB")
+        if adb_path:
+            cls._ADB_PATH = adb_path
+            return "Custom (指定路径)"
         # 获取 main.py 所在的根目录
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         # 假设 adb 在 assets 目录下，或者项目根目录下
@@ -23,19 +68,154 @@ class ADBManager:
         if os.path.exists(root_adb):
             cls._ADB_PATH = root_adb
             return "Root Path (根目录)"
-            
+
+        cls._ADB_PATH = "adb"
         return "System Path (环境变量)"
 
     @classmethod
-    def run(cls, cmd, timeout=5):
-        """执行简单的 ADB 命令并返回字符串结果"""
+    def run(cls, cmd, timeout=5, serial=None, ttl=None):
+        """
+        执行简单的 ADB 命令并返回字符串结果。
+        CACHE_TTLS 中的幂等查询在有效期内直接返回缓存，多处同时发起的相同查询只执行一次；
+        ttl 可覆盖默认有效期，0 表示不使用缓存
+        """
+        if ttl is None:
+            ttl = cls.cache_ttl(cmd)
+        if cls.use_cache and ttl > 0:
+            return cls.cache.get_or_load((serial, cmd), lambda: cls._run_direct(cmd, timeout, serial),
+                                         ttl, cls._cacheable)
+        return cls._run_direct(cmd, timeout, serial)
+
+    @classmethod
+    def _run_direct(cls, cmd, timeout=5, serial=None):
+        return cls.metrics.measure(command_family(cmd), lambda: cls._execute(cmd, timeout, serial))
+
+    @classmethod
+    def _execute(cls, cmd, timeout=5, serial=None):
+        if cls.use_session and cmd.startswith("shell "):
+            result = cls._run_session(cmd[len("shell "):], timeout, serial)
+            if result is not None:
+                return result
+        if cls.use_socket:
+            result = cls._run_socket(cmd, timeout, serial)
+            if result is not None:
+                return result
+        return cls._run_once(cmd, timeout, serial)
+
+    @classmethod
+    def cache_ttl(cls, cmd):
+        """命令的默认缓存有效期（秒），不可缓存时为 0"""
+        for prefix, ttl in cls.CACHE_TTLS:
+            if cmd == prefix or cmd.startswith(prefix + " "):
+                return ttl
+        return 0
+
+    @classmethod
+    def cached(cls, cmd, serial=None):
+        """取命令未过期的缓存结果，没有时返回 MISSING（供合并执行的探针逐条复用）"""
+        if not cls.use_cache or cls.cache_ttl(cmd) <= 0:
+            return MISSING
+        return cls.cache.get((serial, cmd))
+
+    @classmethod
+    def remember(cls, cmd, result, serial=None):
+        """把其他途径拿到的命令结果按默认有效期写入缓存"""
+        ttl = cls.cache_ttl(cmd)
+        if cls.use_cache and ttl > 0 and cls._cacheable(result):
+            cls.cache.put((serial, cmd), result, ttl)
+
+    @staticmethod
+    def _cacheable(result):
+        # 出错或空结果（设备不在线、超时）不缓存，下次照常重试
+        return bool(result) and not result.startswith("Error:")
+
+    @classmethod
+    def diagnostics(cls):
+        """诊断快照：各类命令的耗时统计与结果缓存的命中情况"""
+        return {"commands": cls.metrics.snapshot(), "cache": cls.cache.stats()}
+
+    @classmethod
+    def start_metrics_dump(cls, path, interval=60):
+        """每 interval 秒把命令统计（附带缓存统计）以 JSON Lines 追加到 path，stop 用 metrics.stop_dump()"""
+        cls.metrics.start_dump(path, interval, extra=lambda: {"cache": cls.cache.stats()})
+
+    @classmethod
+    def invalidate_cache(cls, serial=None):
+        """丢弃某设备（不传时为全部）的缓存结果；未指定设备的查询指向默认设备，一并丢弃"""
+        if serial is None:
+            return cls.cache.invalidate()
+        return cls.cache.invalidate(lambda key: key[0] in (serial, None))
+
+    @classmethod
+    def run_script(cls, script, timeout=5, serial=None):
+        """
+        在设备端 sh 中执行一段脚本（可含换行、管道、引号）并返回输出。
+        与 run("shell ...") 不同，脚本不会经过本机 shell 解析，回退到进程方式时作为单个参数传给 adb。
+        """
+        return cls.metrics.measure("script", lambda: cls._execute_script(script, timeout, serial))
+
+    @classmethod
+    def _execute_script(cls, script, timeout=5, serial=None):
+        if cls.use_session:
+            result = cls._run_session(script, timeout, serial)
+            if result is not None:
+                return result
+        if cls.use_socket:
+            try:
+                return cls._client.shell(script, serial, timeout).strip()
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass
+            except AdbProtocolError:
+                return ""
+            except Exception as e:
+                return f"Error: {str(e)}"
+        argv = [cls._ADB_PATH] + (["-s", serial] if serial else []) + ["shell", script]
+        try:
+            startupinfo = None
+            if os.name == 'nt':
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            result = subprocess.run(
+                argv,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='ignore',
+                timeout=timeout,
+                startupinfo=startupinfo
+            )
+            return result.stdout.strip()
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    @classmethod
+    def _run_session(cls, command, timeout, serial):
+        """在池中的常驻会话上执行；会话不可用时返回 None，由调用方回退"""
+        try:
+            with cls.pool().borrow(serial, cls.SESSION_BORROW_TIMEOUT) as session:
+                return session.execute(command, timeout)
+        except ShellSessionTimeout as e:
+            cls._mark_session_failed(serial)
+            return f"Error: {str(e)}"
+        except ShellSessionError:
+            # 会话无法建立或中途失效：回退到一次性执行
+            cls._mark_session_failed(serial)
+        except PoolExhausted:
+            pass
+        return None
+
+    @classmethod
+    def _run_once(cls, cmd, timeout=5, serial=None):
+        """一次性执行：每条命令启动一个 adb 进程（兜底路径）"""
         try:
             startupinfo = None
             if os.name == 'nt':
                 startupinfo = subprocess.STARTUPINFO()
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             
-            full_cmd = f'"{cls._ADB_PATH}" {cmd}'
+            target = f' -s {serial}' if serial else ''
+            full_cmd = f'"{cls._ADB_PATH}"{target} {cmd}'
             result = subprocess.run(
                 full_cmd,
                 stdout=subprocess.PIPE,
@@ -52,9 +232,111 @@ class ADBManager:
             return f"Error: {str(e)}"
 
     @classmethod
-    def stream_logcat(cls, filter_str, stop_event, data_queue):
-        """流式执行 Logcat (运行在子线程)"""
-        full_cmd = f'"{cls._ADB_PATH}" logcat -v time'
+    def _run_socket(cls, cmd, timeout=5, serial=None):
+        """
+        通过 adb server 协议执行命令；命令不支持或 server 不可达时返回 None，
+        由调用方回退到进程方式（进程方式会顺带拉起 adb server）。
+        """
+        try:
+            if cmd == "devices":
+                return cls._client.devices_text()
+            if cmd.startswith("shell "):
+                return cls._client.shell(cmd[len("shell "):], serial, timeout).strip()
+            if cmd.startswith("exec-out "):
+                data = cls._client.exec_out(cmd[len("exec-out "):], serial, timeout)
+                return data.decode('utf-8', errors='ignore').strip()
+            if cmd.startswith("logcat "):
+                return cls._client.shell(cmd, serial, timeout).strip()
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None
+        except AdbProtocolError:
+            # 如 "device not found"：与进程方式一致，stdout 为空
+            return ""
+        except Exception as e:
+            return f"Error: {str(e)}"
+        return None
+
+    @classmethod
+    def pool(cls):
+        """各服务共享的按设备划分的会话池"""
+        with cls._session_lock:
+            if cls._pool is None:
+                cls._pool = TransportPool(cls._open_session)
+            return cls._pool
+
+    @classmethod
+    def borrow(cls, serial=None, timeout=None):
+        """借用指定设备的常驻会话，用于需要在同一通道上连续执行多条命令的场景"""
+        return cls.pool().borrow(serial, cls.SESSION_BORROW_TIMEOUT if timeout is None else timeout)
+
+    @classmethod
+    def device_registry(cls):
+        """
+        全局设备注册表（首次调用时启动）：基于 host:track-devices 推送设备接入 / 断开 / 状态变化，
+        各服务与界面通过 subscribe() 订阅，不再各自轮询 adb devices
+        """
+        with cls._session_lock:
+            if cls._registry is None:
+                cls._registry = DeviceRegistry(
+                    cls._client,
+                    start_server=lambda: cls._run_once("start-server", timeout=10),
+                    poll=lambda: AdbClient.parse_devices(cls._run_once("devices")))
+                cls._registry.subscribe(cls._on_device_event, replay=False)
+                cls._registry.start()
+            return cls._registry
+
+    @classmethod
+    def _on_device_event(cls, event):
+        """设备接入、断开或状态变化时丢弃其缓存结果；断开或变为不可用时，池中该设备的常驻会话随之失效"""
+        cls.invalidate_cache(event.serial)
+        if event.kind != DeviceEvent.CONNECTED and not event.online:
+            cls.close_sessions(event.serial)
+
+    @classmethod
+    def _open_session(cls, serial=None):
+        """池的通道工厂：冷却期内直接失败，避免设备离线时反复启动"""
+        with cls._session_lock:
+            if time.monotonic() < cls._session_retry_at.get(serial, 0):
+                raise ShellSessionError("会话处于冷却期")
+        client = cls._client if cls.use_socket else None
+        return ShellSession(cls._ADB_PATH, serial, client).start()
+
+    @classmethod
+    def _mark_session_failed(cls, serial):
+        with cls._session_lock:
+            cls._session_retry_at[serial] = time.monotonic() + cls.SESSION_RETRY_INTERVAL
+
+    @classmethod
+    def close_sessions(cls, serial=None):
+        """关闭常驻会话：指定 serial 时只关闭该设备（设备断开），否则全部关闭（退出或切换 ADB 路径）"""
+        with cls._session_lock:
+            pool = cls._pool
+            if serial is None:
+                cls._session_retry_at.clear()
+            else:
+                cls._session_retry_at.pop(serial, None)
+        if pool is None:
+            return
+        if serial is None:
+            pool.close_all()
+        else:
+            pool.close_device(serial)
+
+    @classmethod
+    def stream_logcat(cls, filter_str, stop_event, data_queue, serial=None, binary=False):
+        """
+        流式执行 Logcat (运行在子线程)
+        binary=True 时以大块字节读取，按行切分后整批放入队列（每项为 list[bytes]），
+        不做任何解码，适合高频日志；否则逐行放入解码后的字符串。
+        """
+        if binary:
+            cls._stream_logcat_binary(filter_str, stop_event, data_queue, serial)
+            return
+        if cls.use_socket and cls._stream_logcat_socket(filter_str, stop_event, data_queue, serial):
+            return
+
+        target = f' -s {serial}' if serial else ''
+        full_cmd = f'"{cls._ADB_PATH}"{target} logcat -v time'
         process = None
         try:
             startupinfo = None
@@ -84,4 +366,88 @@ class ADBManager:
             pass
         finally:
             if process:
-                process.terminate()
\ No newline at end of file
+                process.terminate()
+
+    @classmethod
+    def _stream_logcat_socket(cls, filter_str, stop_event, data_queue, serial=None):
+        """通过 adb server 的 shell: 服务读取 logcat；无法建立连接时返回 False"""
+        try:
+            sock = cls._client.open_service("shell:logcat -v time", serial)
+        except (OSError, AdbProtocolError):
+            return False
+
+        try:
+            sock.settimeout(None)
+            reader = sock.makefile('rb')
+            while not stop_event.is_set():
+                raw = reader.readline()
+                if not raw:
+                    break
+                line = raw.decode('utf-8', errors='ignore').replace("\r\n", "\n")
+                if filter_str and filter_str not in line:
+                    continue
+                data_queue.put(line)
+        except Exception:
+            pass
+        finally:
+            sock.close()
+        return True
+
+    @classmethod
+    def open_shell_stream(cls, command, serial=None):
+        """
+        打开一条长期运行的设备端命令输出流（command 为已按设备端 shell 规则转义的命令行），
+        优先走 adb server socket，不可达时启动 adb 子进程（不经过本机 shell）。
+        """
+        if cls.use_socket:
+            try:
+                sock = cls._client.open_service(f"shell:{command}", serial)
+                sock.settimeout(None)
+                return AdbStream(sock=sock)
+            except (OSError, AdbProtocolError):
+                pass
+
+        startupinfo = None
+        if os.name == 'nt':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        argv = [cls._ADB_PATH]
+        if serial:
+            argv += ["-s", serial]
+        argv += ["shell", command]
+        process = subprocess.Popen(
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            bufsize=0,
+            startupinfo=startupinfo
+        )
+        return AdbStream(process=process)
+
+    @classmethod
+    def open_logcat(cls, args=(), serial=None):
+        """打开 -v time 格式的 logcat 流，args 为额外参数（过滤规则等），会逐个转义"""
+        command = " ".join(["logcat", "-v", "time"] + [shlex.quote(arg) for arg in args])
+        return cls.open_shell_stream(command, serial)
+
+    @classmethod
+    def _stream_logcat_binary(cls, filter_str, stop_event, data_queue, serial=None):
+        """二进制批量读取 logcat：整块读取后切行，批次直接入队"""
+        try:
+            stream = cls.open_logcat(serial=serial)
+        except OSError:
+            return
+        needle = filter_str.encode('utf-8') if filter_str else None
+        try:
+            for lines in stream.iter_batches(cls.LOGCAT_CHUNK_SIZE):
+                if stop_event.is_set():
+                    break
+                if needle:
+                    lines = [line for line in lines if needle in line]
+                if lines:
+                    data_queue.put(lines)
+        except Exception:
+            pass
+        finally:
+            stream.close()
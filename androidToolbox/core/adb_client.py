@@ -0,0 +1,151 @@
+import socket
+
+
+class AdbProtocolError(Exception):
+    """adb server 返回 FAIL 或协议格式不符合预期"""
+
+
+class AdbClient:
+    """
+    adb server smart-socket 协议的纯 Python 客户端（默认 localhost:5037）。
+    每个请求为 4 位十六进制长度 + 服务名，server 回复 OKAY / FAIL。
+    支持 host:devices、host:transport:<serial>、shell: 与 exec: 服务，
+    省去为每条命令启动 adb 客户端进程的开销。
+    """
+
+    def __init__(self, host="127.0.0.1", port=5037, timeout=5):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    # ============ 协议基础 ============
+
+    def _connect(self, timeout=None):
+        sock = socket.create_connection((self.host, self.port),
+                                        timeout=self.timeout if timeout is None else timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise AdbProtocolError("连接被 adb server 关闭")
+            buf += chunk
+        return bytes(buf)
+
+    @classmethod
+    def _read_block(cls, sock):
+        """读取一个 4 位十六进制长度前缀的数据块"""
+        header = cls._recv_exact(sock, 4)
+        try:
+            size = int(header, 16)
+        except ValueError:
+            raise AdbProtocolError(f"非法长度前缀: {header!r}")
+        return cls._recv_exact(sock, size)
+
+    @classmethod
+    def _request(cls, sock, service):
+        """发送一个服务请求并检查 OKAY/FAIL"""
+        payload = service.encode('utf-8')
+        sock.sendall(b"%04x" % len(payload) + payload)
+        status = cls._recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = cls._read_block(sock).decode('utf-8', errors='ignore')
+            raise AdbProtocolError(message)
+        raise AdbProtocolError(f"未知响应: {status!r}")
+
+    @staticmethod
+    def _read_all(sock):
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    # ============ host 服务 ============
+
+    def is_available(self):
+        """adb server 是否在监听"""
+        try:
+            with self._connect(timeout=1) as sock:
+                self._request(sock, "host:version")
+                self._read_block(sock)
+            return True
+        except (OSError, AdbProtocolError):
+            return False
+
+    def devices(self):
+        """返回 [(serial, state), ...]，state 如 device / offline / unauthorized"""
+        with self._connect() as sock:
+            self._request(sock, "host:devices")
+            data = self._read_block(sock).decode('utf-8', errors='ignore')
+        return self.parse_devices(data)
+
+    @staticmethod
+    def parse_devices(data):
+        result = []
+        for line in data.splitlines():
+            parts = line.split("\t")
+            if len(parts) >= 2:
+                result.append((parts[0], parts[1].strip()))
+        return result
+
+    def track_devices(self):
+        """
+        打开 host:track-devices 推送流，返回 socket：
+        server 先发送一次完整设备列表，之后每当设备增减或状态变化时再推送完整列表，
+        用 read_devices() 逐次读取，由调用方负责关闭
+        """
+        sock = self._connect()
+        try:
+            self._request(sock, "host:track-devices")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def read_devices(self, sock):
+        """从 track_devices() 的流中读取下一次推送的设备列表（阻塞）"""
+        data = self._read_block(sock).decode('utf-8', errors='ignore')
+        return self.parse_devices(data)
+
+    def devices_text(self):
+        """与 `adb devices` 输出格式一致的文本"""
+        lines = ["List of devices attached"]
+        lines += [f"{serial}\t{state}" for serial, state in self.devices()]
+        return "\n".join(lines)
+
+    # ============ 设备服务 ============
+
+    def open_service(self, service, serial=None, timeout=None):
+        """
+        切换到目标设备的 transport 并打开服务，返回已就绪的 socket，
+        之后的数据即服务的原始输出流，由调用方负责关闭。
+        """
+        sock = self._connect(timeout)
+        try:
+            transport = f"host:transport:{serial}" if serial else "host:transport-any"
+            self._request(sock, transport)
+            self._request(sock, service)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def shell(self, cmd, serial=None, timeout=None):
+        """执行 shell: 服务并返回文本输出"""
+        with self.open_service(f"shell:{cmd}", serial, timeout) as sock:
+            data = self._read_all(sock)
+        return data.decode('utf-8', errors='ignore').replace("\r\n", "\n")
+
+    def exec_out(self, cmd, serial=None, timeout=None):
+        """执行 exec: 服务（无 pty、二进制安全）并返回原始字节"""
+        with self.open_service(f"exec:{cmd}", serial, timeout) as sock:
+            return self._read_all(sock)
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 未命中时 get() 的返回值（缓存值本身可能是 None 或空字符串）
+MISSING = object()
+
+
+class _Flight:
+    """一次进行中的加载，同 key 的并发请求等待它的结果"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    线程安全的结果缓存：每项有独立的过期时间，条目数超过 max_entries 时按 LRU 淘汰。
+    get_or_load() 对同一 key 的并发请求只执行一次加载（single-flight），其余请求等待并共享结果。
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        # key -> (过期时间, 值)，按最近使用排序
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """取未过期的缓存值，没有时返回 MISSING"""
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl, cacheable=None):
+        """
+        命中时直接返回；否则调用 loader() 加载，cacheable(value) 为真（默认总是）时写入缓存。
+        加载期间同 key 的其他调用等待同一结果，loader 抛出的异常也会传给它们
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not MISSING:
+                return value
+            flight = self._loading.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._loading[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            flight.event.set()
+        if cacheable is None or cacheable(flight.value):
+            self.put(key, flight.value, ttl)
+        return flight.value
+
+    def invalidate(self, predicate=None):
+        """删除 predicate(key) 为真的条目，不传时清空；返回删除的条数"""
+        with self._lock:
+            if predicate is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
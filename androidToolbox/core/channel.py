@@ -0,0 +1,106 @@
+import queue
+import threading
+from collections import deque
+
+
+class BoundedChannel:
+    """
+    有界的批次通道（生产者：读取线程，消费者：解析线程），容量按行数计。
+    写满时的处理策略：
+    - block：阻塞生产者，直到消费者腾出空间（反压传回 adb 流）；
+    - drop_oldest：丢弃队列中最旧的批次，保证最新日志可见；
+    - drop_newest：丢弃新到的数据，但每 sample_every 行保留一行作为采样，
+      积压期间仍能看到日志的大致内容。
+    received / dropped / delivered 统计的都是行数。
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+    def __init__(self, max_lines=200000, policy=BLOCK, sample_every=100):
+        if policy not in self.POLICIES:
+            raise ValueError(f"未知的队列策略: {policy}")
+        self.max_lines = max(1, max_lines)
+        self.policy = policy
+        self.sample_every = max(1, sample_every)
+        self._items = deque()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self.received = 0
+        self.dropped = 0
+        self.delivered = 0
+
+    def put(self, batch, timeout=None):
+        """
+        放入一批行。block 策略下等待超时返回 False（本批未计入，调用方可重试），
+        其余情况返回 True（可能已按策略丢弃了部分行）。
+        """
+        size = len(batch)
+        if not size:
+            return True
+        with self._cond:
+            if self.policy == self.BLOCK:
+                # 队列为空时整批放入，避免超大批次永远放不进去
+                if not self._cond.wait_for(
+                        lambda: not self._items or self._pending + size <= self.max_lines, timeout):
+                    return False
+            elif self._pending + size > self.max_lines:
+                if self.policy == self.DROP_OLDEST:
+                    while self._items and self._pending + size > self.max_lines:
+                        old = self._items.popleft()
+                        self._pending -= len(old)
+                        self.dropped += len(old)
+                else:
+                    batch = self._sample(batch)
+                    self.dropped += size - len(batch)
+            self.received += size
+            if batch:
+                self._items.append(batch)
+                self._pending += len(batch)
+                self._cond.notify_all()
+        return True
+
+    def _sample(self, batch):
+        """drop_newest：超出容量的部分按 sample_every 采样，采样行另有 1/sample_every 的额度"""
+        room = max(0, self.max_lines - self._pending)
+        reserve = max(0, self.max_lines + self.max_lines // self.sample_every - self._pending - room)
+        return batch[:room] + batch[room::self.sample_every][:reserve]
+
+    def get(self, timeout=None):
+        """取出一批行，超时抛出 queue.Empty"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            batch = self._items.popleft()
+            self._pending -= len(batch)
+            self.delivered += len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def empty(self):
+        with self._cond:
+            return not self._items
+
+    def clear(self):
+        """丢弃积压的数据（计入 dropped）"""
+        with self._cond:
+            self.dropped += self._pending
+            self._items.clear()
+            self._pending = 0
+            self._cond.notify_all()
+
+    def reset_counters(self):
+        with self._cond:
+            self.received = self.dropped = self.delivered = 0
+
+    def stats(self):
+        with self._cond:
+            return {
+                "received": self.received,
+                "dropped": self.dropped,
+                "delivered": self.delivered,
+                "pending": self._pending,
+                "policy": self.policy,
+            }
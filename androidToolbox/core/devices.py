@@ -0,0 +1,204 @@
+import threading
+
+from androidToolbox.core.adb_client import AdbClient, AdbProtocolError
+
+
+class DeviceEvent:
+    """设备变化事件：kind 为 connected / disconnected / state_changed"""
+
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    STATE_CHANGED = "state_changed"
+
+    __slots__ = ("kind", "serial", "state", "old_state")
+
+    def __init__(self, kind, serial, state=None, old_state=None):
+        self.kind = kind
+        self.serial = serial
+        # 当前状态：device / offline / unauthorized 等，断开时为 None
+        self.state = state
+        self.old_state = old_state
+
+    @property
+    def online(self):
+        """设备是否可用（已授权且在线）"""
+        return self.state == "device"
+
+    def __repr__(self):
+        return f"DeviceEvent({self.kind}, {self.serial}, {self.old_state} -> {self.state})"
+
+
+class DeviceRegistry:
+    """
+    设备注册表：订阅 adb server 的 host:track-devices 推送流维护 {serial: state}，
+    设备接入、断开、状态变化（unauthorized / offline）时通知订阅者，空闲时没有任何轮询开销。
+    server 不可达时先调用 start_server 拉起一次，仍不可达则退化为每 poll_interval 秒调用 poll 轮询。
+    订阅回调在后台线程中执行，界面代码需经主线程轮询的队列切回（如主窗口的 _post），
+    不能在回调中直接调用 Tk 控件的任何方法（包括 after）。
+    """
+
+    def __init__(self, client=None, start_server=None, poll=None, poll_interval=3):
+        self.client = client or AdbClient()
+        self._start_server = start_server
+        self._poll = poll
+        self.poll_interval = poll_interval
+        self._devices = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sock = None
+        self._thread = None
+        # 首次拿到设备列表（推送或轮询）后置位
+        self._synced = threading.Event()
+
+    # ============ 生命周期 ============
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            # 关闭 socket 以打断阻塞中的读取
+            sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    # ============ 查询与订阅 ============
+
+    def devices(self):
+        """当前设备快照 {serial: state}"""
+        with self._lock:
+            return dict(self._devices)
+
+    def online(self):
+        """可用（state == device）的设备序列号列表"""
+        with self._lock:
+            return [serial for serial, state in self._devices.items() if state == "device"]
+
+    def is_online(self, serial=None):
+        """指定设备是否可用；serial 为 None 时表示是否有任意可用设备"""
+        with self._lock:
+            if serial is None:
+                return "device" in self._devices.values()
+            return self._devices.get(serial) == "device"
+
+    def wait_synced(self, timeout=None):
+        """等待首次拿到设备列表，返回是否已同步（用于启动时判断设备是否就绪）"""
+        return self._synced.wait(timeout)
+
+    def subscribe(self, callback, replay=True):
+        """
+        订阅设备事件 callback(event)，返回取消订阅的函数。
+        replay=True 时先为当前已知的每台设备补发一次 connected 事件
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+            current = list(self._devices.items())
+        if replay:
+            for serial, state in current:
+                self._notify(callback, DeviceEvent(DeviceEvent.CONNECTED, serial, state))
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    # ============ 内部实现 ============
+
+    def _watch_loop(self):
+        server_started = False
+        while not self._stop_event.is_set():
+            try:
+                sock = self.client.track_devices()
+            except (OSError, AdbProtocolError):
+                sock = None
+
+            if sock is None:
+                if self._start_server is not None and not server_started:
+                    server_started = True
+                    self._start_server()
+                    continue
+                # server 拉不起来：退化为轮询
+                if self._poll is not None:
+                    self._update(self._poll())
+                self._stop_event.wait(self.poll_interval)
+                continue
+
+            server_started = False
+            with self._lock:
+                self._sock = sock
+            try:
+                sock.settimeout(None)
+                while not self._stop_event.is_set():
+                    self._update(self.client.read_devices(sock))
+            except (OSError, AdbProtocolError):
+                # server 退出或被重启：稍后重连，重连后的首次推送会重新同步全部设备
+                pass
+            finally:
+                with self._lock:
+                    self._sock = None
+                sock.close()
+            self._stop_event.wait(1)
+
+    def _update(self, devices):
+        """与上一次快照比较并派发事件"""
+        current = dict(devices)
+        events = []
+        with self._lock:
+            old = self._devices
+            for serial, state in current.items():
+                if serial not in old:
+                    events.append(DeviceEvent(DeviceEvent.CONNECTED, serial, state))
+                elif old[serial] != state:
+                    events.append(DeviceEvent(DeviceEvent.STATE_CHANGED, serial, state, old[serial]))
+            for serial, state in old.items():
+                if serial not in current:
+                    events.append(DeviceEvent(DeviceEvent.DISCONNECTED, serial, None, state))
+            self._devices = current
+            subscribers = list(self._subscribers)
+        self._synced.set()
+        for event in events:
+            for callback in subscribers:
+                self._notify(callback, event)
+
+    @staticmethod
+    def _notify(callback, event):
+        try:
+            callback(event)
+        except Exception:
+            # 单个订阅者出错不影响设备监听线程
+            pass
+
+
+class OnlineDevices:
+    """
+    订阅注册表、在本地维护可用设备集合：周期采样只读这份集合判断是否有设备，
+    不再每轮进入注册表的锁。不再需要时调用 close() 取消订阅
+    """
+
+    def __init__(self, registry):
+        self._serials = set()
+        self._unsubscribe = registry.subscribe(self._on_event)
+
+    def _on_event(self, event):
+        if event.online:
+            self._serials.add(event.serial)
+        else:
+            self._serials.discard(event.serial)
+
+    def is_online(self, serial=None):
+        """同 DeviceRegistry.is_online"""
+        if serial is None:
+            return bool(self._serials)
+        return serial in self._serials
+
+    def close(self):
+        self._unsubscribe()
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收集更慢的调用
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+# 按子命令细分的 shell 命令（如 "shell dumpsys wifi"），其余只取命令名（如 "shell getprop"）
+SUBCOMMAND_FAMILIES = ("dumpsys", "cmd", "cat", "am", "pm", "settings", "service")
+# 错误结果中表示超时的字样（会话、socket、进程三种执行方式）
+TIMEOUT_MARKERS = ("timed out", "timeout", "超时")
+
+
+def command_family(cmd):
+    """命令归类：'shell dumpsys wifi | grep x' -> 'shell dumpsys wifi'，'shell getprop ro.x' -> 'shell getprop'"""
+    tokens = cmd.split(None, 3)
+    if not tokens:
+        return "?"
+    if tokens[0] in ("shell", "exec-out") and len(tokens) > 1:
+        if tokens[1] in SUBCOMMAND_FAMILIES and len(tokens) > 2 and not tokens[2].startswith("-"):
+            return " ".join(tokens[:3])
+        return " ".join(tokens[:2])
+    return tokens[0]
+
+
+class _FamilyStats:
+    __slots__ = ("count", "errors", "timeouts", "in_flight", "total_ms", "max_ms", "buckets",
+                 "bytes_total", "bytes_max", "last_error")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.bytes_total = 0
+        self.bytes_max = 0
+        self.last_error = None
+
+
+class CommandMetrics:
+    """
+    ADB 命令的耗时统计：按命令类别记录调用次数、进行中的数量、延迟直方图、
+    错误与超时次数、输出大小。run() 出错时返回 "Error: ..." 字符串，这里据此计入错误 / 超时。
+    snapshot() 可随时查询；start_dump() 定期把快照以 JSON Lines 追加到文件。
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._dump_stop = None
+        self._dump_thread = None
+
+    def measure(self, family, call):
+        """执行 call() 并计入 family 的统计，返回其结果；call 抛出的异常计为错误后继续抛出"""
+        with self._lock:
+            stats = self._families.get(family)
+            if stats is None:
+                stats = self._families[family] = _FamilyStats()
+            stats.in_flight += 1
+        start = time.perf_counter()
+        result = None
+        try:
+            result = call()
+            return result
+        finally:
+            self._finish(stats, (time.perf_counter() - start) * 1000, result)
+
+    def _finish(self, stats, elapsed_ms, result):
+        error = None
+        if result is None:
+            error = "exception"
+        elif isinstance(result, str) and result.startswith("Error:"):
+            error = result
+        size = len(result.encode('utf-8')) if isinstance(result, str) else 0
+        with self._lock:
+            stats.in_flight -= 1
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            stats.bytes_total += size
+            stats.bytes_max = max(stats.bytes_max, size)
+            if error is not None:
+                stats.errors += 1
+                stats.last_error = error[:200]
+                if any(marker in error.lower() for marker in TIMEOUT_MARKERS):
+                    stats.timeouts += 1
+
+    def reset(self):
+        with self._lock:
+            # 原地清零并保留进行中的计数：进行中的调用结束时仍写回同一个对象
+            for stats in self._families.values():
+                in_flight = stats.in_flight
+                stats.__init__()
+                stats.in_flight = in_flight
+            self.started = time.time()
+
+    def snapshot(self):
+        """
+        {类别: {"count", "in_flight", "errors", "timeouts", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+        "bytes_avg", "bytes_max", "last_error", "histogram"}}；百分位按直方图桶的上界估计，
+        histogram 为 [(上界毫秒, 次数), ...]，最后一个桶的上界为 None
+        """
+        with self._lock:
+            families = {family: (stats.count, stats.in_flight, stats.errors, stats.timeouts, stats.total_ms,
+                                 stats.max_ms, list(stats.buckets), stats.bytes_total, stats.bytes_max,
+                                 stats.last_error)
+                        for family, stats in self._families.items()}
+        result = {}
+        for family, (count, in_flight, errors, timeouts, total_ms, max_ms, buckets, bytes_total,
+                     bytes_max, last_error) in families.items():
+            result[family] = {
+                "count": count,
+                "in_flight": in_flight,
+                "errors": errors,
+                "timeouts": timeouts,
+                "avg_ms": round(total_ms / count, 1) if count else None,
+                "p50_ms": self._percentile(buckets, count, 0.50, max_ms),
+                "p95_ms": self._percentile(buckets, count, 0.95, max_ms),
+                "p99_ms": self._percentile(buckets, count, 0.99, max_ms),
+                "max_ms": round(max_ms, 1),
+                "bytes_avg": round(bytes_total / count) if count else None,
+                "bytes_max": bytes_max,
+                "last_error": last_error,
+                "histogram": [(bound, n) for bound, n in zip(LATENCY_BUCKETS_MS + (None,), buckets) if n],
+            }
+        return result
+
+    @staticmethod
+    def _percentile(buckets, count, q, max_ms):
+        """落在第几个桶就取该桶上界（不超过实际最大值）"""
+        if not count:
+            return None
+        rank, seen = q * count, 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, round(max_ms, 1))
+        return round(max_ms, 1)
+
+    # ============ 定期落盘 ============
+
+    def start_dump(self, path, interval=60, extra=None):
+        """
+        每 interval 秒把快照追加到 path（每行 {"ts", "uptime_s", "commands", ...}）；
+        extra() 可返回附加字段（如缓存统计），重复调用会先停止上一次
+        """
+        self.stop_dump()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stop = self._dump_stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.dump(path, extra)
+            # 停止时再写一次，保留最后一段的数据
+            self.dump(path, extra)
+
+        self._dump_thread = threading.Thread(target=loop, daemon=True, name="adb-metrics-dump")
+        self._dump_thread.start()
+
+    def stop_dump(self):
+        """停止定期落盘（等待最后一次写入完成）"""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_thread.join(timeout=2)
+            self._dump_stop = self._dump_thread = None
+
+    def dump(self, path, extra=None):
+        record = {"ts": round(time.time(), 3), "uptime_s": round(time.time() - self.started, 1),
+                  "commands": self.snapshot()}
+        if extra is not None:
+            record.update(extra())
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,218 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolExhausted(Exception):
+    """在等待时间内借不到通道（已达到并发上限）"""
+
+
+class TransportPool:
+    """
+    按设备序列号分组的通道池：
+    - 通道空闲超过 idle_timeout 后自动关闭；
+    - 借出前做健康检查（进程/连接存活，久未使用时额外 ping 一次）；
+    - 全局最多 max_transports 条通道，单设备最多 max_per_device 条，
+      超出时借用方等待，或回收其他设备最久未用的空闲通道腾出名额。
+    通道对象需提供 is_alive() / ping() / close() 与 last_used 属性。
+    """
+
+    def __init__(self, factory, max_transports=4, max_per_device=2,
+                 idle_timeout=60, health_interval=15):
+        self.factory = factory
+        self.max_transports = max_transports
+        self.max_per_device = max_per_device
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+
+        self._cond = threading.Condition()
+        # serial -> [channel, ...]，列表尾部为最近归还的通道
+        self._idle = {}
+        # serial -> 该设备的通道总数（空闲 + 借出）
+        self._count = {}
+        self._total = 0
+        self._reaper = None
+
+    @contextmanager
+    def borrow(self, serial=None, timeout=2):
+        """借出一条通道，退出 with 时归还；块内抛出异常则视为通道损坏并关闭"""
+        channel = self.acquire(serial, timeout)
+        try:
+            yield channel
+        except BaseException:
+            self.release(channel, broken=True)
+            raise
+        else:
+            self.release(channel)
+
+    def acquire(self, serial=None, timeout=2):
+        deadline = time.monotonic() + timeout
+        while True:
+            to_close = []
+            channel = None
+            create = False
+            with self._cond:
+                while True:
+                    to_close += self._collect_idle_locked(time.monotonic())
+                    idle = self._idle.get(serial)
+                    if idle:
+                        channel = idle.pop()
+                        break
+                    if self._has_room_locked(serial):
+                        self._reserve_locked(serial)
+                        create = True
+                        break
+                    # 仅受全局名额限制时：回收其他设备最久未用的空闲通道
+                    if self._count.get(serial, 0) < self.max_per_device:
+                        victim = self._pop_lru_idle_locked()
+                        if victim is not None:
+                            to_close.append(victim)
+                            continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            for stale in to_close:
+                stale.close()
+
+            if create:
+                try:
+                    channel = self.factory(serial)
+                except BaseException:
+                    self._forget(serial)
+                    raise
+                self._ensure_reaper()
+                return channel
+            if channel is None:
+                raise PoolExhausted(f"设备 {serial or '默认'} 没有可用通道")
+            if self._is_healthy(channel):
+                return channel
+            # 不健康：关闭后重新尝试
+            channel.close()
+            self._forget(serial)
+
+    def release(self, channel, broken=False):
+        """归还通道；损坏或已失效的通道直接关闭"""
+        serial = channel.serial
+        if broken or not channel.is_alive():
+            channel.close()
+            self._forget(serial)
+            return
+        with self._cond:
+            self._idle.setdefault(serial, []).append(channel)
+            self._cond.notify()
+
+    def evict_idle(self):
+        """关闭所有空闲超时的通道，返回关闭数量"""
+        with self._cond:
+            expired = self._collect_idle_locked(time.monotonic())
+        for channel in expired:
+            channel.close()
+        return len(expired)
+
+    def close_device(self, serial):
+        """设备断开时关闭该设备所有空闲通道（借出中的通道归还时会因失效被关闭）"""
+        with self._cond:
+            channels = self._idle.pop(serial, [])
+            self._discount_locked(serial, len(channels))
+        for channel in channels:
+            channel.close()
+
+    def close_all(self):
+        with self._cond:
+            channels = [ch for chs in self._idle.values() for ch in chs]
+            for serial, chs in self._idle.items():
+                self._discount_locked(serial, len(chs))
+            self._idle.clear()
+        for channel in channels:
+            channel.close()
+
+    def stats(self):
+        """当前池状态：总通道数与每台设备的 (空闲, 总数)"""
+        with self._cond:
+            return {
+                "total": self._total,
+                "devices": {serial: (len(self._idle.get(serial, [])), count)
+                            for serial, count in self._count.items()},
+            }
+
+    # ============ 内部实现 ============
+
+    def _is_healthy(self, channel):
+        if not channel.is_alive():
+            return False
+        if time.monotonic() - channel.last_used > self.health_interval:
+            return channel.ping()
+        return True
+
+    def _has_room_locked(self, serial):
+        return (self._total < self.max_transports
+                and self._count.get(serial, 0) < self.max_per_device)
+
+    def _reserve_locked(self, serial):
+        self._total += 1
+        self._count[serial] = self._count.get(serial, 0) + 1
+
+    def _discount_locked(self, serial, n):
+        if n <= 0:
+            return
+        self._total -= n
+        left = self._count.get(serial, 0) - n
+        if left > 0:
+            self._count[serial] = left
+        else:
+            self._count.pop(serial, None)
+        self._cond.notify_all()
+
+    def _forget(self, serial):
+        with self._cond:
+            self._discount_locked(serial, 1)
+
+    def _collect_idle_locked(self, now):
+        expired = []
+        for serial in list(self._idle):
+            keep = []
+            for channel in self._idle[serial]:
+                if now - channel.last_used > self.idle_timeout:
+                    expired.append(channel)
+                else:
+                    keep.append(channel)
+            self._discount_locked(serial, len(self._idle[serial]) - len(keep))
+            if keep:
+                self._idle[serial] = keep
+            else:
+                del self._idle[serial]
+        return expired
+
+    def _pop_lru_idle_locked(self):
+        oldest = None
+        for serial, channels in self._idle.items():
+            for channel in channels:
+                if oldest is None or channel.last_used < oldest.last_used:
+                    oldest = channel
+        if oldest is None:
+            return None
+        channels = self._idle[oldest.serial]
+        channels.remove(oldest)
+        if not channels:
+            del self._idle[oldest.serial]
+        self._discount_locked(oldest.serial, 1)
+        return oldest
+
+    def _ensure_reaper(self):
+        with self._cond:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        """后台回收线程：池中没有通道时自行退出"""
+        while True:
+            time.sleep(max(1, self.idle_timeout / 2))
+            self.evict_idle()
+            with self._cond:
+                if self._total == 0:
+                    self._reaper = None
+                    return
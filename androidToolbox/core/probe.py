@@ -0,0 +1,93 @@
+import uuid
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.cache import MISSING
+
+
+class ProbeBundle:
+    """
+    探针合并执行：各服务声明自己需要的设备端命令 {名称: 命令}，
+    合并成一个设备端脚本，每段输出前打印分隔标记，一次 adb 往返拿回全部结果后再按段切分。
+    多个服务一起采样时用 include() 加命名空间，结果用 section() 取回各自的部分。
+    """
+
+    def __init__(self, probes=None):
+        self.probes = {}
+        for name, command in (probes or {}).items():
+            self.add(name, command)
+
+    def add(self, name, command):
+        self.probes[name] = command
+        return self
+
+    def include(self, namespace, probes):
+        """以 namespace.name 的形式加入另一组探针"""
+        for name, command in probes.items():
+            self.add(f"{namespace}.{name}", command)
+        return self
+
+    def script(self, marker, names=None):
+        """生成设备端脚本：每个探针前输出一行 "<marker> <名称>"，单个命令失败不影响其余"""
+        parts = []
+        for name in (self.probes if names is None else names):
+            command = self.probes[name]
+            # 标记前先换行：上一段输出不以换行结尾时标记仍独占一行
+            parts.append(f"printf '\\n%s\\n' '{marker} {name}'")
+            parts.append(f"{{ {command}\n}} 2>/dev/null")
+        return "\n".join(parts)
+
+    def run(self, serial=None, timeout=10):
+        """
+        执行并返回 {名称: 输出}；执行失败或缺失的段为空字符串。
+        与 ADBManager.run("shell <命令>") 共用结果缓存：仍在有效期内的探针不再下发，其余结果写回缓存
+        """
+        results, pending = {}, []
+        for name, command in self.probes.items():
+            cached = ADBManager.cached("shell " + command, serial)
+            if cached is MISSING:
+                pending.append(name)
+            else:
+                results[name] = cached
+        if not pending:
+            return results
+        # 每次执行使用随机标记，避免与命令输出内容冲突
+        marker = f"@@probe-{uuid.uuid4().hex[:12]}"
+        output = ADBManager.run_script(self.script(marker, pending), timeout=timeout, serial=serial)
+        sections = self.split(output, marker, pending)
+        for name in pending:
+            ADBManager.remember("shell " + self.probes[name], sections[name], serial)
+        results.update(sections)
+        return {name: results[name] for name in self.probes}
+
+    @classmethod
+    def collect(cls, groups, serial=None, timeout=10):
+        """
+        多个服务一次采样：groups 为 {命名空间: PROBES}，
+        返回 {命名空间: {名称: 输出}}，各服务的解析函数只拿到自己的部分
+        """
+        bundle = cls()
+        for namespace, probes in groups.items():
+            bundle.include(namespace, probes)
+        results = bundle.run(serial, timeout)
+        return {namespace: cls.section(results, namespace) for namespace in groups}
+
+    @staticmethod
+    def split(output, marker, names=()):
+        sections = {name: "" for name in names}
+        current, lines = None, []
+        for line in output.replace("\r\n", "\n").split("\n"):
+            if line.startswith(marker + " "):
+                if current is not None:
+                    sections[current] = "\n".join(lines).strip()
+                current, lines = line[len(marker) + 1:].strip(), []
+            elif current is not None:
+                lines.append(line)
+        if current is not None:
+            sections[current] = "\n".join(lines).strip()
+        return sections
+
+    @staticmethod
+    def section(results, namespace):
+        """从 include() 合并执行的结果中取出某个命名空间的部分（去掉前缀）"""
+        prefix = namespace + "."
+        return {name[len(prefix):]: output for name, output in results.items() if name.startswith(prefix)}
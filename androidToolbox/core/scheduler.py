@@ -0,0 +1,197 @@
+import asyncio
+import inspect
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ProbeTimeout(Exception):
+    """探针执行超过 deadline"""
+
+
+class ProbeBusy(Exception):
+    """同名探针上一次执行超时后仍未返回，本次请求未执行"""
+
+
+class _Probe:
+    __slots__ = ("name", "func", "interval", "callback", "deadline", "jitter", "task")
+
+    def __init__(self, name, func, interval, callback, deadline, jitter):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.callback = callback
+        self.deadline = deadline
+        self.jitter = jitter
+        self.task = None
+
+
+class ProbeScheduler:
+    """
+    统一的后台探针调度器：独立线程运行 asyncio 事件循环，负责所有周期性 / 一次性的设备探测，
+    界面线程只接收结果，设备卡住或超时都不会阻塞窗口。
+    - 周期探针：add(name, func, interval) 按间隔执行，间隔带随机抖动，避免多个探针同时打到设备；
+    - 截止时间：超过 deadline 时回调收到 ProbeTimeout，不再等待；
+    - 去重：同名探针上一次仍在执行时，本轮跳过，一次性请求合并到进行中的那次；
+    - 取消：cancel(name) / stop()。
+    func 可以是协程函数（直接在事件循环中 await），也可以是普通函数
+    （如走 ADBManager 的同步调用，放到有界线程池执行）。
+    回调形式为 callback(result, error)，通过 post 投递到界面线程；未提供 post 时在调度线程中直接调用。
+    """
+
+    def __init__(self, post=None, max_workers=4):
+        self._post = post
+        self._max_workers = max_workers
+        self._executor = None
+        self._loop = None
+        self._thread = None
+        self._probes = {}
+        # 进行中的执行：name -> [等待结果的回调列表]，结果投递后置为 None（超时后仍在执行）
+        self._in_flight = {}
+        # 统计：name -> {"runs", "timeouts", "errors", "skipped", "last_duration"}
+        self.stats = {}
+
+    # ============ 生命周期 ============
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="probe")
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def _run_loop(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def stop(self):
+        """取消全部探针并停止事件循环；线程池中尚未返回的调用不再等待"""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._probes.clear()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            # 等待任务处理完取消再停止循环
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop = None
+
+    # ============ 对外接口（任意线程） ============
+
+    def add(self, name, func, interval, callback=None, deadline=None, jitter=0.1):
+        """添加（或替换）周期探针并立即执行一次"""
+        probe = _Probe(name, func, interval, callback, deadline, jitter)
+        self._call(self._add, probe)
+
+    def cancel(self, name):
+        """取消周期探针；已在执行的这一次仍会完成，但不再投递结果"""
+        self._call(self._cancel, name)
+
+    def submit(self, name, func, callback=None, deadline=None):
+        """执行一次性探针；同名探针正在执行时不重复执行，回调合并到进行中的那次"""
+        self._call(self._launch, name, func, callback, deadline)
+
+    def is_scheduled(self, name):
+        return name in self._probes
+
+    def _call(self, method, *args):
+        if self._loop is None:
+            self.start()
+        self._loop.call_soon_threadsafe(method, *args)
+
+    # ============ 事件循环内部 ============
+
+    def _add(self, probe):
+        self._cancel(probe.name)
+        self._probes[probe.name] = probe
+        probe.task = self._loop.create_task(self._periodic(probe))
+
+    def _cancel(self, name):
+        probe = self._probes.pop(name, None)
+        if probe is not None and probe.task is not None:
+            probe.task.cancel()
+        waiters = self._in_flight.get(name)
+        if waiters:
+            waiters.clear()
+
+    async def _periodic(self, probe):
+        while True:
+            self._launch(probe.name, probe.func, probe.callback, probe.deadline, periodic=True)
+            delay = probe.interval * (1 + random.uniform(-probe.jitter, probe.jitter))
+            await asyncio.sleep(max(0.0, delay))
+
+    def _launch(self, name, func, callback, deadline, periodic=False):
+        stats = self.stats.setdefault(name, {"runs": 0, "timeouts": 0, "errors": 0,
+                                             "skipped": 0, "last_duration": None})
+        if name in self._in_flight:
+            stats["skipped"] += 1
+            waiters = self._in_flight[name]
+            if periodic:
+                return
+            if waiters is None:
+                # 上一次已超时但底层调用仍未返回（如设备卡死），不再叠加新的调用
+                self._deliver(callback, None, ProbeBusy(f"探针 {name} 仍在执行"))
+            elif callback is not None:
+                waiters.append(callback)
+            return
+        self._in_flight[name] = [callback] if callback is not None else []
+        self._loop.create_task(self._execute(name, func, deadline, stats))
+
+    async def _execute(self, name, func, deadline, stats):
+        loop = self._loop
+        started = loop.time()
+        if inspect.iscoroutinefunction(func):
+            work = asyncio.ensure_future(func())
+        else:
+            work = loop.run_in_executor(self._executor, func)
+        stats["runs"] += 1
+
+        result, error, timed_out = None, None, False
+        try:
+            result = await asyncio.wait_for(asyncio.shield(work), deadline)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            error = ProbeTimeout(f"探针 {name} 超过 {deadline} 秒未返回")
+            timed_out = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            error = e
+        stats["last_duration"] = loop.time() - started
+
+        waiters = self._in_flight.get(name) or []
+        if timed_out:
+            # 保留占位直到底层调用真正结束，防止设备卡死时调用越积越多
+            self._in_flight[name] = None
+            work.add_done_callback(lambda _: self._in_flight.pop(name, None))
+        else:
+            self._in_flight.pop(name, None)
+        for callback in waiters:
+            self._deliver(callback, result, error)
+
+    def _deliver(self, callback, result, error):
+        if callback is None:
+            return
+        if self._post is not None:
+            self._post(callback, result, error)
+            return
+        try:
+            callback(result, error)
+        except Exception:
+            pass
@@ -0,0 +1,213 @@
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+
+from androidToolbox.core.adb_client import AdbProtocolError
+from androidToolbox.core.stream import PROCESS_EXIT_TIMEOUT
+
+
+class ShellSessionError(Exception):
+    """常驻 shell 会话不可用（启动失败、进程退出等），调用方应回退到一次性执行"""
+
+
+class ShellSessionTimeout(ShellSessionError):
+    """命令在会话中执行超时，会话已被关闭"""
+
+
+class _PendingCommand:
+    """一条已写入会话、等待结果的命令"""
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.chunks = []
+        self.output = ""
+        self.returncode = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ShellSession:
+    """
+    单设备常驻 `adb shell` 会话：
+    命令通过 stdin 写入同一个设备端 shell，每条命令后追加唯一的哨兵行，
+    读线程按哨兵把 stdout 切分回对应的调用方，实现多线程复用一条管道。
+    传入 client 时优先通过 adb server 的 `shell:sh` 服务建立会话（无需本机进程），
+    失败再退回到 `adb shell` 子进程。
+    """
+
+    def __init__(self, adb_path, serial=None, client=None):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.client = client
+        self.last_used = time.monotonic()
+        self._proc = None
+        self._sock = None
+        self._stdin = None
+        self._stdout = None
+        self._reader = None
+        self._pending = deque()
+        # 写入顺序即结果顺序，写 stdin 与入队必须在同一把锁内完成
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """建立会话并启动读线程"""
+        if not (self.client is not None and self._open_socket()):
+            self._open_process()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        return self
+
+    def _open_socket(self):
+        try:
+            sock = self.client.open_service("shell:sh", self.serial)
+        except AdbProtocolError as e:
+            # server 可达但拒绝（如设备不存在），进程方式同样会失败
+            raise ShellSessionError(str(e)) from e
+        except OSError:
+            return False
+        sock.settimeout(None)
+        self._sock = sock
+        self._stdin = sock.makefile('wb')
+        self._stdout = sock.makefile('rb')
+        return True
+
+    def _open_process(self):
+        startupinfo = None
+        if os.name == 'nt':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        argv = [self.adb_path]
+        if self.serial:
+            argv += ["-s", self.serial]
+        argv.append("shell")
+        try:
+            self._proc = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                startupinfo=startupinfo
+            )
+        except OSError as e:
+            raise ShellSessionError(f"无法启动 adb shell: {e}") from e
+        self._stdin = self._proc.stdin
+        self._stdout = self._proc.stdout
+
+    def is_alive(self):
+        if self._closed:
+            return False
+        if self._proc is not None:
+            return self._proc.poll() is None
+        return self._sock is not None
+
+    def ping(self, timeout=1):
+        """健康检查：执行空命令确认设备端 shell 仍可响应"""
+        try:
+            self.execute("true", timeout)
+            return True
+        except ShellSessionError:
+            return False
+
+    def execute(self, cmd, timeout=5):
+        """在会话中执行一条设备端命令，返回去除首尾空白的 stdout"""
+        if not self.is_alive():
+            raise ShellSessionError("会话未运行")
+
+        marker = f"__ATB_{uuid.uuid4().hex}__"
+        pending = _PendingCommand(marker)
+        # 命令放进 { } 中执行：stdin 指向 /dev/null 防止吞掉后续命令，stderr 丢弃与一次性模式一致
+        # printf 先输出换行，保证哨兵总在行首，即使命令输出没有以换行结尾
+        payload = f"{{ {cmd}\n}} </dev/null 2>/dev/null; printf '\\n%s %d\\n' {marker} $?\n"
+        with self._lock:
+            self._pending.append(pending)
+            try:
+                self._stdin.write(payload.encode('utf-8'))
+                self._stdin.flush()
+            except (OSError, ValueError) as e:
+                self._pending.remove(pending)
+                self.close()
+                raise ShellSessionError(f"写入会话失败: {e}") from e
+
+        if not pending.done.wait(timeout):
+            # 命令仍在设备端执行，会话状态已不可知，只能整体关闭
+            self.close()
+            raise ShellSessionTimeout(f"命令执行超时 ({timeout}s): {cmd}")
+        if pending.error:
+            raise ShellSessionError(pending.error)
+        self.last_used = time.monotonic()
+        return pending.output
+
+    def close(self):
+        """关闭会话，所有等待中的命令以错误结束"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._stdin.close()
+        except (AttributeError, OSError, ValueError):
+            pass
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        if self._proc is not None:
+            # 回收子进程，否则每次重建会话都会残留一个僵尸进程
+            try:
+                self._proc.kill()
+                self._proc.wait(timeout=PROCESS_EXIT_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        # 进程退出或 socket 断开后读线程随即读到 EOF；makefile 的句柄需单独关闭才会释放
+        try:
+            self._stdout.close()
+        except (AttributeError, OSError, ValueError):
+            pass
+        self._fail_pending("会话已关闭")
+
+    def _fail_pending(self, reason):
+        with self._lock:
+            while self._pending:
+                pending = self._pending.popleft()
+                pending.error = reason
+                pending.done.set()
+
+    def _read_loop(self):
+        """读线程：按哨兵把输出分发给队首命令"""
+        stdout = self._stdout
+        try:
+            for raw in iter(stdout.readline, b""):
+                line = raw.decode('utf-8', errors='ignore')
+                with self._lock:
+                    head = self._pending[0] if self._pending else None
+                if head is None:
+                    # 没有等待中的命令（例如登录提示），直接丢弃
+                    continue
+
+                stripped = line.rstrip("\r\n")
+                if stripped.startswith(head.marker):
+                    with self._lock:
+                        self._pending.popleft()
+                    try:
+                        head.returncode = int(stripped[len(head.marker):].strip())
+                    except ValueError:
+                        head.returncode = -1
+                    head.output = "".join(head.chunks).strip()
+                    head.chunks = []
+                    head.done.set()
+                else:
+                    head.chunks.append(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._closed = True
+            self._fail_pending("adb shell 进程已退出")
@@ -0,0 +1,70 @@
+import os
+import socket
+import subprocess
+
+# 关闭时等待子进程退出的最长时间（秒），超时后强制结束
+PROCESS_EXIT_TIMEOUT = 1
+
+
+class AdbStream:
+    """
+    一条长连接的设备端输出流（logcat、ping 等），底层为 adb server socket 或 adb 子进程。
+    close() 可以从其他线程调用，用来打断阻塞中的 read()。
+    """
+
+    def __init__(self, sock=None, process=None):
+        self._sock = sock
+        self._process = process
+        self._fd = process.stdout.fileno() if process is not None else None
+        self.closed = False
+
+    def read(self, size=64 * 1024):
+        """读取一块原始字节，流结束或已关闭时返回 b''"""
+        if self.closed:
+            return b""
+        try:
+            if self._sock is not None:
+                return self._sock.recv(size)
+            return os.read(self._fd, size)
+        except (OSError, ValueError):
+            return b""
+
+    def iter_batches(self, size=64 * 1024):
+        """按块读取并切分成完整行，每次产出一批 list[bytes]（不含换行符）"""
+        # 上一块末尾不完整的半行
+        pending = b""
+        while True:
+            chunk = self.read(size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            if lines:
+                yield lines
+        if pending and not self.closed:
+            yield [pending]
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        if self._process is not None:
+            # 回收子进程并关闭管道，否则每次重连都会残留一个僵尸进程和文件句柄
+            try:
+                self._process.terminate()
+                self._process.wait(timeout=PROCESS_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                try:
+                    self._process.wait(timeout=PROCESS_EXIT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    pass
+            except OSError:
+                pass
+            self._process.stdout.close()
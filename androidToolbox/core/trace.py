@@ -0,0 +1,44 @@
+import logging
+import threading
+import time
+
+
+class StartupTrace:
+    """
+    启动耗时记录：各阶段（导入、初始化、首次绘制、首次拿到设备列表等）相对起点的毫秒数，
+    按发生顺序保存，report() 输出累计与增量耗时，便于跟踪冷启动时间。
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self._marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """记录阶段完成时间（同名只记第一次），返回相对起点的毫秒数"""
+        with self._lock:
+            if name not in self._marks:
+                self._marks[name] = round((time.perf_counter() - self.origin) * 1000, 1)
+            return self._marks[name]
+
+    def get(self, name):
+        return self._marks.get(name)
+
+    def marks(self):
+        """{阶段: 毫秒}，按发生顺序"""
+        with self._lock:
+            return dict(self._marks)
+
+    def report(self):
+        lines, previous = ["启动耗时（毫秒）:"], 0.0
+        for name, ms in self.marks().items():
+            lines.append(f"  {name:<16}{ms:>9.1f}  (+{ms - previous:.1f})")
+            previous = ms
+        return "\n".join(lines)
+
+    def log(self, logger=None):
+        (logger or logging.getLogger(__name__)).info(self.report())
+
+
+# 进程级的启动记录：起点默认为本模块导入时刻，入口可把 origin 改为更早的时间
+startup_trace = StartupTrace()
@@ -1,7 +1,25 @@
 """Android Toolbox Services - 业务逻辑层"""
+import importlib
 
-from androidToolbox.services.network_service import NetworkService
-from androidToolbox.services.logcat_service import LogcatService
-from androidToolbox.services.monitor_service import MonitorService
+# 各服务按需导入（PEP 562）：无界面模式只加载用到的模块，缩短启动时间
+_EXPORTS = {
+    "NetworkService": "network_service",
+    "LogcatService": "logcat_service",
+    "MonitorService": "monitor_service",
+    "MonitorAgent": "monitor_agent",
+    "ProcessTracker": "process_service",
+    "LatencyProber": "latency_service",
+    "LatencyStats": "latency_service",
+    "ThroughputSampler": "throughput_service",
+}
 
-__all__ = ["NetworkService", "LogcatService", "MonitorService"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,232 @@
+import math
+import re
+import shlex
+import threading
+import time
+from collections import deque
+
+from androidToolbox.core.adb import ADBManager
+
+# 回包行：64 bytes from 1.2.3.4: icmp_seq=3 ttl=117 time=23.4 ms
+REPLY_PATTERN = re.compile(rb"icmp_seq=(\d+)\b.*?\btime[=<]([\d.]+)\s*ms")
+# 非 root 时设备端 ping 允许的最小发包间隔（秒）
+MIN_INTERVAL = 0.2
+# 单个包的等待时间（秒），超过后计为丢包
+REPLY_TIMEOUT = 1
+# 判定丢包时额外放宽的时间（秒），吸收 adb 启动 ping 与输出缓冲的延迟
+LOSS_GRACE = 2
+
+
+class LatencyStats:
+    """单个目标的滚动统计：最近 window 个探测包的 RTT（丢包为 None）与累计收发数"""
+
+    def __init__(self, target, window=100):
+        self.target = target
+        self.window = window
+        self._results = deque(maxlen=window)
+        self.sent = 0
+        self.received = 0
+        self.last_rtt = None
+        # RFC 3550 式平滑抖动（毫秒）
+        self.jitter = 0.0
+        self._last_seq = 0
+        self._prev_rtt = None
+        # 最近一个按序到达的回包：(序号, 到达时刻)，判定超时丢包的基准
+        self.anchor = None
+
+    def on_reply(self, seq, rtt, at=None):
+        """
+        记录一个回包（at 为到达时刻），返回因此判定丢包的序号（中间被跳过的序号）；
+        已判为丢包的序号迟到的回包改记为收到并返回空序列，重复的回包忽略并返回 None
+        """
+        if seq <= self._last_seq:
+            return self._on_late_reply(seq, rtt)
+        if at is not None:
+            self.anchor = (seq, at)
+        lost = self.mark_lost(seq - 1)
+        self._last_seq = seq
+        self.sent += 1
+        self.received += 1
+        self._results.append(rtt)
+        if self._prev_rtt is not None:
+            self.jitter += (abs(rtt - self._prev_rtt) - self.jitter) / 16
+        self._prev_rtt = rtt
+        self.last_rtt = rtt
+        return lost
+
+    def _on_late_reply(self, seq, rtt):
+        # 窗口内的序号连续，按与最新序号的距离定位
+        index = len(self._results) - 1 - (self._last_seq - seq)
+        if index < 0 or self._results[index] is not None:
+            return None
+        self._results[index] = rtt
+        self.received += 1
+        return ()
+
+    def mark_lost(self, up_to_seq):
+        """把 up_to_seq 及之前尚未收到回包的序号计为丢包，返回这些序号"""
+        lost = range(self._last_seq + 1, up_to_seq + 1)
+        for _ in range(min(len(lost), self.window)):
+            self._results.append(None)
+        self.sent += len(lost)
+        self._last_seq = max(self._last_seq, up_to_seq)
+        return lost
+
+    @staticmethod
+    def _percentile(ordered, p):
+        # 最近秩法：第 ceil(p/100 * n) 个（从 1 计），限制在有效下标内
+        return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    def snapshot(self):
+        """当前统计（毫秒）；窗口内没有回包时各延迟项为 None"""
+        rtts = sorted(r for r in self._results if r is not None)
+        window_sent = len(self._results)
+        stats = {
+            "target": self.target,
+            "sent": self.sent,
+            "received": self.received,
+            "loss": 100.0 * (window_sent - len(rtts)) / window_sent if window_sent else 0.0,
+            "last": self.last_rtt,
+            "min": None, "avg": None, "p50": None, "p95": None, "p99": None,
+            "jitter": self.jitter if len(rtts) > 1 else None,
+        }
+        if rtts:
+            stats.update({
+                "min": rtts[0],
+                "avg": sum(rtts) / len(rtts),
+                "p50": self._percentile(rtts, 50),
+                "p95": self._percentile(rtts, 95),
+                "p99": self._percentile(rtts, 99),
+            })
+        return stats
+
+
+class LatencyProber:
+    """
+    多目标并发延迟探测：在设备端的一个 shell 中为每个目标各启动一个 ping，
+    每行输出加上目标序号后由同一条 adb 流实时读回，回包到达即更新该目标的统计。
+    count 为 None 时按 interval 持续探测，直到 stop()，用于发现弱网下的间歇性丢包。
+    on_reply(target, seq, rtt) 在读取线程中调用（丢包时 rtt 为 None），界面需自行切回主线程。
+    """
+
+    def __init__(self, targets, serial=None, interval=1.0, count=None, window=100, on_reply=None):
+        self.targets = list(dict.fromkeys(targets))
+        self.serial = serial
+        self.interval = max(MIN_INTERVAL, interval)
+        self.count = count
+        self.on_reply = on_reply
+        self.stats = {target: LatencyStats(target, window) for target in self.targets}
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thread = None
+        self._started_at = None
+        self._ended_at = None
+        self._stopped = False
+
+    def script(self):
+        """设备端脚本：每个 ping 的输出逐行加上 "<序号> " 前缀，全部结束后 shell 退出"""
+        options = f"-n -i {self.interval:g} -W {REPLY_TIMEOUT}"
+        if self.count:
+            options += f" -c {int(self.count)}"
+        parts = [f"ping {options} {shlex.quote(target)} 2>&1 | while read -r line; do echo \"{i} $line\"; done &"
+                 for i, target in enumerate(self.targets)]
+        parts.append("wait")
+        return "\n".join(parts)
+
+    def start(self):
+        if self.running:
+            return self
+        self._stream = ADBManager.open_shell_stream(self.script(), self.serial)
+        self._started_at = time.monotonic()
+        self._ended_at = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._read_loop, args=(self._stream,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def wait(self, timeout=None):
+        """等待探测自然结束（指定 count 时），返回是否已结束"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _read_loop(self, stream):
+        try:
+            for lines in stream.iter_batches(4096):
+                for line in lines:
+                    self._handle_line(line)
+        finally:
+            stream.close()
+            if self.count and not self._stopped:
+                # 正常结束时仍未收到回包的序号都是丢包
+                self._mark_all_lost(self.count)
+            self._ended_at = time.monotonic()
+
+    def _handle_line(self, line):
+        index, _, text = line.partition(b" ")
+        if not index.isdigit() or int(index) >= len(self.targets):
+            return
+        target = self.targets[int(index)]
+        stats = self.stats[target]
+        match = REPLY_PATTERN.search(text)
+        if match:
+            seq, rtt = int(match.group(1)), float(match.group(2))
+            with self._lock:
+                lost = stats.on_reply(seq, rtt, time.monotonic())
+            if lost is not None:
+                self._notify(target, lost, seq, rtt)
+
+    def _mark_all_lost(self, up_to_seq):
+        with self._lock:
+            lost = [(target, stats.mark_lost(up_to_seq)) for target, stats in self.stats.items()]
+        for target, seqs in lost:
+            self._notify(target, seqs)
+
+    def _notify(self, target, lost, seq=None, rtt=None):
+        if self.on_reply is None:
+            return
+        for lost_seq in lost:
+            self.on_reply(target, lost_seq, None)
+        if seq is not None:
+            self.on_reply(target, seq, rtt)
+
+    def expire(self, now=None):
+        """
+        持续探测时，把早该收到回包却仍无音讯的序号计为丢包（目标完全不可达时 ping 不输出任何行）。
+        每个目标以最近一个回包的序号与到达时刻推算后续序号的应到时间（尚无回包时以启动时刻为基准），
+        ping 启动慢或输出有停顿都不会整体提前判丢；判丢后迟到的回包仍会改记为收到。
+        snapshot() 会先调用它
+        """
+        if self._started_at is None:
+            return
+        now = time.monotonic() if now is None else now
+        if self._ended_at is not None:
+            now = min(now, self._ended_at)
+        expired = []
+        with self._lock:
+            for target, stats in self.stats.items():
+                # 尚无回包时，把启动时刻看作序号 0 的到达时刻减一个间隔（序号 1 在启动时发出）
+                seq, at = stats.anchor or (0, self._started_at - self.interval)
+                overdue = seq + math.floor((now - at - REPLY_TIMEOUT - LOSS_GRACE) / self.interval)
+                if self.count:
+                    overdue = min(overdue, self.count)
+                expired.append((target, stats.mark_lost(overdue)))
+        for target, lost in expired:
+            self._notify(target, lost)
+
+    def snapshot(self):
+        """{目标: 统计}，按目标添加顺序"""
+        self.expire()
+        with self._lock:
+            return {target: stats.snapshot() for target, stats in self.stats.items()}
@@ -0,0 +1,329 @@
+import mmap
+import os
+import queue
+import shutil
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+
+from androidToolbox.services.logcat_store import parse_logcat_line
+
+# 索引项：首/末时间戳、首条 seq、行数、段号、段内偏移、压缩长度、原始长度
+_INDEX_ENTRY = struct.Struct("<ddQIIQII")
+_INDEX_FILE = "index.bin"
+
+
+class _IndexView:
+    """以 mmap 方式只读访问索引文件，文件增长后自动重新映射"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self.count = 0
+
+    def refresh(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        count = size // _INDEX_ENTRY.size
+        if count == self.count and self._map is not None:
+            return
+        self.close()
+        if count == 0:
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), count * _INDEX_ENTRY.size, access=mmap.ACCESS_READ)
+        self.count = count
+
+    def entry(self, i):
+        return _INDEX_ENTRY.unpack_from(self._map, i * _INDEX_ENTRY.size)
+
+    def column(self, field):
+        """把第 field 列包装成可供 bisect 使用的只读序列"""
+        return _Column(self, field)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.count = 0
+
+
+class _Column:
+    def __init__(self, view, field):
+        self._view = view
+        self._field = field
+
+    def __len__(self):
+        return self._view.count
+
+    def __getitem__(self, i):
+        return self._view.entry(i)[self._field]
+
+
+class LogArchive:
+    """
+    logcat 落盘归档：后台线程把日志按块（默认 4096 行）zlib 压缩后追加到滚动的段文件，
+    每块在 index.bin 中记录一条定长索引（时间范围、seq 范围、文件位置），
+    读取端通过 mmap 二分索引，按时间或 seq 直接定位到块，不需要扫描。
+    内存中只保留当前未落盘的一个块，通宵抓取的内存占用也是有界的。
+    """
+
+    def __init__(self, directory, segment_size=64 * 1024 * 1024, block_lines=4096,
+                 flush_interval=1.0, max_segments=None, compress_level=1):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.block_lines = block_lines
+        self.flush_interval = flush_interval
+        # 最多保留的段文件数，None 表示不限
+        self.max_segments = max_segments
+        self.compress_level = compress_level
+
+        self._index_path = os.path.join(directory, _INDEX_FILE)
+        self._view = _IndexView(self._index_path)
+        self._read_lock = threading.Lock()
+        self._block_cache = None
+        self._open()
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=256)
+        self._index_file = open(self._index_path, 'ab')
+
+        self._segment_id = 0
+        self._segment_file = None
+        self._segment_bytes = 0
+        self._open_segments = []
+        # 各段第一块的首条 seq；first_seq 为仍可取回的最小 seq（旧段轮转删除后前移）
+        self._segment_first_seq = {}
+        self.first_seq = 0
+        # 当前未落盘的块
+        self._block = []
+        self._block_first_seq = 0
+        self._block_first_ts = 0.0
+        self._block_last_ts = 0.0
+        self._last_ts = 0.0
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    # ============ 写入（任意线程） ============
+
+    def write(self, first_seq, lines, stamps=None):
+        """
+        提交一批连续的原始行（bytes，不含换行），first_seq 为第一行的 seq；
+        stamps 为调用方已解析出的逐行时间戳，省略时由写线程自行解析
+        """
+        self._queue.put((first_seq, lines, stamps))
+
+    def flush(self, timeout=5):
+        """等待此前提交的数据全部落盘"""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(("close", None))
+            self._thread.join(timeout=5)
+        with self._read_lock:
+            self._view.close()
+
+    def reset(self):
+        """丢弃全部归档数据（清空日志时调用），之后可继续写入"""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._block_cache = None
+        self._open()
+
+    # ============ 读取 ============
+
+    def stats(self):
+        with self._read_lock:
+            self._view.refresh()
+            blocks = self._view.count
+        size = 0
+        for name in os.listdir(self.directory):
+            size += os.path.getsize(os.path.join(self.directory, name))
+        return {"blocks": blocks, "segments": self._segment_id, "disk_bytes": size}
+
+    def iter_blocks(self, start=0, stop=None):
+        """按索引顺序产出 (索引项, list[bytes])，被轮转删除的段自动跳过"""
+        with self._read_lock:
+            self._view.refresh()
+            stop = self._view.count if stop is None else min(stop, self._view.count)
+            entries = [self._view.entry(i) for i in range(start, stop)]
+        for entry in entries:
+            lines = self._read_block(entry)
+            if lines is not None:
+                yield entry, lines
+
+    def read_time_range(self, t0=None, t1=None):
+        """产出时间戳位于 [t0, t1] 的原始行；通过索引二分定位首尾块"""
+        with self._read_lock:
+            self._view.refresh()
+            # 块按写入顺序排列，末时间戳近似单调
+            start = 0 if t0 is None else bisect_left(self._view.column(1), t0)
+            stop = self._view.count if t1 is None else bisect_right(self._view.column(0), t1)
+        for entry, lines in self.iter_blocks(start, stop):
+            if (t0 is None or entry[0] >= t0) and (t1 is None or entry[1] <= t1):
+                yield from lines
+                continue
+            for line in lines:
+                parsed = parse_logcat_line(line)
+                ts = parsed[0] if parsed else entry[0]
+                if (t0 is None or ts >= t0) and (t1 is None or ts <= t1):
+                    yield line
+
+    def scan(self, t0=None, t1=None, stop_seq=None):
+        """
+        按时间粗定位后逐块产出 (seq, 原始行)，只含 seq < stop_seq 的行；
+        供检索超出内存索引窗口的旧日志时顺序扫描
+        """
+        with self._read_lock:
+            self._view.refresh()
+            start = 0 if t0 is None else bisect_left(self._view.column(1), t0)
+            stop = self._view.count if t1 is None else bisect_right(self._view.column(0), t1)
+        for entry, lines in self.iter_blocks(start, stop):
+            first = entry[2]
+            if stop_seq is not None and first >= stop_seq:
+                return
+            for i, line in enumerate(lines):
+                if stop_seq is not None and first + i >= stop_seq:
+                    return
+                yield first + i, line
+
+    def read_seq(self, seq):
+        """按 seq 读取单行（LogStore 已淘汰的旧日志由此取回），不存在时返回 None"""
+        with self._read_lock:
+            self._view.refresh()
+            i = bisect_right(self._view.column(2), seq) - 1
+            if i < 0:
+                return None
+            entry = self._view.entry(i)
+            cached = self._block_cache
+        if seq >= entry[2] + entry[3]:
+            return None
+        # 连续按 seq 读取时通常落在同一块，缓存最近解压的一块
+        if cached is not None and cached[0] == entry:
+            lines = cached[1]
+        else:
+            lines = self._read_block(entry)
+            if lines is None:
+                return None
+            self._block_cache = (entry, lines)
+        return lines[seq - entry[2]]
+
+    def export(self, file_path):
+        """流式导出全部归档：逐块解压写出，不在内存中拼接整个日志"""
+        self.flush()
+        with open(file_path, 'wb') as out:
+            for _, lines in self.iter_blocks():
+                out.write(b"\n".join(lines))
+                out.write(b"\n")
+
+    def _read_block(self, entry):
+        _, _, _, _, segment_id, offset, comp_len, _ = entry
+        try:
+            with open(self._segment_path(segment_id), 'rb') as f:
+                f.seek(offset)
+                data = zlib.decompress(f.read(comp_len))
+        except (OSError, zlib.error):
+            return None
+        return data.split(b"\n")
+
+    # ============ 写线程 ============
+
+    def _segment_path(self, segment_id):
+        return os.path.join(self.directory, f"seg_{segment_id:06d}.zlog")
+
+    def _writer_loop(self):
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.05, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None:
+                pass
+            elif item[0] == "flush":
+                self._flush_block()
+                item[1].set()
+            elif item[0] == "close":
+                self._flush_block()
+                self._close_files()
+                return
+            else:
+                self._append(*item)
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_block()
+                last_flush = time.monotonic()
+
+    def _append(self, first_seq, lines, stamps):
+        for offset, line in enumerate(lines):
+            if not self._block:
+                self._block_first_seq = first_seq + offset
+            if stamps is not None:
+                ts = stamps[offset]
+            else:
+                parsed = parse_logcat_line(line)
+                ts = parsed[0] if parsed else self._last_ts
+            self._last_ts = ts
+            if not self._block:
+                self._block_first_ts = ts
+            self._block_last_ts = ts
+            self._block.append(line.rstrip(b"\r"))
+            if len(self._block) >= self.block_lines:
+                self._flush_block()
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        raw = b"\n".join(self._block)
+        data = zlib.compress(raw, self.compress_level)
+        segment = self._current_segment(len(data))
+        offset = self._segment_bytes
+        segment.write(data)
+        segment.flush()
+        self._segment_bytes += len(data)
+
+        self._index_file.write(_INDEX_ENTRY.pack(
+            self._block_first_ts, self._block_last_ts, self._block_first_seq,
+            len(self._block), self._segment_id, offset, len(data), len(raw)))
+        self._index_file.flush()
+        self._block = []
+
+    def _current_segment(self, incoming):
+        if self._segment_file is None or self._segment_bytes + incoming > self.segment_size:
+            if self._segment_file is not None:
+                self._segment_file.close()
+            self._segment_id += 1
+            self._segment_file = open(self._segment_path(self._segment_id), 'wb')
+            self._segment_bytes = 0
+            self._open_segments.append(self._segment_id)
+            self._segment_first_seq[self._segment_id] = self._block_first_seq
+            if self.max_segments and len(self._open_segments) > self.max_segments:
+                old = self._open_segments.pop(0)
+                del self._segment_first_seq[old]
+                self.first_seq = self._segment_first_seq[self._open_segments[0]]
+                try:
+                    os.remove(self._segment_path(old))
+                except OSError:
+                    pass
+        return self._segment_file
+
+    def _close_files(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+        self._index_file.close()
@@ -0,0 +1,147 @@
+import re
+import shlex
+
+from androidToolbox.services.logcat_store import LEVELS
+
+
+def _trie_pattern(patterns):
+    """
+    把多个字面量合并为一棵前缀树，再展开成单个正则（bytes）。
+    匹配时 re 引擎沿前缀树分支前进，一次扫描即可判断是否命中任意一个模式，
+    效果上等价于 Aho-Corasick 的单遍多模式匹配，扫描本身在 C 层完成。
+    """
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        # 只需判断“是否命中”，更长的模式被更短的前缀覆盖
+        node.clear()
+        node[None] = True
+
+    def build(node):
+        if None in node or not node:
+            return b""
+        singles = []
+        branches = []
+        for byte in sorted(node):
+            sub = build(node[byte])
+            escaped = re.escape(bytes([byte]))
+            if sub:
+                branches.append(escaped + sub)
+            else:
+                singles.append(escaped)
+        if singles:
+            branches.append(singles[0] if len(singles) == 1 else b"[" + b"".join(singles) + b"]")
+        if len(branches) == 1:
+            return branches[0]
+        return b"(?:" + b"|".join(branches) + b")"
+
+    return build(trie)
+
+
+class MultiPatternMatcher:
+    """多个字面量的单遍匹配器，输入为 bytes"""
+
+    def __init__(self, patterns, ignore_case=False):
+        self.patterns = [p.encode('utf-8') if isinstance(p, str) else p for p in patterns if p]
+        self._regex = None
+        if self.patterns:
+            flags = re.IGNORECASE if ignore_case else 0
+            self._regex = re.compile(_trie_pattern(self.patterns), flags)
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def search(self, data):
+        """命中任意模式返回 True"""
+        return self._regex is not None and self._regex.search(data) is not None
+
+
+class LogcatFilter:
+    """
+    logcat 过滤条件：
+    - 设备端：tag/level/pid/regex 编译为 logcat 的 filterspec 与 --pid / --regex 参数，
+      不满足的日志在设备上就被丢弃，不占用 USB 带宽；
+    - 主机端：include / exclude 关键字合并为单遍多模式匹配，作用于原始字节行。
+    """
+
+    def __init__(self, tags=None, min_level=None, pid=None, regex=None,
+                 includes=(), excludes=(), ignore_case=False):
+        # tags: {tag: 最低级别} 或 tag 列表（列表时使用 min_level 或 V）
+        if tags and not isinstance(tags, dict):
+            tags = {tag: (min_level or "V") for tag in tags}
+        self.tags = dict(tags or {})
+        self.min_level = min_level.upper() if min_level else None
+        self.pid = int(pid) if pid else None
+        self.regex = regex or None
+        self.includes = [p for p in includes if p]
+        self.excludes = [p for p in excludes if p]
+        self.ignore_case = ignore_case
+        self._include = MultiPatternMatcher(self.includes, ignore_case)
+        self._exclude = MultiPatternMatcher(self.excludes, ignore_case)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        从过滤框文本构造：空格分隔，支持
+        tag=Name[:L]、level=W、pid=123、re=正则、-关键字（排除），其余为包含关键字
+        """
+        tags = {}
+        kwargs = {"includes": [], "excludes": []}
+        for token in shlex.split(text or ""):
+            key, sep, value = token.partition("=")
+            if sep and key == "tag" and value:
+                name, _, level = value.partition(":")
+                tags[name] = level.upper() if level else None
+            elif sep and key == "level" and value:
+                kwargs["min_level"] = value[0]
+            elif sep and key == "pid" and value.isdigit():
+                kwargs["pid"] = value
+            elif sep and key == "re" and value:
+                kwargs["regex"] = value
+            elif token.startswith("-") and len(token) > 1:
+                kwargs["excludes"].append(token[1:])
+            else:
+                kwargs["includes"].append(token)
+        level = kwargs.get("min_level")
+        if tags:
+            kwargs["tags"] = {name: (lv or level or "V") for name, lv in tags.items()}
+        return cls(**kwargs)
+
+    # ============ 设备端 ============
+
+    def device_args(self):
+        """logcat 命令行参数（未转义），供 ADBManager.open_logcat 使用"""
+        args = []
+        if self.pid:
+            args.append(f"--pid={self.pid}")
+        if self.regex:
+            args.append(f"--regex={self.regex}")
+        for tag, level in self.tags.items():
+            args.append(f"{tag}:{level}")
+        if self.tags:
+            # 指定了 tag 时其余 tag 静默
+            args.append("*:S")
+        elif self.min_level and self.min_level in LEVELS and self.min_level != "V":
+            args.append(f"*:{self.min_level}")
+        return args
+
+    # ============ 主机端 ============
+
+    def has_host_patterns(self):
+        return bool(self._include) or bool(self._exclude)
+
+    def accepts(self, line):
+        """主机端判断单行（bytes）是否保留"""
+        if self._include and not self._include.search(line):
+            return False
+        if self._exclude and self._exclude.search(line):
+            return False
+        return True
+
+    def apply(self, lines):
+        """批量过滤一批原始行"""
+        if not self.has_host_patterns():
+            return lines
+        return [line for line in lines if self.accepts(line)]
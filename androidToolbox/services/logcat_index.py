@@ -0,0 +1,314 @@
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from androidToolbox.services.logcat_store import LEVELS, level_rank
+
+# 消息分词：ASCII 单词（转小写）与连续的非 ASCII 字节（中文等）
+_TOKEN_RE = re.compile(rb"[a-z0-9_]{3,}|[\x80-\xff]+")
+# 非 ASCII 串中的单个 UTF-8 字符
+_CHAR_RE = re.compile(rb"[\xc0-\xff][\x80-\xbf]*|[\x80-\xbf]")
+# 纯数字与含数字的十六进制串（pid、毫秒数、地址、计数器等）：几乎每个值都不同，不进入倒排索引
+_NUMERIC_RE = re.compile(rb"(?:0x)?[0-9a-f]*[0-9][0-9a-f]*")
+# 每行最多索引的词数，避免超长行撑大索引
+MAX_TERMS_PER_LINE = 64
+# 词典最多收录的不同词数，超出后新词不再建倒排表（检索时改为逐条校验）
+MAX_TERMS = 200000
+
+
+def tokenize(data):
+    """
+    把消息（bytes 或 str）切分成去重后的词（bytes），用于建索引与精确校验。
+    中文等非 ASCII 串按相邻两字切分（只有一个字时保留单字），词中任意两字都能命中
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    terms = []
+    for token in _TOKEN_RE.findall(data.lower()):
+        if token[0] < 0x80:
+            terms.append(token)
+            continue
+        chars = _CHAR_RE.findall(token)
+        if len(chars) == 1:
+            terms.append(token)
+        else:
+            terms.extend(chars[i] + chars[i + 1] for i in range(len(chars) - 1))
+    return list(dict.fromkeys(terms))[:MAX_TERMS_PER_LINE]
+
+
+def indexable(term):
+    """词是否进入倒排索引（数字、地址类的词只做精确校验）"""
+    return _NUMERIC_RE.fullmatch(term) is None
+
+
+class LogQuery:
+    """
+    查询条件，由 parse() 从文本构造，各子句以 AND 连接，例如：
+    tag=ActivityManager AND level>=W between 10:02 and 10:05
+    支持：tag=、pid=、level=、level>=、between A and B、after T、before T，
+    其余单词作为消息关键词（全部命中）。时间只写时分秒时按 ref_ts 所在日期解释。
+    """
+
+    def __init__(self, tag=None, pid=None, levels=None, terms=(), t0=None, t1=None, substrings=()):
+        self.tag = tag
+        self.pid = pid
+        # 允许的级别集合，None 表示不限
+        self.levels = levels
+        self.terms = list(terms)
+        # 不能整体作为一个词检索的关键词（过短、单个汉字、含标点等），按子串校验
+        self.substrings = list(substrings)
+        self.t0 = t0
+        self.t1 = t1
+
+    @classmethod
+    def parse(cls, text, ref_ts=None):
+        ref = time.localtime(ref_ts if ref_ts is not None else time.time())
+        tokens = text.split()
+        query = cls()
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            low = token.lower()
+            if low == "and":
+                # 子句之间的连接词
+                i += 1
+                continue
+            if low == "between" and i + 3 < len(tokens) and tokens[i + 2].lower() == "and":
+                query.t0 = cls._parse_time(tokens[i + 1], ref)
+                query.t1 = cls._parse_time(tokens[i + 3], ref, end=True)
+                i += 4
+                continue
+            if low in ("after", "before") and i + 1 < len(tokens):
+                if low == "after":
+                    query.t0 = cls._parse_time(tokens[i + 1], ref)
+                else:
+                    query.t1 = cls._parse_time(tokens[i + 1], ref, end=True)
+                i += 2
+                continue
+
+            m = re.match(r"^(tag|pid|level)\s*(>=|=)\s*(.+)$", token, re.IGNORECASE)
+            if m:
+                key, op, value = m.group(1).lower(), m.group(2), m.group(3)
+                if key == "tag":
+                    query.tag = value
+                elif key == "pid":
+                    if not value.isdigit():
+                        raise ValueError(f"pid 必须是数字: {value}")
+                    query.pid = int(value)
+                else:
+                    rank = level_rank(value[:1].upper())
+                    if rank < 0:
+                        raise ValueError(f"未知级别: {value}")
+                    query.levels = set(LEVELS[rank:]) if op == ">=" else {LEVELS[rank]}
+            else:
+                query._add_keyword(token)
+            i += 1
+        return query
+
+    def _add_keyword(self, word):
+        """可建索引的词加入 terms 缩小候选范围；关键词不恰好是一个词时另按子串校验"""
+        word = word.lower().encode('utf-8')
+        # 单个汉字没有对应的两字词，不参与索引检索
+        terms = [t for t in tokenize(word) if t[0] < 0x80 or len(_CHAR_RE.findall(t)) > 1]
+        self.terms += terms
+        if terms != [word]:
+            self.substrings.append(word)
+
+    @staticmethod
+    def _parse_time(text, ref, end=False):
+        """HH:MM[:SS] -> 时间戳；只写到分钟的结束时间包含整分钟"""
+        try:
+            parts = [int(p) for p in text.split(":")]
+        except ValueError:
+            raise ValueError(f"时间格式应为 HH:MM[:SS]: {text}")
+        h, m, s = (parts + [0, 0])[:3]
+        ts = time.mktime((ref.tm_year, ref.tm_mon, ref.tm_mday, h, m, s, 0, 0, -1))
+        if end and len(parts) == 2:
+            ts += 59.999
+        return ts
+
+    def matches(self, ts, pid, level, tag, raw):
+        """对单条记录做精确校验（索引只负责缩小候选范围）"""
+        if self.t0 is not None and ts < self.t0:
+            return False
+        if self.t1 is not None and ts > self.t1:
+            return False
+        if self.tag is not None and tag != self.tag:
+            return False
+        if self.pid is not None and pid != self.pid:
+            return False
+        if self.levels is not None and level not in self.levels:
+            return False
+        if self.terms:
+            words = set(tokenize(raw))
+            if not all(term in words for term in self.terms):
+                return False
+        if self.substrings:
+            if isinstance(raw, str):
+                raw = raw.encode('utf-8')
+            raw = raw.lower()
+            return all(word in raw for word in self.substrings)
+        return True
+
+
+class LogIndex:
+    """
+    增量构建的日志倒排索引：tag / pid / 级别 / 消息词 -> 升序 seq 列表（array），
+    外加按 bucket_seconds 分桶的时间索引（桶起始时间 -> 首条 seq）。
+    查询时用最短的倒排表驱动，其余条件二分判定，时间条件先换算成 seq 区间。
+    数字类的词不建索引，词典最多 max_terms 个词；prune() 丢弃旧的索引项，
+    索引只覆盖 first_seq 之后的日志。
+    """
+
+    def __init__(self, bucket_seconds=10, max_terms=MAX_TERMS):
+        self.bucket_seconds = bucket_seconds
+        self.max_terms = max_terms
+        # 索引覆盖的最小 seq（更早的已被 prune）
+        self.first_seq = 0
+        # 词典已满时被拒收的词所在的最大 seq：此前缺失的词不能据此判定为不存在
+        self._overflow_seq = -1
+        self._tags = {}
+        self._pids = {}
+        self._levels = {}
+        self._terms = {}
+        self._bucket_ts = array('d')
+        self._bucket_seq = array('Q')
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _post(table, key, seq):
+        postings = table.get(key)
+        if postings is None:
+            # 4 字节 seq：单次抓取上限约 42 亿行
+            postings = table[key] = array('I')
+        postings.append(seq)
+
+    def add_records(self, rows):
+        """追加 LogStore.scan() 产出的记录元组（seq 递增）"""
+        terms = self._terms
+        with self._lock:
+            for seq, ts, pid, level, tag, raw in rows:
+                bucket = ts - ts % self.bucket_seconds
+                if not self._bucket_ts or bucket > self._bucket_ts[-1]:
+                    self._bucket_ts.append(bucket)
+                    self._bucket_seq.append(seq)
+                self._post(self._tags, tag, seq)
+                self._post(self._pids, pid, seq)
+                self._post(self._levels, level, seq)
+                for term in tokenize(raw):
+                    if not indexable(term):
+                        continue
+                    if term in terms or len(terms) < self.max_terms:
+                        self._post(terms, term, seq)
+                    else:
+                        self._overflow_seq = seq
+                self._next_seq = seq + 1
+
+    def prune(self, min_seq):
+        """丢弃 seq < min_seq 的索引项（对应日志已无法取回、或超出索引窗口时调用）"""
+        with self._lock:
+            if min_seq <= self.first_seq:
+                return
+            self.first_seq = min_seq
+            for table in (self._tags, self._pids, self._levels, self._terms):
+                for key in list(table):
+                    postings = table[key]
+                    cut = bisect_left(postings, min_seq)
+                    if cut == len(postings):
+                        del table[key]
+                    elif cut:
+                        del postings[:cut]
+            cut = max(0, bisect_left(self._bucket_seq, min_seq) - 1)
+            if cut:
+                del self._bucket_ts[:cut]
+                del self._bucket_seq[:cut]
+
+    def clear(self):
+        with self._lock:
+            for table in (self._tags, self._pids, self._levels, self._terms):
+                table.clear()
+            self.first_seq = self._next_seq
+            self._overflow_seq = -1
+            del self._bucket_ts[:]
+            del self._bucket_seq[:]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tags": len(self._tags),
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._terms.values()),
+                "buckets": len(self._bucket_ts),
+                "next_seq": self._next_seq,
+            }
+
+    def search(self, query, limit=1000, after=0):
+        """
+        返回满足索引条件、且 seq >= after 的候选 seq（升序，最多 limit 条），
+        调用方需用 query.matches 精确校验，不足时以最后一个候选 +1 作为 after 继续取
+        """
+        with self._lock:
+            lo, hi = self._seq_range(query.t0, query.t1)
+            lo = max(lo, after, self.first_seq)
+            lists = []
+            if query.tag is not None:
+                lists.append(self._tags.get(query.tag))
+            if query.pid is not None:
+                lists.append(self._pids.get(query.pid))
+            for term in query.terms:
+                postings = self._terms.get(term)
+                # 数字类的词、或词典满后才出现的词没有倒排表，只由 query.matches 校验
+                if postings is None and (not indexable(term) or lo <= self._overflow_seq):
+                    continue
+                lists.append(postings)
+            if any(postings is None for postings in lists):
+                return []
+            level_lists = None
+            if query.levels is not None:
+                level_lists = [self._levels[lv] for lv in query.levels if lv in self._levels]
+                if not level_lists:
+                    return []
+
+            if lists:
+                lists.sort(key=len)
+                driver, others = lists[0], lists[1:]
+                candidates = driver[bisect_left(driver, lo):bisect_left(driver, hi)]
+            elif level_lists is not None:
+                # 只有级别条件：按区间切出各级别的倒排表后归并，代价与命中数成正比
+                others = []
+                candidates = heapq.merge(*(p[bisect_left(p, lo):bisect_left(p, hi)] for p in level_lists))
+                level_lists = None
+            else:
+                others = []
+                candidates = range(lo, hi)
+
+            result = []
+            for seq in candidates:
+                if all(_contains(postings, seq) for postings in others) and (
+                        level_lists is None or any(_contains(p, seq) for p in level_lists)):
+                    result.append(seq)
+                    if len(result) >= limit:
+                        break
+            return result
+
+    def _seq_range(self, t0, t1):
+        """时间条件 -> 候选 seq 半开区间（按桶粒度放宽）"""
+        lo, hi = 0, self._next_seq
+        if t0 is not None and self._bucket_ts:
+            i = bisect_right(self._bucket_ts, t0) - 1
+            if i >= 0:
+                lo = self._bucket_seq[i]
+        if t1 is not None and self._bucket_ts:
+            i = bisect_right(self._bucket_ts, t1)
+            if i < len(self._bucket_seq):
+                hi = self._bucket_seq[i]
+        return lo, max(lo, hi)
+
+
+def _contains(postings, seq):
+    i = bisect_left(postings, seq)
+    return i < len(postings) and postings[i] == seq
@@ -1,44 +1,310 @@
 import threading
 import queue
 from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.channel import BoundedChannel
+from androidToolbox.services.logcat_archive import LogArchive
+from androidToolbox.services.logcat_filter import LogcatFilter
+from androidToolbox.services.logcat_index import LogIndex, LogQuery
+from androidToolbox.services.logcat_store import LEVEL_RAW, LogRecord, LogStore, parse_logcat_line
+from androidToolbox.services.session_record import STREAM_LOGCAT
+
+# 日志存储的默认内存预算（字节）
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# 导出时每批从 LogStore 读取的记录数
+EXPORT_BATCH = 10000
+# 读取线程与解析线程之间最多积压的行数
+DEFAULT_QUEUE_LINES = 200000
+# 有归档时倒排索引最多覆盖的行数（更早的归档日志检索时顺序扫描）
+DEFAULT_INDEX_LINES = 1000000
+# -v time 行首时间戳长度："01-02 10:02:03.456"
+_STAMP_LEN = 18
+
 
 class LogcatService:
-    def __init__(self):
+    def __init__(self, serial=None, memory_budget=DEFAULT_MEMORY_BUDGET, archive_dir=None,
+                 queue_lines=DEFAULT_QUEUE_LINES, queue_policy=BoundedChannel.BLOCK, indexed=True,
+                 max_segments=None, index_lines=DEFAULT_INDEX_LINES):
+        # 目标设备序列号，None 表示 adb 默认设备
+        self.serial = serial
         self.stop_event = threading.Event()
-        self.log_queue = queue.Queue()
+        # 读取线程整块放入的原始行批次 (list[bytes])，由解析线程消费；
+        # 有界，写满时按 queue_policy 阻塞读取或丢弃，并统计接收/丢弃/送达行数
+        self.channel = BoundedChannel(queue_lines, queue_policy)
+        # 结构化日志存储，UI 和过滤都从这里读取
+        self.store = LogStore(memory_budget)
+        # 可选的落盘归档：保存完整抓取，LogStore 只保留最近的部分
+        self.archive = LogArchive(archive_dir, max_segments=max_segments) if archive_dir else None
+        # 倒排索引 + 时间索引，供 query() 检索全部已抓取日志；只做转发的场景（如无界面模式）可关闭
+        self.index = LogIndex() if indexed else None
+        self.index_lines = index_lines
+        self.log_filter = LogcatFilter()
+        # 可选的会话录制（SessionRecorder），过滤后的原始行同时写入
+        self.recorder = None
         self.worker_thread = None
+        self.ingest_thread = None
+        self._stream = None
+        self._reader_lock = threading.Lock()
+        # 串行化 ingest 与 clear，避免清空时归档被重置到一半仍在写入
+        self._ingest_lock = threading.Lock()
+        # 最近一条日志的时间戳及该时刻的所有行，用于重连时去重
+        self._last_stamp = b""
+        self._last_stamp_lines = set()
+        self._resuming = False
+        # get_logs 的读取游标（下一条待取的 seq）
+        self._cursor = 0
 
-    def start_capture(self, filter_str=""):
-        """启动日志抓取线程"""
+    def start_capture(self, filter_str="", log_filter=None, resume=False, clear_device=True):
+        """
+        启动日志抓取线程。
+        resume=True 用于设备断开重连后继续抓取：不清空设备缓存，从最后一条日志的时间续读。
+        clear_device=False 时首次启动也不清空设备缓存（设备与其他工具共用时），从缓存中现有的日志开始读取。
+        adb 流打不开时抛出 OSError，此时没有启动任何线程，可直接重试
+        """
         if self.is_running():
             return
 
+        if log_filter is None:
+            log_filter = LogcatFilter(includes=[filter_str]) if filter_str else LogcatFilter()
+        self.log_filter = log_filter
         self.stop_event.clear()
-        # 清除缓存
-        ADBManager.run("logcat -c")
-        
-        # 启动后台线程
-        self.worker_thread = threading.Thread(
-            target=ADBManager.stream_logcat,
-            args=(filter_str, self.stop_event, self.log_queue),
-            daemon=True
-        )
-        self.worker_thread.start()
+        if not resume:
+            if clear_device:
+                # 清除缓存
+                ADBManager.run("logcat -c", serial=self.serial)
+            self._last_stamp = b""
+            self._last_stamp_lines = set()
+            self._resuming = False
+            self.channel.reset_counters()
+
+        # 启动后台线程：读取线程只负责搬运字节，解析在独立的写入线程完成
+        self._start_reader(resume)
+        self.ingest_thread = threading.Thread(target=self._ingest_loop, daemon=True)
+        self.ingest_thread.start()
 
     def stop_capture(self):
         """停止日志抓取"""
-        if self.is_running():
-            self.stop_event.set()
-            self.worker_thread.join(timeout=1)
+        self.stop_event.set()
+        with self._reader_lock:
+            if self._stream is not None:
+                self._stream.close()
+            worker = self.worker_thread
             self.worker_thread = None
+        if worker is not None:
+            worker.join(timeout=1)
+        if self.ingest_thread is not None:
+            self.ingest_thread.join(timeout=1)
+            self.ingest_thread = None
 
     def is_running(self):
-        return self.worker_thread is not None and self.worker_thread.is_alive()
+        worker = self.worker_thread
+        return worker is not None and worker.is_alive()
 
-    def get_logs(self):
-        """生成器：非阻塞地获取当前队列中的所有日志"""
-        while not self.log_queue.empty():
+    def set_filter(self, log_filter):
+        """
+        在线修改过滤条件：主机端关键字立即生效；
+        设备端参数变化时只重连 logcat 流（用 -T 从最后一条日志的时间续读），
+        已抓取的日志与解析线程都保持不变。
+        """
+        old = self.log_filter
+        self.log_filter = log_filter
+        if self.is_running() and log_filter.device_args() != old.device_args():
             try:
-                yield self.log_queue.get_nowait()
+                self._start_reader(resume=True)
+            except OSError:
+                # 新的流没有打开，旧的流仍在读取，过滤条件保持与之一致
+                self.log_filter = old
+                raise
+
+    def _start_reader(self, resume=False):
+        args = self.log_filter.device_args()
+        resuming = resume and bool(self._last_stamp)
+        if resuming:
+            args = ["-T", self._last_stamp.decode('ascii', errors='ignore')] + args
+        stream = ADBManager.open_logcat(args, self.serial)
+        if resuming:
+            self._resuming = True
+        with self._reader_lock:
+            old_stream = self._stream
+            self._stream = stream
+            self.worker_thread = threading.Thread(target=self._read_loop, args=(stream,), daemon=True)
+            self.worker_thread.start()
+        if old_stream is not None:
+            old_stream.close()
+
+    def _read_loop(self, stream):
+        """读取线程：整批搬运原始行，不做解析"""
+        try:
+            for lines in stream.iter_batches(ADBManager.LOGCAT_CHUNK_SIZE):
+                if self.stop_event.is_set() or stream.closed:
+                    break
+                # block 策略下等待解析线程腾出空间，期间仍响应停止
+                while not self.channel.put(lines, timeout=0.2):
+                    if self.stop_event.is_set() or stream.closed:
+                        return
+        finally:
+            stream.close()
+
+    def _ingest_loop(self):
+        """解析线程：批量取出原始行写入 LogStore，抓取停止且队列清空后退出"""
+        while True:
+            try:
+                batch = self.channel.get(timeout=0.2)
             except queue.Empty:
-                break
\ No newline at end of file
+                if (self.stop_event.is_set() or not self.is_running()) and self.channel.empty():
+                    return
+                continue
+            batch = self._drop_replayed(batch)
+            batch = self.log_filter.apply(batch)
+            if batch:
+                recorder = self.recorder
+                if recorder is not None:
+                    recorder.record_many(STREAM_LOGCAT, batch)
+                self.ingest(batch)
+
+    def ingest(self, batch):
+        """把一批原始行（list[bytes]）写入存储、归档与索引；回放录制的会话时也直接调用"""
+        with self._ingest_lock:
+            first_seq, next_seq = self.store.extend(batch)
+            if self.archive is None and self.index is None:
+                return
+            rows = self.store.scan(first_seq, next_seq)
+            if self.archive is not None:
+                # 时间戳沿用 LogStore 的解析结果；批次大到部分行已被淘汰时由归档自行解析
+                stamps = [row[1] for row in rows] if len(rows) == len(batch) else None
+                self.archive.write(first_seq, batch, stamps)
+            if self.index is not None:
+                self.index.add_records(rows)
+                self._prune_index()
+
+    def _prune_index(self):
+        """
+        定期清理索引，使其内存有界：没有归档时只覆盖 LogStore 仍保留的日志；
+        有归档时最多覆盖最近 index_lines 行，且不早于归档轮转后仍保留的段
+        （超出索引窗口的归档日志由 query() 顺序扫描）
+        """
+        if self.archive is None:
+            floor, step = self.store.first_seq, self.store.capacity // 4
+        else:
+            floor = max(self.archive.first_seq, self.store.next_seq - self.index_lines)
+            step = self.index_lines // 4
+        # 攒够一批再清理，prune 需要遍历整个词典
+        if floor - self.index.first_seq > step:
+            self.index.prune(floor)
+
+    def _drop_replayed(self, batch):
+        """丢弃 -T 续读时重复下发的行，并记录本批最后的时间戳"""
+        last = self._last_stamp
+        if self._resuming and last:
+            start = 0
+            while start < len(batch):
+                stamp = batch[start][:_STAMP_LEN]
+                if stamp < last or (stamp == last and batch[start] in self._last_stamp_lines):
+                    start += 1
+                else:
+                    break
+            if start:
+                batch = batch[start:]
+            if batch:
+                self._resuming = False
+        if batch:
+            stamp = batch[-1][:_STAMP_LEN]
+            if stamp[:1].isdigit():
+                if stamp != last:
+                    self._last_stamp = stamp
+                    self._last_stamp_lines = set()
+                for line in reversed(batch):
+                    if line[:_STAMP_LEN] != stamp:
+                        break
+                    self._last_stamp_lines.add(line)
+        return batch
+
+    def queue_stats(self):
+        """读取队列的统计：received / dropped / delivered / pending（行数）"""
+        return self.channel.stats()
+
+    def get_logs(self):
+        """非阻塞地获取上次读取之后新增的所有日志记录（LogRecord）"""
+        records = self.store.read(self._cursor)
+        self._cursor = self.store.next_seq
+        return records
+
+    def query(self, text, limit=500):
+        """
+        检索已抓取的日志，返回 LogRecord 列表（按时间顺序，最多 limit 条）。
+        语法见 LogQuery，例如 "tag=ActivityManager AND level>=W between 10:02 and 10:05"。
+        不依赖 GUI，无界面调用方可直接使用。
+        """
+        if self.index is None:
+            raise ValueError("未启用日志索引，无法检索")
+        latest = self.store.get(self.store.next_seq - 1)
+        query = LogQuery.parse(text, latest.ts if latest else None)
+        results = []
+        # 早于索引窗口、仍在归档中的日志：按时间粗定位后顺序扫描
+        if self.archive is not None and self.index.first_seq > self.archive.first_seq:
+            for seq, line in self.archive.scan(query.t0, query.t1, self.index.first_seq):
+                record = self._record_from_line(seq, line)
+                if query.matches(record.ts, record.pid, record.level, record.tag, record.raw):
+                    results.append(record)
+                    if len(results) >= limit:
+                        return results
+        after = 0
+        while len(results) < limit:
+            candidates = self.index.search(query, limit, after)
+            for seq in candidates:
+                record = self._resolve(seq)
+                if record is not None and query.matches(
+                        record.ts, record.pid, record.level, record.tag, record.raw):
+                    results.append(record)
+                    if len(results) >= limit:
+                        break
+            if len(candidates) < limit:
+                break
+            after = candidates[-1] + 1
+        return results
+
+    def _resolve(self, seq):
+        """按 seq 取回记录：优先 LogStore，已淘汰的从归档读取"""
+        record = self.store.get(seq)
+        if record is not None or self.archive is None:
+            return record
+        line = self.archive.read_seq(seq)
+        if line is None:
+            return None
+        return self._record_from_line(seq, line)
+
+    @staticmethod
+    def _record_from_line(seq, line):
+        parsed = parse_logcat_line(line)
+        if parsed is None:
+            return LogRecord(seq, 0.0, 0, 0, LEVEL_RAW, "", line)
+        ts, pid, tid, level, tag, msg = parsed
+        return LogRecord(seq, ts, pid, tid, chr(level), tag.decode('utf-8', errors='replace'), msg)
+
+    def export(self, file_path):
+        """导出日志：有归档时流式复制全部段，否则从 LogStore 分批写出"""
+        if self.archive is not None:
+            self.archive.export(file_path)
+            return
+        store = self.store
+        with open(file_path, 'w', encoding='utf-8') as f:
+            seq, end = store.first_seq, store.next_seq
+            while seq < end:
+                records = store.read(seq, min(end, seq + EXPORT_BATCH))
+                f.writelines(record.line + "\n" for record in records)
+                seq += EXPORT_BATCH
+
+    def clear(self):
+        """清空已抓取的日志"""
+        with self._ingest_lock:
+            self.store.clear()
+            if self.index is not None:
+                self.index.clear()
+            self._cursor = self.store.next_seq
+            if self.archive is not None:
+                self.archive.reset()
+
+    def close(self):
+        """停止抓取并关闭归档文件"""
+        self.stop_capture()
+        if self.archive is not None:
+            self.archive.close()
@@ -0,0 +1,300 @@
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# 日志级别从低到高，用于 level>=W 之类的比较
+LEVELS = "VDIWEF"
+# 无法解析的行（如 "--------- beginning of main"）使用的级别
+LEVEL_RAW = "?"
+
+# -v time:       01-02 10:02:03.456 E/ActivityManager( 1234): message
+_TIME_RE = re.compile(
+    rb'^(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d{3}) ([VDIWEFAS])/(.*?)\(\s*(\d+)\): ?(.*)$', re.S)
+# -v threadtime: 01-02 10:02:03.456  1234  5678 E ActivityManager: message
+_THREADTIME_RE = re.compile(
+    rb'^(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d{3})\s+(\d+)\s+(\d+) ([VDIWEFAS]) (.*?)\s*: ?(.*)$', re.S)
+
+# (月, 日) -> 当天零点的本地时间戳
+_day_base_cache = {}
+
+
+def _day_base(month, day):
+    key = (month, day)
+    base = _day_base_cache.get(key)
+    if base is None:
+        year = time.localtime().tm_year
+        base = time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+        _day_base_cache[key] = base
+    return base
+
+
+def parse_logcat_line(line):
+    """
+    解析一行 logcat（bytes，支持 -v time 与 -v threadtime），
+    返回 (ts, pid, tid, level, tag, message)，无法解析时返回 None。
+    tag 与 message 保持 bytes，由调用方决定何时解码。
+    """
+    line = line.rstrip(b"\r\n")
+    m = _TIME_RE.match(line)
+    if m:
+        mo, dd, hh, mi, ss, ms, level, tag, pid, msg = m.groups()
+        tid = pid
+    else:
+        m = _THREADTIME_RE.match(line)
+        if not m:
+            return None
+        mo, dd, hh, mi, ss, ms, pid, tid, level, tag, msg = m.groups()
+    ts = _day_base(int(mo), int(dd)) + int(hh) * 3600 + int(mi) * 60 + int(ss) + int(ms) / 1000
+    return ts, int(pid), int(tid), level[0], tag.strip(), msg
+
+
+def level_rank(level):
+    """级别字符在 LEVELS 中的序号，未知级别返回 -1"""
+    return LEVELS.find(level) if level else -1
+
+
+class LogRecord:
+    """从 LogStore 读出的一条结构化日志，消息正文在首次访问时才解码"""
+
+    __slots__ = ("seq", "ts", "pid", "tid", "level", "tag", "raw", "_message")
+
+    def __init__(self, seq, ts, pid, tid, level, tag, raw):
+        self.seq = seq
+        self.ts = ts
+        self.pid = pid
+        self.tid = tid
+        self.level = level
+        self.tag = tag
+        # 原始消息字节
+        self.raw = raw
+        self._message = None
+
+    @property
+    def message(self):
+        if self._message is None:
+            self._message = self.raw.decode('utf-8', errors='replace')
+        return self._message
+
+    @property
+    def line(self):
+        """还原为 -v time 格式的一行文本"""
+        if self.level == LEVEL_RAW:
+            return self.message
+        stamp = time.strftime("%m-%d %H:%M:%S", time.localtime(self.ts))
+        ms = int(round((self.ts % 1) * 1000)) % 1000
+        return f"{stamp}.{ms:03d} {self.level}/{self.tag}({self.pid:5d}): {self.message}"
+
+    def __repr__(self):
+        return f"LogRecord(seq={self.seq}, {self.line!r})"
+
+
+class LogStore:
+    """
+    固定内存预算的列式日志环形缓冲区。
+    每条记录拆成定长列（时间戳、pid、tid、级别字节、tag 编号、消息偏移/长度），
+    消息正文写入一块循环使用的字节区（arena）。写满后最旧的记录被覆盖，
+    因此长时间抓取的内存占用恒定。序号 seq 单调递增，可作为读取游标。
+    """
+
+    # 每条记录的列开销：d + i + i + B + I + Q + I
+    RECORD_BYTES = 8 + 4 + 4 + 1 + 4 + 8 + 4
+
+    def __init__(self, memory_budget=64 * 1024 * 1024, avg_message_size=96):
+        self.capacity = max(16, memory_budget // (self.RECORD_BYTES + avg_message_size))
+        self.arena_size = max(4096, memory_budget - self.capacity * self.RECORD_BYTES)
+
+        cap = self.capacity
+        self._ts = array('d', [0.0]) * cap
+        self._pid = array('i', [0]) * cap
+        self._tid = array('i', [0]) * cap
+        self._level = array('B', [0]) * cap
+        self._tag = array('I', [0]) * cap
+        self._off = array('Q', [0]) * cap
+        self._len = array('I', [0]) * cap
+        self._arena = bytearray(self.arena_size)
+
+        # tag 驻留表：编号 0 保留给无法解析的行
+        self._tag_ids = {b"": 0}
+        self._tag_names = [""]
+
+        self._first = 0
+        self._next = 0
+        # arena 的逻辑写指针（单调递增），物理位置为取模结果
+        self._head = 0
+        # 因容量或 arena 覆盖而被淘汰的记录数（clear 不计入）
+        self.evicted = 0
+        self._last_ts = 0.0
+        self._lock = threading.Lock()
+
+    # ============ 写入 ============
+
+    def append(self, line):
+        """解析并追加一行（bytes），返回分配的 seq"""
+        with self._lock:
+            return self._append_locked(line)
+
+    def extend(self, lines):
+        """批量追加多行，只获取一次锁，返回 (first_seq, next_seq)"""
+        with self._lock:
+            start = self._next
+            for line in lines:
+                self._append_locked(line)
+            return start, self._next
+
+    def _append_locked(self, line):
+        parsed = parse_logcat_line(line)
+        if parsed is None:
+            ts, pid, tid, level, tag_id = self._last_ts, 0, 0, ord(LEVEL_RAW), 0
+            msg = line.rstrip(b"\r\n")
+        else:
+            ts, pid, tid, level, tag, msg = parsed
+            tag_id = self._tag_ids.get(tag)
+            if tag_id is None:
+                tag_id = len(self._tag_names)
+                self._tag_ids[tag] = tag_id
+                self._tag_names.append(tag.decode('utf-8', errors='replace'))
+            self._last_ts = ts
+
+        offset = self._write_arena(msg)
+
+        seq = self._next
+        slot = seq % self.capacity
+        self._ts[slot] = ts
+        self._pid[slot] = pid
+        self._tid[slot] = tid
+        self._level[slot] = level
+        self._tag[slot] = tag_id
+        self._off[slot] = offset
+        self._len[slot] = len(msg) if len(msg) < self.arena_size else self.arena_size
+        self._next = seq + 1
+
+        # 淘汰：超出记录容量，或消息正文已被新数据覆盖
+        first = self._first
+        if self._next - first > self.capacity:
+            first = self._next - self.capacity
+        floor = self._head - self.arena_size
+        while first < self._next and self._off[first % self.capacity] < floor:
+            first += 1
+        self.evicted += first - self._first
+        self._first = first
+        return seq
+
+    def _write_arena(self, msg):
+        size = len(msg)
+        if size > self.arena_size:
+            msg = msg[:self.arena_size]
+            size = self.arena_size
+        phys = self._head % self.arena_size
+        if phys + size > self.arena_size:
+            # 不跨越尾部：跳到 arena 开头
+            self._head += self.arena_size - phys
+            phys = 0
+        self._arena[phys:phys + size] = msg
+        offset = self._head
+        self._head += size
+        return offset
+
+    def clear(self):
+        with self._lock:
+            self._first = self._next
+            self._head = 0
+
+    # ============ 读取 ============
+
+    @property
+    def first_seq(self):
+        return self._first
+
+    @property
+    def next_seq(self):
+        return self._next
+
+    def __len__(self):
+        return self._next - self._first
+
+    def tag_name(self, tag_id):
+        return self._tag_names[tag_id]
+
+    def tag_id(self, tag):
+        """tag 名对应的编号，未出现过返回 None"""
+        return self._tag_ids.get(tag.encode('utf-8') if isinstance(tag, str) else tag)
+
+    def _record_locked(self, seq):
+        slot = seq % self.capacity
+        phys = self._off[slot] % self.arena_size
+        return LogRecord(seq, self._ts[slot], self._pid[slot], self._tid[slot],
+                         chr(self._level[slot]), self._tag_names[self._tag[slot]],
+                         bytes(self._arena[phys:phys + self._len[slot]]))
+
+    def get(self, seq):
+        """按 seq 读取一条记录，已被淘汰或尚未写入时返回 None"""
+        with self._lock:
+            if not self._first <= seq < self._next:
+                return None
+            return self._record_locked(seq)
+
+    def read(self, start, end=None, limit=None):
+        """读取 [start, end) 范围内仍然存在的记录"""
+        with self._lock:
+            start = max(start, self._first)
+            end = self._next if end is None else min(end, self._next)
+            if limit is not None:
+                end = min(end, start + limit)
+            return [self._record_locked(seq) for seq in range(start, end)]
+
+    def scan(self, start, end=None):
+        """
+        以元组形式批量读取 [start, end) 的字段，供索引等内部消费者使用：
+        (seq, ts, pid, level, tag, raw_message)，不构造 LogRecord
+        """
+        with self._lock:
+            start = max(start, self._first)
+            end = self._next if end is None else min(end, self._next)
+            cap, size, arena = self.capacity, self.arena_size, self._arena
+            result = []
+            for seq in range(start, end):
+                slot = seq % cap
+                phys = self._off[slot] % size
+                result.append((seq, self._ts[slot], self._pid[slot], chr(self._level[slot]),
+                               self._tag_names[self._tag[slot]],
+                               bytes(arena[phys:phys + self._len[slot]])))
+            return result
+
+    def level_of(self, seq):
+        with self._lock:
+            if not self._first <= seq < self._next:
+                return None
+            return chr(self._level[seq % self.capacity])
+
+    def find_time(self, ts):
+        """返回第一条时间戳 >= ts 的记录 seq（时间戳按写入顺序近似单调）"""
+        with self._lock:
+            first, cap, ts_col = self._first, self.capacity, self._ts
+            view = _SeqView(lambda i: ts_col[(first + i) % cap], self._next - first)
+            return first + bisect_left(view, ts)
+
+    def stats(self):
+        return {
+            "records": len(self),
+            "capacity": self.capacity,
+            "arena_bytes": self.arena_size,
+            "tags": len(self._tag_names),
+            "evicted": self.evicted,
+            "total": self._next,
+        }
+
+
+class _SeqView:
+    """把按下标取值的函数包装成 bisect 可用的只读序列"""
+
+    def __init__(self, getter, size):
+        self._getter = getter
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self._getter(index)
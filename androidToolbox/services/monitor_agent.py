@@ -0,0 +1,188 @@
+import hashlib
+import threading
+import time
+
+from androidToolbox.core.adb import ADBManager
+
+# 设备端采样脚本：只用 shell 内建命令读取 /proc，每轮除 sleep 外不启动任何进程。
+# 每轮输出一行：uptime|内存(键值)|/proc/stat 的 cpu 行|/proc/loadavg|;网卡 计数...;网卡 计数...
+AGENT_SCRIPT = r"""I=${1:-1}
+while :; do
+  read u _ < /proc/uptime
+  m=
+  while read k v _; do
+    case $k in
+      MemTotal:) m="$m T$v";; MemFree:) m="$m F$v";; MemAvailable:) m="$m A$v";;
+      Cached:) m="$m C$v";; SwapTotal:) m="$m S$v";; SwapFree:) m="$m W$v";;
+    esac
+  done < /proc/meminfo
+  read _ c < /proc/stat
+  read l < /proc/loadavg
+  n=
+  while IFS=: read i d; do
+    [ -n "$d" ] && n="$n;${i##* } $d"
+  done < /proc/net/dev
+  echo "$u|$m|$c|$l|$n"
+  sleep $I
+done
+"""
+# 脚本存放目录，文件名带内容摘要，脚本更新后自动重新下发
+AGENT_DIR = "/data/local/tmp"
+# 默认采样频率（Hz）与上限
+DEFAULT_RATE = 10
+MAX_RATE = 50
+_MEM_KEYS = {"T": "total_kb", "F": "free_kb", "A": "available_kb", "C": "cached_kb",
+             "S": "swap_total_kb", "W": "swap_free_kb"}
+
+
+class MonitorAgent:
+    """
+    设备端常驻采样代理：脚本只下发一次，在设备上按 rate 循环读取
+    /proc/meminfo、/proc/stat、/proc/net/dev、/proc/loadavg，
+    每轮输出一行紧凑记录，主机通过一条长连接逐行解码，不再每个指标每轮一次 adb 调用。
+    样本时间取设备 uptime 换算的墙钟时间，不受传输抖动影响。
+    on_sample(sample) 在读取线程中调用；传入 store（TimeSeriesStore）时数值指标自动写入。
+    """
+
+    def __init__(self, serial=None, rate=DEFAULT_RATE, store=None, on_sample=None):
+        self.serial = serial
+        self.rate = max(0.1, min(MAX_RATE, rate))
+        self.store = store
+        self.on_sample = on_sample
+        self.samples = 0
+        self.errors = 0
+        self._latest = None
+        self._previous = None
+        self._clock = None
+        self._stream = None
+        self._thread = None
+
+    @staticmethod
+    def script_path():
+        digest = hashlib.md5(AGENT_SCRIPT.encode('utf-8')).hexdigest()[:8]
+        return f"{AGENT_DIR}/atb_agent_{digest}.sh"
+
+    def command(self):
+        """设备端命令：脚本不存在时先写入，再以采样间隔为参数执行"""
+        path = self.script_path()
+        return (f"[ -f {path} ] || cat > {path} <<'ATB_AGENT_EOF'\n{AGENT_SCRIPT}ATB_AGENT_EOF\n"
+                f"exec sh {path} {1 / self.rate:.3f}")
+
+    # ============ 生命周期 ============
+
+    def start(self):
+        if self.running:
+            return self
+        self._previous = None
+        self._clock = None
+        self._stream = ADBManager.open_shell_stream(self.command(), self.serial)
+        self._thread = threading.Thread(target=self._read_loop, args=(self._stream,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self):
+        """最近一个样本，尚无样本时为 None"""
+        return self._latest
+
+    def _read_loop(self, stream):
+        try:
+            for lines in stream.iter_batches(16 * 1024):
+                for line in lines:
+                    self._handle_line(line)
+        finally:
+            stream.close()
+
+    def _handle_line(self, line):
+        try:
+            record = self.decode(line)
+        except (ValueError, IndexError):
+            self.errors += 1
+            return
+        if record is None:
+            return
+        sample = self.derive(record, self._previous)
+        self._previous = record
+        # 以首条记录为基准，把设备 uptime 换算成主机墙钟时间
+        if self._clock is None:
+            self._clock = time.time() - record["uptime"]
+        sample["ts"] = self._clock + record["uptime"]
+        self._latest = sample
+        self.samples += 1
+        if self.store is not None:
+            self.store.record(sample["metrics"], sample["ts"])
+        if self.on_sample is not None:
+            self.on_sample(sample)
+
+    # ============ 解码 ============
+
+    @staticmethod
+    def decode(line):
+        """解析一行原始记录（bytes），不是采样记录（如脚本写入时的提示）时返回 None"""
+        parts = line.decode('ascii', errors='ignore').strip().split("|")
+        if len(parts) != 5:
+            return None
+        uptime, mem, cpu, load, net = parts
+        memory = {_MEM_KEYS[item[0]]: int(item[1:]) for item in mem.split() if item[0] in _MEM_KEYS}
+        loadavg = load.split()
+        interfaces = {}
+        for entry in net.split(";"):
+            fields = entry.split()
+            if len(fields) >= 11:
+                # 接收：bytes packets ...（8 列），发送：bytes packets ...
+                interfaces[fields[0]] = (int(fields[1]), int(fields[2]), int(fields[9]), int(fields[10]))
+        return {
+            "uptime": float(uptime),
+            "memory": memory,
+            "cpu": [int(v) for v in cpu.split()],
+            "load": tuple(float(v) for v in loadavg[:3]),
+            "tasks": loadavg[3] if len(loadavg) > 3 else "",
+            "net": interfaces,
+        }
+
+    @staticmethod
+    def derive(record, previous=None):
+        """
+        由相邻两条记录计算样本：内存直接换算，CPU 占用与网络速率取差值；
+        没有上一条记录或计数器回绕 / 重置时，差值类指标为 None
+        """
+        memory = record["memory"]
+        total = memory.get("total_kb")
+        available = memory.get("available_kb")
+        metrics = {
+            "ram_available_mb": available // 1024 if available is not None else None,
+            "ram_used_percent": round(100.0 * (total - available) / total, 1) if total and available is not None else None,
+            "load1": record["load"][0] if record["load"] else None,
+            "cpu_percent": None,
+            "net_rx_kbps": None,
+            "net_tx_kbps": None,
+        }
+        if previous is not None:
+            dt = record["uptime"] - previous["uptime"]
+            cpu, last = record["cpu"], previous["cpu"]
+            # user nice system idle iowait irq softirq steal：idle 与 iowait 视为空闲
+            busy = sum(cpu[:8]) - sum(cpu[3:5])
+            busy_last = sum(last[:8]) - sum(last[3:5])
+            elapsed = sum(cpu[:8]) - sum(last[:8])
+            if elapsed > 0 and busy >= busy_last:
+                metrics["cpu_percent"] = round(100.0 * (busy - busy_last) / elapsed, 1)
+            if dt > 0:
+                rx = tx = 0
+                for name, counters in record["net"].items():
+                    old = previous["net"].get(name)
+                    if name == "lo" or old is None or counters[0] < old[0] or counters[2] < old[2]:
+                        continue
+                    rx += counters[0] - old[0]
+                    tx += counters[2] - old[2]
+                metrics["net_rx_kbps"] = round(rx * 8 / 1000 / dt, 1)
+                metrics["net_tx_kbps"] = round(tx * 8 / 1000 / dt, 1)
+        return {"memory": memory, "load": record["load"], "tasks": record["tasks"], "metrics": metrics}
@@ -1,29 +1,83 @@
 import re
-from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.probe import ProbeBundle
+from androidToolbox.services.monitor_agent import MonitorAgent
+from androidToolbox.services.network_service import NetworkService
 
 class MonitorService:
+    # 每次采样需要的设备端命令，由 ProbeBundle 合并成一次 adb 往返
+    PROBES = {
+        "meminfo": "cat /proc/meminfo",
+        "df_data": "df -h /data",
+    }
+
     @staticmethod
-    def get_resources():
+    def get_resources(serial=None):
         """获取内存和磁盘的聚合数据"""
+        return MonitorService.parse_resources(ProbeBundle(MonitorService.PROBES).run(serial))
+
+    @staticmethod
+    def sample(serial=None, store=None):
+        """
+        一次 adb 往返同时采集资源与网络状态，返回 {"resources", "network", "metrics"}；
+        metrics 为可绘图的数值指标，传入 store（TimeSeriesStore）时顺带写入
+        """
+        outputs = ProbeBundle.collect({
+            "monitor": MonitorService.PROBES,
+            "network": NetworkService.PROBES,
+        }, serial)
+        resources = MonitorService.parse_resources(outputs["monitor"])
+        network = NetworkService.parse_network_status(outputs["network"])
+        metrics = {
+            "ram_available_mb": resources["ram_available_mb"] or None,
+            "disk_free_mb": resources["disk_free_mb"],
+            "wifi_rssi": network["wifi_rssi"] if network["wifi_rssi"] > -127 else None,
+            "signal_level": network["mobile"]["level"],
+        }
+        if store is not None:
+            store.record(metrics)
+        return {"resources": resources, "network": network, "metrics": metrics}
+
+    @staticmethod
+    def agent(serial=None, rate=10, store=None, on_sample=None):
+        """
+        高频采样用的设备端代理（MonitorAgent）：脚本在设备上循环读取 /proc，
+        通过一条长连接推送记录，适合 1Hz 以上的采样；调用 start() 后开始推送
+        """
+        return MonitorAgent(serial, rate, store, on_sample)
+
+    @staticmethod
+    def parse_resources(outputs):
+        """解析 PROBES 的输出 {名称: 文本}"""
         data = {
             "ram_available_mb": 0,
-            "disk_info": "未知"
+            "disk_info": "未知",
+            "disk_free_mb": None
         }
 
         # 1. 内存解析
-        mem_out = ADBManager.run("shell cat /proc/meminfo")
+        mem_out = outputs.get("meminfo", "")
         match = re.search(r'MemAvailable:\s+(\d+)', mem_out)
         if match:
             data["ram_available_mb"] = int(match.group(1)) // 1024
 
         # 2. 磁盘解析
-        disk_out = ADBManager.run("shell df -h /data")
+        disk_out = outputs.get("df_data", "")
         try:
             line = disk_out.splitlines()[-1]
             parts = line.split()
             # 兼容不同 df 版本，通常可用空间在倒数几列
             data["disk_info"] = parts[3] if len(parts) >= 4 else "?"
+            data["disk_free_mb"] = MonitorService._size_to_mb(data["disk_info"])
         except:
             pass
             
-        return data
\ No newline at end of file
+        return data
+
+    @staticmethod
+    def _size_to_mb(text):
+        """df 的容量文本（如 12G、512M、1.5T，无单位时按 KB）换算为 MB"""
+        match = re.match(r'^([\d.]+)([KMGT]?)', text.upper())
+        if not match:
+            return None
+        scale = {"": 1 / 1024, "K": 1 / 1024, "M": 1, "G": 1024, "T": 1024 * 1024}[match.group(2)]
+        return round(float(match.group(1)) * scale, 1)
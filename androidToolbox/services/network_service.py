@@ -1,31 +1,49 @@
 import re
 from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.probe import ProbeBundle
 
 class NetworkService:
     """
     网络业务逻辑类：负责获取数据、分析数据
     """
     
+    # 每次采样需要的设备端命令，由 ProbeBundle 合并成一次 adb 往返
+    PROBES = {
+        "wifi": "dumpsys wifi | grep RSSI",
+        "telephony": "dumpsys telephony.registry",
+    }
+
     @staticmethod
-    def analyze_network_status():
+    def analyze_network_status(serial=None):
         """获取当前网络状态并返回结构化数据"""
-        
-        # 1. 获取并解析 WiFi
-        wifi_out = ADBManager.run("shell dumpsys wifi | grep RSSI")
+        return NetworkService.parse_network_status(ProbeBundle(NetworkService.PROBES).run(serial))
+
+    @staticmethod
+    def parse_network_status(outputs):
+        """解析 PROBES 的输出 {名称: 文本}"""
+
+        # 1. 解析 WiFi
+        wifi_out = outputs.get("wifi", "")
         rssi_match = re.search(r'RSSI:\s*(-?\d+)', wifi_out)
         wifi_rssi = int(rssi_match.group(1)) if rssi_match else -127
         
-        # 2. 获取并解析 移动网络
-        tele_out = ADBManager.run("shell dumpsys telephony.registry")
+        # 2. 解析 移动网络
+        tele_out = outputs.get("telephony", "")
         
         # 业务判断逻辑 (这里是纯逻辑，不涉及 UI 颜色)
         mobile_data = {
             "type": "未知/无SIM",
             "is_5g": False,
             "is_weak": False,
-            "warning": ""
+            "warning": "",
+            # 信号格数 0~4，取各制式中最高的一项，未知时为 None
+            "level": None
         }
 
+        levels = [int(v) for v in re.findall(r'\blevel=(\d)', tele_out)]
+        if levels:
+            mobile_data["level"] = max(levels)
+
         # 判断网络类型
         is_5g = "nrState=CONNECTED" in tele_out or "CellSignalStrengthNr" in tele_out
         
@@ -46,6 +64,6 @@ class NetworkService:
         }
 
     @staticmethod
-    def ping_target(target):
+    def ping_target(target, serial=None):
         """执行 Ping 任务"""
-        return ADBManager.run(f"shell ping -c 3 -W 1 {target}")
\ No newline at end of file
+        return ADBManager.run(f"shell ping -c 3 -W 1 {target}", serial=serial)
\ No newline at end of file
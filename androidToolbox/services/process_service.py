@@ -0,0 +1,140 @@
+import heapq
+from array import array
+
+from androidToolbox.core.probe import ProbeBundle
+
+try:
+    import numpy as np
+except ImportError:
+    # 没有 NumPy 时退回标准库 array，结果一致，只是差值与排序逐项计算
+    np = None
+
+# /proc/<pid>/stat 中 rss 的单位是页，按 4KB 页换算
+PAGE_KB = 4
+
+
+class ProcessTracker:
+    """
+    按进程统计 CPU 与内存（类似 top）：每轮一次 adb 往返读取 /proc/stat 与全部 /proc/<pid>/stat，
+    进程数据以数组保存，与上一轮按 pid 对齐后整体计算 CPU 占用，再选出前 N 个。
+    CPU 占用按单核计（100% 为占满一个核心），与 top 一致。
+    """
+
+    PROBES = {
+        "stat": "grep '^cpu' /proc/stat",
+        "procs": "cat /proc/[0-9]*/stat",
+    }
+
+    def __init__(self, serial=None):
+        self.serial = serial
+        self._previous = None
+        self._cpu_total = None
+
+    def reset(self):
+        self._previous = None
+        self._cpu_total = None
+
+    def sample(self, top=20, sort="cpu"):
+        """采集一轮并返回前 top 个进程；首轮没有差值，CPU 为 None，按内存排序"""
+        return self.update(ProbeBundle(self.PROBES).run(self.serial), top, sort)
+
+    def update(self, outputs, top=20, sort="cpu"):
+        """用 PROBES 的输出 {名称: 文本} 更新，返回 [{"pid", "name", "state", "cpu", "rss_mb"}, ...]"""
+        cpu_total, cores = self.parse_cpu(outputs.get("stat", ""))
+        pids, ticks, rss, names, states = self.parse_processes(outputs.get("procs", ""))
+        if not pids:
+            return []
+
+        previous, elapsed = self._previous, None
+        if self._cpu_total is not None and cpu_total > self._cpu_total:
+            elapsed = cpu_total - self._cpu_total
+        self._cpu_total = cpu_total
+
+        if np is not None:
+            rows = self._update_numpy(pids, ticks, rss, previous, elapsed, cores, top, sort)
+        else:
+            rows = self._update_array(pids, ticks, rss, previous, elapsed, cores, top, sort)
+        return [{"pid": pid, "name": names[i], "state": states[i], "cpu": cpu,
+                 "rss_mb": round(rss_kb / 1024, 1)} for i, pid, cpu, rss_kb in rows]
+
+    def _update_numpy(self, pids, ticks, rss, previous, elapsed, cores, top, sort):
+        pids = np.frombuffer(pids, dtype=np.int64)
+        ticks = np.frombuffer(ticks, dtype=np.int64)
+        rss = np.frombuffer(rss, dtype=np.int64) * PAGE_KB
+        order = np.argsort(pids, kind='stable')
+        sorted_pids, sorted_ticks = pids[order], ticks[order]
+        self._previous = (sorted_pids, sorted_ticks)
+
+        cpu = None
+        if previous is not None and elapsed:
+            prev_pids, prev_ticks = previous
+            # 按 pid 对齐上一轮：新进程与 pid 复用（计数变小）的差值记为 0
+            index = np.minimum(np.searchsorted(prev_pids, pids), len(prev_pids) - 1)
+            matched = prev_pids[index] == pids
+            delta = np.where(matched, ticks - prev_ticks[index], 0)
+            np.maximum(delta, 0, out=delta)
+            cpu = delta * (100.0 * cores / elapsed)
+
+        key = cpu if cpu is not None and sort == "cpu" else rss
+        count = min(top, len(key))
+        chosen = np.argpartition(-key, count - 1)[:count]
+        chosen = chosen[np.argsort(-key[chosen], kind='stable')]
+        return [(int(i), int(pids[i]), round(float(cpu[i]), 1) if cpu is not None else None, int(rss[i]))
+                for i in chosen]
+
+    def _update_array(self, pids, ticks, rss, previous, elapsed, cores, top, sort):
+        self._previous = (pids, ticks)
+        cpu = None
+        if previous is not None and elapsed:
+            prev = dict(zip(*previous))
+            scale = 100.0 * cores / elapsed
+            cpu = array('d', (max(0, t - prev.get(p, t)) * scale for p, t in zip(pids, ticks)))
+
+        key = cpu if cpu is not None and sort == "cpu" else rss
+        chosen = heapq.nlargest(top, range(len(key)), key=key.__getitem__)
+        return [(i, pids[i], round(cpu[i], 1) if cpu is not None else None, rss[i] * PAGE_KB)
+                for i in chosen]
+
+    @staticmethod
+    def parse_cpu(text):
+        """/proc/stat 的 cpu 行：返回 (总 jiffies, 核心数)"""
+        total, cores = 0, 0
+        for line in text.splitlines():
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "cpu":
+                # user nice system idle iowait irq softirq steal（guest 已计入 user）
+                total = sum(int(v) for v in fields[1:9])
+            elif fields[0].startswith("cpu"):
+                cores += 1
+        return total, max(1, cores)
+
+    @staticmethod
+    def parse_processes(text):
+        """
+        解析 /proc/<pid>/stat 行，返回 (pids, utime+stime, rss 页数) 三个 array('q') 及名称、状态列表；
+        进程名可能含空格和括号，以最后一个 ')' 为界
+        """
+        pids, ticks, rss = array('q'), array('q'), array('q')
+        names, states = [], []
+        for line in text.splitlines():
+            start, end = line.find(" ("), line.rfind(")")
+            if start <= 0 or end < start:
+                continue
+            fields = line[end + 2:].split()
+            if len(fields) < 22:
+                continue
+            try:
+                pid = int(line[:start])
+                # 第 14、15 列 utime / stime，第 24 列 rss（从 state 所在的第 3 列起算）
+                used = int(fields[11]) + int(fields[12])
+                pages = int(fields[21])
+            except ValueError:
+                continue
+            pids.append(pid)
+            ticks.append(used)
+            rss.append(pages)
+            names.append(line[start + 2:end])
+            states.append(fields[0])
+        return pids, ticks, rss, names, states
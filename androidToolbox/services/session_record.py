@@ -0,0 +1,305 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left
+
+# 录制的数据流：logcat 为原始日志行（bytes），其余为 JSON 对象
+STREAM_LOGCAT = "logcat"
+STREAM_MONITOR = "monitor"
+STREAM_NETWORK = "network"
+STREAMS = (STREAM_LOGCAT, STREAM_MONITOR, STREAM_NETWORK)
+
+_FILE_MAGIC = b"ATSESS"
+_FILE_VERSION = 1
+# 文件头：魔数、版本、元数据（JSON）长度
+_HEADER = struct.Struct("<6sHI")
+# 块头：魔数、首/末时间戳、记录数、压缩长度、原始长度
+_BLOCK_MAGIC = b"BLK1"
+_BLOCK = struct.Struct("<4sddIII")
+# 块内记录：时间戳、数据流编号、长度
+_RECORD = struct.Struct("<dBI")
+# 文件尾的块索引：块偏移、首/末时间戳、记录数；最后是索引位置、条数与魔数
+_INDEX_ENTRY = struct.Struct("<QddI")
+_TRAILER = struct.Struct("<QI4s")
+_TRAILER_MAGIC = b"ATIX"
+
+
+class SessionRecorder:
+    """
+    会话录制：把 logcat 行、监控样本、网络状态按时间戳追加到同一个文件。
+    文件头为自描述的 JSON 元数据（数据流名称与编码、设备、创建时间），
+    记录攒成块（默认 2048 条或 1 秒）后 zlib 压缩写入，关闭时在文件尾写入块索引；
+    异常退出没有索引时，读取端按块头顺序扫描重建，已写入的块不会丢失。
+    各数据流的写入可来自不同线程。
+    """
+
+    def __init__(self, path, metadata=None, block_records=2048, flush_interval=1.0, compress_level=1):
+        self.path = path
+        self.block_records = block_records
+        self.flush_interval = flush_interval
+        self.compress_level = compress_level
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault("created", time.time())
+        self.metadata["streams"] = list(STREAMS)
+        self.metadata["encoding"] = {STREAM_LOGCAT: "raw", STREAM_MONITOR: "json", STREAM_NETWORK: "json"}
+        self._stream_ids = {name: i for i, name in enumerate(STREAMS)}
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._count = 0
+        self._first_ts = None
+        self._last_ts = 0.0
+        self._opened_at = time.monotonic()
+        self._index = []
+        self.records = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        meta = json.dumps(self.metadata, ensure_ascii=False).encode('utf-8')
+        self._file.write(_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, len(meta)))
+        self._file.write(meta)
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def record(self, stream, payload, ts=None):
+        """写入一条记录：logcat 为 bytes，其余为可 JSON 序列化的对象"""
+        self.record_many(stream, [payload], ts)
+
+    def record_many(self, stream, payloads, ts=None):
+        """同一时刻的一批记录（如一批 logcat 行）"""
+        stream_id = self._stream_ids[stream]
+        if stream != STREAM_LOGCAT:
+            payloads = [json.dumps(p, ensure_ascii=False).encode('utf-8') for p in payloads]
+        with self._lock:
+            if self._file is None:
+                return
+            # 时间戳单调不减，保证块的时间范围有序
+            ts = max(time.time() if ts is None else ts, self._last_ts)
+            pack, buffer = _RECORD.pack, self._buffer
+            for payload in payloads:
+                buffer += pack(ts, stream_id, len(payload))
+                buffer += payload
+            if self._first_ts is None:
+                self._first_ts = ts
+                self._opened_at = time.monotonic()
+            self._last_ts = ts
+            self._count += len(payloads)
+            self.records += len(payloads)
+            if self._count >= self.block_records or time.monotonic() - self._opened_at >= self.flush_interval:
+                self._flush_block()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush_block()
+                self._file.flush()
+
+    def _flush_block(self):
+        if not self._count:
+            return
+        raw = bytes(self._buffer)
+        compressed = zlib.compress(raw, self.compress_level)
+        offset = self._file.tell()
+        self._file.write(_BLOCK.pack(_BLOCK_MAGIC, self._first_ts, self._last_ts, self._count,
+                                     len(compressed), len(raw)))
+        self._file.write(compressed)
+        self._index.append((offset, self._first_ts, self._last_ts, self._count))
+        self._buffer = bytearray()
+        self._count = 0
+        self._first_ts = None
+
+    def close(self):
+        """写出最后一块与块索引"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_block()
+            index_offset = self._file.tell()
+            for entry in self._index:
+                self._file.write(_INDEX_ENTRY.pack(*entry))
+            self._file.write(_TRAILER.pack(index_offset, len(self._index), _TRAILER_MAGIC))
+            self._file.close()
+            self._file = None
+
+
+class SessionReader:
+    """
+    以 mmap 只读打开录制文件：按文件尾的块索引（没有时扫描块头重建）二分定位时间范围，
+    只解压涉及的块，最近用过的几个块缓存解码结果，拖动回放位置时不必重复解压。
+    """
+
+    CACHE_BLOCKS = 8
+
+    def __init__(self, path):
+        self.path = path
+        self._cache = {}
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("录制文件为空")
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError("不是会话录制文件或版本不兼容")
+        magic, version, meta_len = _HEADER.unpack_from(self._map, 0)
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            self.close()
+            raise ValueError("不是会话录制文件或版本不兼容")
+        self.metadata = json.loads(self._map[_HEADER.size:_HEADER.size + meta_len].decode('utf-8'))
+        self.streams = self.metadata.get("streams", list(STREAMS))
+        self._data_start = _HEADER.size + meta_len
+        self.index = self._read_index()
+        # 各块末时间戳，供 bisect 定位
+        self._last_ts = [entry[2] for entry in self.index]
+
+    def _read_index(self):
+        size = len(self._map)
+        if size >= self._data_start + _TRAILER.size:
+            index_offset, count, magic = _TRAILER.unpack_from(self._map, size - _TRAILER.size)
+            if magic == _TRAILER_MAGIC and index_offset + count * _INDEX_ENTRY.size + _TRAILER.size == size:
+                return [_INDEX_ENTRY.unpack_from(self._map, index_offset + i * _INDEX_ENTRY.size)
+                        for i in range(count)]
+        return self._scan_blocks()
+
+    def _scan_blocks(self):
+        """没有索引（录制未正常结束）时顺序扫描块头，遇到不完整的块停止"""
+        index, offset, size = [], self._data_start, len(self._map)
+        while offset + _BLOCK.size <= size:
+            magic, first_ts, last_ts, count, comp_len, _ = _BLOCK.unpack_from(self._map, offset)
+            if magic != _BLOCK_MAGIC or offset + _BLOCK.size + comp_len > size:
+                break
+            index.append((offset, first_ts, last_ts, count))
+            offset += _BLOCK.size + comp_len
+        return index
+
+    def __len__(self):
+        return sum(entry[3] for entry in self.index)
+
+    def time_range(self):
+        """(最早, 最晚) 时间戳，没有记录时为 None"""
+        if not self.index:
+            return None
+        return self.index[0][1], self.index[-1][2]
+
+    def _block(self, i):
+        records = self._cache.get(i)
+        if records is not None:
+            return records
+        offset = self.index[i][0]
+        _, _, _, count, comp_len, _ = _BLOCK.unpack_from(self._map, offset)
+        start = offset + _BLOCK.size
+        raw = zlib.decompress(self._map[start:start + comp_len])
+        records, pos = [], 0
+        unpack, size = _RECORD.unpack_from, _RECORD.size
+        for _ in range(count):
+            ts, stream_id, length = unpack(raw, pos)
+            pos += size
+            records.append((ts, stream_id, raw[pos:pos + length]))
+            pos += length
+        if len(self._cache) >= self.CACHE_BLOCKS:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[i] = records
+        return records
+
+    def read(self, t0=None, t1=None, streams=None):
+        """
+        读取 [t0, t1) 内的记录，按时间顺序产出 (ts, 数据流, 内容)；
+        logcat 的内容为 bytes，其余为解码后的对象
+        """
+        wanted = None if streams is None else {self.streams.index(s) for s in streams if s in self.streams}
+        start = 0 if t0 is None else bisect_left(self._last_ts, t0)
+        for i in range(start, len(self.index)):
+            if t1 is not None and self.index[i][1] >= t1:
+                break
+            for ts, stream_id, payload in self._block(i):
+                if (t0 is not None and ts < t0) or (wanted is not None and stream_id not in wanted):
+                    continue
+                if t1 is not None and ts >= t1:
+                    break
+                name = self.streams[stream_id]
+                yield ts, name, payload if name == STREAM_LOGCAT else json.loads(payload)
+
+    def close(self):
+        self._cache.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class SessionPlayer:
+    """
+    按录制时的节奏回放：后台线程按 speed 倍速推进回放时钟，每个节拍把新到时间的记录
+    整批交给 on_records(records)；seek() 可任意跳转（拖动进度条），pause()/resume() 暂停继续。
+    on_records 在回放线程中调用，界面需自行切回主线程。
+    """
+
+    TICK = 0.05
+
+    def __init__(self, reader, on_records, speed=1.0, on_seek=None):
+        self.reader = reader
+        self.on_records = on_records
+        self.on_seek = on_seek
+        self.speed = speed
+        span = reader.time_range() or (0.0, 0.0)
+        self.start_ts, self.end_ts = span
+        self.position = self.start_ts
+        self.paused = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def play(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        self.paused = False
+        return self
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def seek(self, ts):
+        """跳转到 ts：on_seek(ts) 通知视图清空重建，之后从 ts 继续回放"""
+        with self._lock:
+            self.position = min(max(ts, self.start_ts), self.end_ts)
+            position = self.position
+        if self.on_seek is not None:
+            self.on_seek(position)
+
+    @property
+    def finished(self):
+        return self.position >= self.end_ts
+
+    def _loop(self):
+        last = time.monotonic()
+        while not self._stop.wait(self.TICK):
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            if self.paused or self.finished:
+                continue
+            with self._lock:
+                t0 = self.position
+                # 最后一条记录恰好在 end_ts，结尾处多取一点
+                t1 = min(t0 + elapsed * self.speed, self.end_ts)
+                self.position = t1
+            records = list(self.reader.read(t0, t1 if t1 < self.end_ts else None))
+            if records:
+                self.on_records(records)
@@ -0,0 +1,186 @@
+import threading
+import time
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.services.timeseries import TimeSeriesStore
+
+# 设备端采样脚本（{interval}、{per_uid} 由主机填入）：每轮先输出 "@ uptime"，
+# 再逐行输出 "n 网卡 计数..."，允许时输出 xt_qtaguid 的按 UID 计数 "u 网卡 uid 计数..."，最后以 "." 结束
+SAMPLER_SCRIPT = r"""Q=/proc/net/xt_qtaguid/stats
+while :; do
+  read u _ < /proc/uptime
+  echo "@ $u"
+  while IFS=: read i d; do
+    [ -n "$d" ] && echo "n ${i##* } $d"
+  done < /proc/net/dev
+  if [ {per_uid} = 1 ] && [ -r $Q ]; then
+    while read x i t uid s rb rp tb tp _; do
+      [ "$t" = 0x0 ] && echo "u $i $uid $rb $rp $tb $tp"
+    done < $Q
+  fi
+  echo .
+  sleep {interval}
+done
+"""
+# 不统计的网卡
+IGNORED_INTERFACES = ("lo", "dummy0", "sit0", "ip6tnl0", "ip_vti0", "ip6_vti0")
+# 计数器为 32 位时回绕的模
+WRAP_32 = 1 << 32
+# 默认保留的历史点数（按采样间隔换算时长）
+DEFAULT_HISTORY = 600
+RATE_KEYS = ("rx_kbps", "tx_kbps", "rx_pps", "tx_pps")
+
+
+def counter_delta(new, old):
+    """
+    计数器差值：变小时若像 32 位回绕则补上模，否则视为计数器重置（如网卡重建），返回 None
+    """
+    if new >= old:
+        return new - old
+    if old < WRAP_32 and new + WRAP_32 - old < WRAP_32 // 2:
+        return new + WRAP_32 - old
+    return None
+
+
+class ThroughputSampler:
+    """
+    按网卡的吞吐量采样：设备端脚本按 interval 循环读取 /proc/net/dev（设备允许时附带按 UID 的流量），
+    通过一条长连接推送，主机对相邻两轮的计数取差值，得到每个网卡（wlan0、rmnet* 等）
+    的收发字节速率（kbps）与包速率（pps）。
+    结果写入有界的 history（只保留原始点的 TimeSeriesStore，指标名为 "网卡.rx_kbps" 等），
+    可直接交给 TimeSeriesChart.refresh_from() 实时绘制。
+    """
+
+    def __init__(self, serial=None, interval=1.0, per_uid=False, history=DEFAULT_HISTORY, on_sample=None):
+        self.serial = serial
+        self.interval = max(0.1, interval)
+        self.per_uid = per_uid
+        self.history = TimeSeriesStore(levels=(), raw_capacity=history)
+        self.on_sample = on_sample
+        self.rates = {}
+        self.uid_rates = {}
+        self._previous = None
+        self._clock = None
+        self._stream = None
+        self._thread = None
+
+    def command(self):
+        return (SAMPLER_SCRIPT.replace("{interval}", f"{self.interval:g}")
+                .replace("{per_uid}", "1" if self.per_uid else "0"))
+
+    # ============ 生命周期 ============
+
+    def start(self):
+        if self.running:
+            return self
+        self._previous = None
+        self._clock = None
+        self._stream = ADBManager.open_shell_stream(self.command(), self.serial)
+        self._thread = threading.Thread(target=self._read_loop, args=(self._stream,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def interfaces(self):
+        """有流量数据的网卡，按名称排序"""
+        return sorted(self.rates)
+
+    def _read_loop(self, stream):
+        frame = None
+        try:
+            for lines in stream.iter_batches(16 * 1024):
+                for line in lines:
+                    try:
+                        frame = self._handle_line(frame, line)
+                    except ValueError:
+                        # 残缺的一轮整体丢弃
+                        frame = None
+        finally:
+            stream.close()
+
+    def _handle_line(self, frame, line):
+        """按行组装一轮数据，返回当前未完成的一轮"""
+        if line.startswith(b"@ "):
+            return {"uptime": float(line[2:]), "net": {}, "uid": {}}
+        if frame is None:
+            return None
+        if line.startswith(b"n "):
+            self._parse_interface(frame, line)
+        elif line.startswith(b"u "):
+            self._parse_uid(frame, line)
+        elif line.strip() == b".":
+            self._handle_frame(frame)
+            return None
+        return frame
+
+    @staticmethod
+    def _parse_interface(frame, line):
+        fields = line.split()
+        if len(fields) >= 12:
+            # 接收：bytes packets ...（8 列），发送：bytes packets ...
+            frame["net"][fields[1].decode()] = (int(fields[2]), int(fields[3]), int(fields[10]), int(fields[11]))
+
+    @staticmethod
+    def _parse_uid(frame, line):
+        fields = line.split()
+        if len(fields) < 7:
+            return
+        # 同一 UID 在各网卡、前后台计数集合上的流量合并
+        uid = int(fields[2])
+        counters = tuple(int(v) for v in fields[3:7])
+        old = frame["uid"].get(uid, (0, 0, 0, 0))
+        frame["uid"][uid] = tuple(a + b for a, b in zip(old, counters))
+
+    def _handle_frame(self, frame):
+        previous, self._previous = self._previous, frame
+        if self._clock is None:
+            # 以首轮为基准，把设备 uptime 换算成主机墙钟时间
+            self._clock = time.time() - frame["uptime"]
+        if previous is None:
+            return
+        dt = frame["uptime"] - previous["uptime"]
+        if dt <= 0:
+            return
+        ts = self._clock + frame["uptime"]
+        rates = self.compute_rates(frame["net"], previous["net"], dt, IGNORED_INTERFACES)
+        uid_rates = self.compute_rates(frame["uid"], previous["uid"], dt)
+        values = {}
+        for name, rate in rates.items():
+            for key in RATE_KEYS:
+                values[f"{name}.{key}"] = rate[key]
+        self.history.record(values, ts)
+        self.rates, self.uid_rates = rates, uid_rates
+        if self.on_sample is not None:
+            self.on_sample(ts, rates, uid_rates)
+
+    @staticmethod
+    def compute_rates(current, previous, dt, ignored=()):
+        """
+        {名称: (rx_bytes, rx_packets, tx_bytes, tx_packets)} 两轮之差除以 dt，
+        返回 {名称: {"rx_kbps", "tx_kbps", "rx_pps", "tx_pps"}}；新出现或计数器重置的项跳过
+        """
+        rates = {}
+        for name, counters in current.items():
+            old = previous.get(name)
+            if old is None or name in ignored:
+                continue
+            deltas = [counter_delta(new, last) for new, last in zip(counters, old)]
+            if None in deltas:
+                continue
+            rx_bytes, rx_packets, tx_bytes, tx_packets = deltas
+            rates[name] = {
+                "rx_kbps": round(rx_bytes * 8 / 1000 / dt, 1),
+                "tx_kbps": round(tx_bytes * 8 / 1000 / dt, 1),
+                "rx_pps": round(rx_packets / dt, 1),
+                "tx_pps": round(tx_packets / dt, 1),
+            }
+        return rates
@@ -0,0 +1,267 @@
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+# 默认的汇总分辨率（秒）与各级保留的桶数：10 秒 ×1 天、1 分钟 ×1 周、10 分钟 ×2 个月、1 小时 ×1 年
+DEFAULT_LEVELS = ((10, 8640), (60, 10080), (600, 8640), (3600, 8760))
+# 原始采样保留条数（2 秒采样约 2 小时）
+DEFAULT_RAW_CAPACITY = 3600
+
+_FILE_MAGIC = b"ATTS"
+_FILE_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_LEVEL_HEADER = struct.Struct("<dII")
+
+
+class _Ring:
+    """定长环形列存储：若干 array 列，逻辑下标 0..len-1 由旧到新"""
+
+    def __init__(self, capacity, typecodes):
+        self.capacity = capacity
+        self.typecodes = typecodes
+        self.columns = [array(code, [0]) * capacity for code in typecodes]
+        # 累计写入条数，slot = 逻辑序号 % capacity
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _slot(self, i):
+        return (self.count - len(self) + i) % self.capacity
+
+    def append(self, row):
+        slot = self.count % self.capacity
+        for column, value in zip(self.columns, row):
+            column[slot] = value
+        self.count += 1
+
+    def row(self, i):
+        slot = self._slot(i)
+        return tuple(column[slot] for column in self.columns)
+
+    def column(self, index):
+        """第 index 列的逻辑视图，供 bisect 使用"""
+        return _RingColumn(self, index)
+
+    def ordered(self):
+        """按逻辑顺序复制出各列（用于持久化）"""
+        start = self.count % self.capacity if self.count > self.capacity else 0
+        return [column[start:len(self)] + column[:start] if start else column[:len(self)]
+                for column in self.columns]
+
+
+class _RingColumn:
+    def __init__(self, ring, index):
+        self._ring = ring
+        self._column = ring.columns[index]
+
+    def __len__(self):
+        return len(self._ring)
+
+    def __getitem__(self, i):
+        return self._column[self._ring._slot(i)]
+
+
+class TimeSeries:
+    """
+    单个指标的时间序列：原始采样环 + 多级 min/max/mean 汇总环。
+    写入时增量更新每一级的当前桶，查询任意时间跨度时直接读取点数合适的那一级，
+    不需要扫描原始采样。
+    """
+
+    def __init__(self, levels=DEFAULT_LEVELS, raw_capacity=DEFAULT_RAW_CAPACITY):
+        self.raw = _Ring(raw_capacity, ('d', 'd'))
+        # 汇总列：桶起始时间、最小、最大、累加和、样本数
+        self.levels = [(float(resolution), _Ring(capacity, ('d', 'd', 'd', 'd', 'I')))
+                       for resolution, capacity in levels]
+        self.lock = threading.Lock()
+
+    def append(self, ts, value):
+        with self.lock:
+            raw = self.raw
+            if raw.count and ts < raw.columns[0][(raw.count - 1) % raw.capacity]:
+                # 时钟回拨等乱序样本直接丢弃，保证各级时间列单调
+                return
+            raw.append((ts, value))
+            for resolution, ring in self.levels:
+                bucket = ts - ts % resolution
+                if ring.count:
+                    # 直接在当前桶的槽位上累加
+                    slot = (ring.count - 1) % ring.capacity
+                    starts, lows, highs, totals, counts = ring.columns
+                    if starts[slot] == bucket:
+                        if value < lows[slot]:
+                            lows[slot] = value
+                        if value > highs[slot]:
+                            highs[slot] = value
+                        totals[slot] += value
+                        counts[slot] += 1
+                        continue
+                ring.append((bucket, value, value, value, 1))
+
+    def latest(self):
+        """最新一个采样 (ts, value)，没有时返回 None"""
+        with self.lock:
+            return self.raw.row(len(self.raw) - 1) if len(self.raw) else None
+
+    def query(self, t0=None, t1=None, max_points=600):
+        """
+        读取 [t0, t1] 内的数据，返回 [(ts, min, max, mean), ...]。
+        从原始采样开始逐级放宽，选取第一个点数不超过 max_points 且覆盖 t0 的级别
+        """
+        with self.lock:
+            candidates = [(0.0, self.raw)] + self.levels
+            chosen = None
+            for resolution, ring in candidates:
+                if not len(ring):
+                    continue
+                times = ring.column(0)
+                lo = 0 if t0 is None else bisect_left(times, t0 - resolution)
+                hi = len(ring) if t1 is None else bisect_right(times, t1)
+                # 未发生覆盖的级别包含全部历史，也视为覆盖
+                covers = t0 is None or times[0] <= t0 or ring.count <= ring.capacity
+                chosen = (ring, lo, hi)
+                if hi - lo <= max_points and covers:
+                    break
+            if chosen is None:
+                return []
+            ring, lo, hi = chosen
+            if ring is self.raw:
+                return [(ts, value, value, value) for ts, value in (ring.row(i) for i in range(lo, hi))]
+            return [(start, low, high, total / count)
+                    for start, low, high, total, count in (ring.row(i) for i in range(lo, hi))]
+
+    # ============ 持久化 ============
+
+    def dump(self, f):
+        with self.lock:
+            rings = [(0.0, self.raw)] + self.levels
+            f.write(_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, len(rings)))
+            for resolution, ring in rings:
+                f.write(_LEVEL_HEADER.pack(resolution, ring.capacity, len(ring)))
+                for column in ring.ordered():
+                    column.tofile(f)
+
+    def load(self, f):
+        """从 dump() 的输出恢复；分辨率匹配的级别才会载入，配置变化时其余级别从空开始"""
+        magic, version, ring_count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            raise ValueError("不是时间序列文件或版本不兼容")
+        rings = {resolution: ring for resolution, ring in [(0.0, self.raw)] + self.levels}
+        with self.lock:
+            for _ in range(ring_count):
+                resolution, capacity, length = _LEVEL_HEADER.unpack(f.read(_LEVEL_HEADER.size))
+                ring = rings.get(resolution)
+                typecodes = ring.typecodes if ring is not None else (
+                    ('d', 'd') if resolution == 0 else ('d', 'd', 'd', 'd', 'I'))
+                columns = []
+                for code in typecodes:
+                    column = array(code)
+                    column.fromfile(f, length)
+                    columns.append(column)
+                if ring is None:
+                    continue
+                for row in list(zip(*columns))[-ring.capacity:]:
+                    ring.append(row)
+
+
+class TimeSeriesStore:
+    """
+    多指标时间序列存储（指标名 -> TimeSeries），可选落盘：
+    directory 不为空时启动即载入历史，之后每 autosave_interval 秒及 close() 时保存，
+    每个指标一个文件，先写临时文件再替换，异常退出不会损坏已有数据。
+    """
+
+    def __init__(self, directory=None, levels=DEFAULT_LEVELS, raw_capacity=DEFAULT_RAW_CAPACITY,
+                 autosave_interval=60):
+        self.directory = directory
+        self._levels = levels
+        self._raw_capacity = raw_capacity
+        self.autosave_interval = autosave_interval
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        if directory:
+            self.load()
+
+    def series(self, name):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = TimeSeries(self._levels, self._raw_capacity)
+            return series
+
+    def names(self):
+        with self._lock:
+            return sorted(self._series)
+
+    def append(self, name, value, ts=None):
+        self.series(name).append(time.time() if ts is None else ts, value)
+        self._maybe_save()
+
+    def record(self, values, ts=None):
+        """一次写入多个指标 {名称: 数值}，None 值跳过"""
+        ts = time.time() if ts is None else ts
+        for name, value in values.items():
+            if value is not None:
+                self.series(name).append(ts, value)
+        self._maybe_save()
+
+    def query(self, name, t0=None, t1=None, max_points=600):
+        with self._lock:
+            series = self._series.get(name)
+        return series.query(t0, t1, max_points) if series is not None else []
+
+    def latest(self, name):
+        with self._lock:
+            series = self._series.get(name)
+        return series.latest() if series is not None else None
+
+    # ============ 持久化 ============
+
+    @staticmethod
+    def _file_name(name):
+        return re.sub(r"[^\w.-]", "_", name) + ".ts"
+
+    def _maybe_save(self):
+        if self.directory and time.monotonic() - self._last_save >= self.autosave_interval:
+            self.save()
+
+    def save(self):
+        if not self.directory:
+            return
+        self._last_save = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            items = list(self._series.items())
+        for name, series in items:
+            path = os.path.join(self.directory, self._file_name(name))
+            tmp = path + ".tmp"
+            with open(tmp, 'wb') as f:
+                f.write(name.encode('utf-8') + b"\n")
+                series.dump(f)
+            os.replace(tmp, path)
+
+    def load(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".ts"):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name), 'rb') as f:
+                    name = f.readline().rstrip(b"\n").decode('utf-8')
+                    series = TimeSeries(self._levels, self._raw_capacity)
+                    series.load(f)
+            except (OSError, ValueError, EOFError, struct.error):
+                # 损坏或旧版本的文件忽略，不影响其他指标
+                continue
+            with self._lock:
+                self._series[name] = series
+
+    def close(self):
+        self.save()
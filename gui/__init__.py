@@ -1,7 +1,20 @@
 """Android Toolbox GUI - 用户界面层"""
+import importlib
 
-from gui.main_window import MainWindow
-from gui.tab.network_tab import NetworkTab
-from gui.tab.logcat_tab import LogcatTab
+# 按需导入（PEP 562）：导入 gui.main_window 时不连带加载各个页面
+_EXPORTS = {
+    "MainWindow": "gui.main_window",
+    "NetworkTab": "gui.tab.network_tab",
+    "LogcatTab": "gui.tab.logcat_tab",
+}
 
-__all__ = ["MainWindow", "NetworkTab", "LogcatTab", ]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
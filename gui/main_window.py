@@ -1,17 +1,32 @@
 import tkinter as tk
 from tkinter import ttk
-import threading
-import time
+import logging
+import os
+import queue
 
 # 引入底层 ADB 核心（用于全局初始化和设备检测）
 from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.scheduler import ProbeScheduler
+from androidToolbox.core.trace import startup_trace
 
-# 引入各个功能模块的 UI (View)
-from gui.tab.network_tab import NetworkTab
-from gui.tab.logcat_tab import LogcatTab
+# 各功能页面（gui.tab.*）及其服务在首次选中时才导入、创建
+from gui.widget.session_bar import SessionBar
+
+# 界面线程处理后台结果的间隔（毫秒）与单次最多处理条数
+UI_DRAIN_INTERVAL = 50
+UI_DRAIN_BATCH = 200
+# 指标历史的落盘目录（跨会话保留）
+METRICS_ROOT = os.path.join(os.path.expanduser("~"), ".androidToolbox", "metrics")
+# 等待首次设备列表的最长时间（秒）
+DEVICE_SYNC_TIMEOUT = 10
+# 标签页：名称与标题，顺序即显示顺序
+TABS = (("net", " 📶 网络诊断 "), ("log", " 📜 Logcat 日志 "), ("mon", " 📈 性能监控 "))
+# 隐藏的诊断页（adb 命令耗时统计等），按快捷键显示 / 隐藏
+DIAG_TAB = ("diag", " 🛠 诊断 ")
+DIAG_SHORTCUT = "<Control-Shift-KeyPress-D>"
 
 class MainWindow(tk.Tk):
-    def __init__(self):
+    def __init__(self, adb_status=None, print_trace=False):
         super().__init__()
         
         # 1. 窗口基础设置
@@ -20,16 +35,47 @@ class MainWindow(tk.Tk):
         self.minsize(600, 500)
         
         # 2. 全局初始化
-        # 检测 ADB 路径，确保后续模块调用时 ADBManager 已经准备好
-        adb_status_msg = ADBManager.init()
-        
-        # 3. UI 布局初始化
-        self._setup_status_bar(adb_status_msg)
+        # main.py 已检测过 ADB 路径时沿用其结果，直接运行本文件时才在这里检测
+        if adb_status is None:
+            adb_status = ADBManager.init()
+            startup_trace.mark("adb_init")
+        # 是否在拿到首次设备列表后输出启动耗时
+        self.print_trace = print_trace
+        self._painted = False
+
+        # 后台探针调度器：adb 调用都在调度线程中执行，结果经队列回到界面线程
+        self._ui_queue = queue.Queue()
+        self.scheduler = ProbeScheduler(post=self._post).start()
+        self._drain_ui_queue()
+
+        # 3. UI 布局初始化（各页面在首次选中时创建）
+        self.metrics = None
+        self._tabs = {}
+        self._setup_status_bar(adb_status)
         self._setup_notebook()
-        
-        # 4. 启动后台守护线程 (设备连接状态检测)
-        # daemon=True 保证主程序关闭时，这个线程也会自动结束
-        threading.Thread(target=self._device_checker_loop, daemon=True).start()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        startup_trace.mark("window")
+
+        # 4. 首次绘制后再接入设备注册表、创建当前页面，窗口先出现
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.update_idletasks()
+        self._painted = True
+        startup_trace.mark("first_paint")
+        # 订阅设备注册表（adb server 主动推送设备变化，无需轮询）
+        # 回调在注册表的后台线程中执行，经 _post 切回主线程刷新界面
+        registry = ADBManager.device_registry()
+        registry.subscribe(self._on_device_event)
+        self.scheduler.submit("device_sync", lambda: registry.wait_synced(DEVICE_SYNC_TIMEOUT),
+                              self._on_device_synced)
+        self._on_tab_change(None)
+
+    def _on_device_synced(self, synced, error):
+        startup_trace.mark("first_device" if synced else "device_timeout")
+        self._update_device_status()
+        if self.print_trace:
+            startup_trace.log()
 
     def _setup_status_bar(self, adb_msg):
         """初始化底部状态栏"""
@@ -47,19 +93,72 @@ class MainWindow(tk.Tk):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # --- 实例化各个 Tab 页面 ---
-        # 这里的 Tab 类只负责 UI 展示，它们内部会去调用 androidToolbox 里的 Service
-        self.tab_net = NetworkTab(self.notebook)
-        self.tab_log = LogcatTab(self.notebook)
-        
-        # --- 添加到 Notebook ---
-        self.notebook.add(self.tab_net, text=" 📶 网络诊断 ")
-        self.notebook.add(self.tab_log, text=" 📜 Logcat 日志 ")
+        # --- 添加占位页面 ---
+        # 真正的 Tab 页面在首次选中时创建到占位 Frame 中（见 tab()）
+        self._frames = {}
+        for name, title in TABS:
+            self._frames[name] = ttk.Frame(self.notebook)
+            self.notebook.add(self._frames[name], text=title)
+
+        # 会话录制 / 回放工具条（位于标签页上方）
+        self.session_bar = SessionBar(self, self._post, self.tab,
+                                      on_playback_end=lambda: self._on_tab_change(None))
+        self.session_bar.pack(fill='x', padx=5, before=self.notebook)
         
         # --- 绑定事件 ---
         # 当用户切换 Tab 时，触发 _on_tab_change 方法
         # 目的：为了节省性能，只在用户看得到的页面开启数据轮询
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_change)
+        self.bind_all(DIAG_SHORTCUT, self._toggle_diagnostics)
+
+    def _toggle_diagnostics(self, event=None):
+        """显示 / 隐藏诊断页：首次显示时创建，之后隐藏只是从标签栏移除"""
+        name, title = DIAG_TAB
+        frame = self._frames.get(name)
+        if frame is None:
+            frame = self._frames[name] = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+        elif self.notebook.tab(frame, "state") == "hidden":
+            self.notebook.add(frame)
+        else:
+            self.notebook.hide(frame)
+            return
+        self.notebook.select(frame)
+
+    def tab(self, name, create=True):
+        """按名称取 Tab 页面，首次取用时创建；create=False 时未创建的返回 None"""
+        tab = self._tabs.get(name)
+        if tab is None and create:
+            tab = self._tabs[name] = self._create_tab(name)
+            # 录制中途创建的页面也要写入录制
+            tab.recorder = self.session_bar.recorder
+            startup_trace.mark("first_tab")
+        return tab
+
+    def _create_tab(self, name):
+        """
+        这里的 Tab 类只负责 UI 展示，它们内部会去调用 androidToolbox 里的 Service；
+        页面模块在此才导入，启动时不加载未打开页面的依赖
+        """
+        parent = self._frames[name]
+        if name == "net":
+            from gui.tab.network_tab import NetworkTab
+            return NetworkTab(parent, self.scheduler, self._metrics_store())
+        if name == "log":
+            from gui.tab.logcat_tab import LogcatTab
+            return LogcatTab(parent, self.scheduler, self._post)
+        if name == "diag":
+            from gui.tab.diagnostics_tab import DiagnosticsTab
+            return DiagnosticsTab(parent, self.scheduler)
+        from gui.tab.monitor_tab import MonitorTab
+        return MonitorTab(parent, self.scheduler, self._metrics_store())
+
+    def _metrics_store(self):
+        """网络页与监控页共享同一份指标历史，首次需要时从磁盘加载"""
+        if self.metrics is None:
+            from androidToolbox.services.timeseries import TimeSeriesStore
+            self.metrics = TimeSeriesStore(os.path.join(METRICS_ROOT, "default"))
+        return self.metrics
 
     def _on_tab_change(self, event):
         """
@@ -67,46 +166,88 @@ class MainWindow(tk.Tk):
         策略：'懒加载' + '即停即止'。
         切换走时停止旧 Tab 的监控，切换来时启动新 Tab 的监控。
         """
-        # 1. 先“暂停”所有 Tab 的后台任务
+        # 1. 先“暂停”已创建的 Tab 的后台任务
         # (确保每个 Tab 类里都实现了 stop() 方法)
-        self.tab_net.stop()
-        self.tab_log.stop_auto_scroll() # 日志模块通常不停止抓取，只停止自动滚动以免干扰，或者看你需求
-        
-        # 2. 获取当前选中的 Tab 索引
-        # select() 返回的是 widget ID，需要转换
-        current_tab_index = self.notebook.index("current")
-        
-        # 3. 根据索引启动对应的 Tab
-        if current_tab_index == 0:
+        for name in ("net", "mon", "diag"):
+            tab = self.tab(name, create=False)
+            if tab is not None:
+                tab.stop()
+        tab_log = self.tab("log", create=False)
+        if tab_log is not None:
+            tab_log.stop_auto_scroll() # 日志模块通常不停止抓取，只停止自动滚动以免干扰，或者看你需求
+
+        # 首次绘制前不创建页面；回放录制的会话时不启动实时采集
+        if not self._painted or self.session_bar.playing:
+            return
+
+        # 2. 获取当前选中的 Tab
+        # select() 返回的是 widget ID，需要转换为占位 Frame 再查名称
+        current = self.notebook.nametowidget(self.notebook.select())
+        name = next(name for name, frame in self._frames.items() if frame is current)
+
+        # 3. 创建（首次）并启动对应的 Tab
+        tab = self.tab(name)
+        if name == "net":
             # 网络诊断 Tab
-            self.tab_net.start()
-        elif current_tab_index == 1:
+            tab.start()
+        elif name == "log":
             # 日志 Tab (通常日志是手动开始的，这里可以选择不自动 start，或者仅恢复滚动)
-            pass 
-        elif current_tab_index == 2:
-            # 性能监控 Tab
-            self.tab_mon.start()
+            pass
+        elif name in ("mon", "diag"):
+            # 性能监控 / 诊断 Tab
+            tab.start()
 
-    def _device_checker_loop(self):
-        """
-        后台线程：每隔 3 秒检查一次设备连接状态。
-        不包含任何 UI 刷新逻辑，只负责修改 status_bar 的文字。
-        """
-        while True:
-            # 调用底层 ADB 能力
-            # 注意：这里的 run 可能会阻塞，所以必须放在子线程
-            res = ADBManager.run("devices")
-            
-            # 简单的字符串判断
-            is_connected = "device" in res.replace("List of devices attached", "").strip()
-            
-            # 更新 UI (Tkinter 是线程安全的吗？大部分简单配置是，但建议用 after，这里为了简便直接改)
-            if is_connected:
-                self.status_bar.config(background="#90EE90", text="[在线] 设备已连接 | 调试服务运行中")
-            else:
-                self.status_bar.config(background="#FFB6C1", text="[离线] 未检测到设备，请检查 USB 连接")
-            
-            time.sleep(3)
+    def _post(self, callback, result, error):
+        """调度线程 -> 界面线程：只入队，由 _drain_ui_queue 在主线程中执行"""
+        self._ui_queue.put((callback, result, error))
+
+    def _drain_ui_queue(self):
+        for _ in range(UI_DRAIN_BATCH):
+            try:
+                callback, result, error = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(result, error)
+            except Exception:
+                logging.getLogger(__name__).exception("界面回调出错")
+        self.after(UI_DRAIN_INTERVAL, self._drain_ui_queue)
+
+    def _on_close(self):
+        """退出前结束录制 / 回放，停止后台探针、设备监控、延迟探测与吞吐量采样，保存指标历史、关闭日志归档"""
+        self.session_bar.stop_record()
+        self.session_bar.close_playback(notify=False)
+        tab_mon = self.tab("mon", create=False)
+        if tab_mon is not None:
+            # 停掉设备端采样代理及其 adb 流，退出后不残留进程
+            tab_mon.close()
+        tab_net = self.tab("net", create=False)
+        if tab_net is not None:
+            tab_net.close()
+        self.scheduler.stop()
+        if self.metrics is not None:
+            self.metrics.close()
+        tab_log = self.tab("log", create=False)
+        if tab_log is not None:
+            tab_log.close()
+        self.destroy()
+
+    def _on_device_event(self, event):
+        self._post(lambda result, error: self._update_device_status(), None, None)
+
+    def _update_device_status(self):
+        """根据注册表快照刷新状态栏：在线 / 未授权或离线 / 未连接"""
+        devices = ADBManager.device_registry().devices()
+        online = [serial for serial, state in devices.items() if state == "device"]
+        if online:
+            self.status_bar.config(background="#90EE90",
+                                   text=f"[在线] 设备已连接: {', '.join(online)} | 调试服务运行中")
+        elif devices:
+            detail = ", ".join(f"{serial} ({state})" for serial, state in devices.items())
+            self.status_bar.config(background="#FFE4B5",
+                                   text=f"[不可用] {detail} | unauthorized 请在手机上允许 USB 调试")
+        else:
+            self.status_bar.config(background="#FFB6C1", text="[离线] 未检测到设备，请检查 USB 连接")
 
 if __name__ == "__main__":
     # 如果直接运行这个文件进行测试
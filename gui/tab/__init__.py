@@ -1,6 +1,21 @@
 """GUI Tab Views - 标签页视图"""
+import importlib
 
-from gui.tab.network_tab import NetworkTab
-from gui.tab.logcat_tab import LogcatTab
+# 按需导入（PEP 562）：主窗口在页面首次选中时才加载对应模块
+_EXPORTS = {
+    "NetworkTab": "network_tab",
+    "LogcatTab": "logcat_tab",
+    "MonitorTab": "monitor_tab",
+    "DiagnosticsTab": "diagnostics_tab",
+}
 
-__all__ = ["NetworkTab", "LogcatTab"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,127 @@
+import os
+import time
+from tkinter import ttk, filedialog
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.trace import startup_trace
+
+# 刷新间隔（毫秒）：只读本地统计，不发起 adb 调用
+DIAG_REFRESH_MS = 1000
+# 命令统计表的列：(键, 标题, 宽度)
+COMMAND_COLUMNS = (
+    ("family", "命令类别", 200), ("count", "次数", 50), ("in_flight", "进行中", 50),
+    ("errors", "错误", 45), ("timeouts", "超时", 45), ("avg_ms", "平均ms", 60), ("p50_ms", "P50", 55),
+    ("p95_ms", "P95", 55), ("p99_ms", "P99", 55), ("max_ms", "最大", 60),
+    ("bytes_avg", "平均字节", 70), ("bytes_max", "最大字节", 70),
+)
+# 调度器探针统计表的列
+PROBE_COLUMNS = (
+    ("name", "探针", 200), ("runs", "执行", 60), ("timeouts", "超时", 60), ("errors", "错误", 60),
+    ("skipped", "跳过", 60), ("last_duration", "最近耗时s", 80),
+)
+
+
+class DiagnosticsTab(ttk.Frame):
+    """
+    隐藏的诊断页（主窗口按 Ctrl+Shift+D 显示 / 隐藏）：
+    各类 adb 命令的耗时分布、错误与超时、输出大小，结果缓存命中情况，调度器探针统计与启动耗时。
+    """
+
+    def __init__(self, parent, scheduler):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.pack(fill='both', expand=True, padx=5, pady=5)
+        self.running = False
+        self._setup_ui()
+
+    def _setup_ui(self):
+        top_bar = ttk.Frame(self)
+        top_bar.pack(fill='x')
+        ttk.Button(top_bar, text="清零", command=self.reset).pack(side='left', padx=5, pady=5)
+        ttk.Button(top_bar, text="导出快照", command=self.export).pack(side='left', padx=5, pady=5)
+        self.lbl_cache = ttk.Label(top_bar, text="")
+        self.lbl_cache.pack(side='left', padx=10)
+
+        self.command_table = self._table(COMMAND_COLUMNS, height=10)
+        self.command_table.pack(fill='both', expand=True)
+        self.lbl_error = ttk.Label(self, text="", foreground="#dc3545", wraplength=760)
+        self.lbl_error.pack(fill='x', pady=2)
+
+        self.probe_table = self._table(PROBE_COLUMNS, height=5)
+        self.probe_table.pack(fill='x', pady=5)
+
+        self.lbl_startup = ttk.Label(self, text="", justify='left', font=("Consolas", 9))
+        self.lbl_startup.pack(fill='x')
+
+    def _table(self, columns, height):
+        table = ttk.Treeview(self, columns=[c[0] for c in columns], show='headings', height=height)
+        for key, title, width in columns:
+            table.heading(key, text=title)
+            table.column(key, width=width, anchor='w' if key in ("family", "name") else 'e')
+        return table
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._refresh()
+
+    def stop(self):
+        self.running = False
+
+    def reset(self):
+        ADBManager.metrics.reset()
+        self.show(ADBManager.diagnostics())
+
+    def export(self):
+        path = filedialog.asksaveasfilename(
+            initialfile=time.strftime("adb_metrics_%Y%m%d_%H%M%S.jsonl"),
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("All files", "*.*")])
+        if path:
+            ADBManager.metrics.dump(path, extra=lambda: {"cache": ADBManager.cache.stats(),
+                                                         "startup": startup_trace.marks()})
+            self.lbl_error.config(text=f"已导出: {os.path.basename(path)}", foreground="#28a745")
+
+    def _refresh(self):
+        if not self.running or not self.winfo_exists():
+            return
+        self.show(ADBManager.diagnostics())
+        self.after(DIAG_REFRESH_MS, self._refresh)
+
+    def show(self, diagnostics):
+        commands = diagnostics["commands"]
+        # 按累计耗时从大到小，最值得优化的命令排在前面
+        ordered = sorted(commands.items(), key=lambda item: -(item[1]["avg_ms"] or 0) * item[1]["count"])
+        self._fill(self.command_table, [
+            [family] + [self._format(stats[key]) for key, _, _ in COMMAND_COLUMNS[1:]]
+            for family, stats in ordered])
+        self._fill(self.probe_table, [
+            [name] + [self._format(stats.get(key)) for key, _, _ in PROBE_COLUMNS[1:]]
+            for name, stats in sorted(list(self.scheduler.stats.items()))])
+
+        cache = diagnostics["cache"]
+        lookups = cache["hits"] + cache["misses"] + cache["coalesced"]
+        hit_rate = (cache["hits"] + cache["coalesced"]) / lookups * 100 if lookups else 0
+        self.lbl_cache.config(text=f"缓存: {cache['entries']} 项 | 命中 {cache['hits']} | 合并 {cache['coalesced']}"
+                                   f" | 未命中 {cache['misses']} | 命中率 {hit_rate:.0f}%")
+        errors = [f"{family}: {stats['last_error']}" for family, stats in ordered if stats["last_error"]]
+        self.lbl_error.config(text=("最近错误 " + errors[0]) if errors else "", foreground="#dc3545")
+        self.lbl_startup.config(text=startup_trace.report())
+
+    @staticmethod
+    def _fill(table, rows):
+        # 行数不变时原地更新，避免每秒重建导致闪烁与选中丢失
+        items = table.get_children()
+        for item, values in zip(items, rows):
+            table.item(item, values=values)
+        for values in rows[len(items):]:
+            table.insert('', 'end', values=values)
+        if len(items) > len(rows):
+            table.delete(*items[len(rows):])
+
+    @staticmethod
+    def _format(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.1f}" if value < 1000 else f"{value:.0f}"
+        return value
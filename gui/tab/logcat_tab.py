@@ -1,19 +1,65 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox
+import os
+import shutil
+import tempfile
+import time
+from androidToolbox.core.adb import ADBManager
 from androidToolbox.services.logcat_service import LogcatService
+from androidToolbox.services.logcat_filter import LogcatFilter
+from gui.widget.log_view import VirtualLogView
+
+# 抓取归档目录（系统临时目录下，每次启动一个子目录）
+ARCHIVE_ROOT = os.path.join(tempfile.gettempdir(), "androidToolbox", "logcat")
+# 每次抓取最多保留的归档段数（每段 64MB），超出后删除最旧的段
+ARCHIVE_MAX_SEGMENTS = 16
+# 超过这么久（秒）未写入的归档目录视为上次异常退出遗留，启动时清理
+ARCHIVE_STALE_SECONDS = 24 * 3600
+# 单次检索最多显示的条数
+SEARCH_LIMIT = 5000
+# 会话回放用的独立日志存储的内存预算（字节）
+PLAYBACK_MEMORY_BUDGET = 32 * 1024 * 1024
+
+
+def _sweep_stale_archives():
+    """删除长时间未写入的归档目录（其他仍在运行的实例会持续写入，不受影响）"""
+    try:
+        names = os.listdir(ARCHIVE_ROOT)
+    except OSError:
+        return
+    now = time.time()
+    for name in names:
+        path = os.path.join(ARCHIVE_ROOT, name)
+        try:
+            mtimes = [os.path.getmtime(path)] + [entry.stat().st_mtime for entry in os.scandir(path)]
+        except OSError:
+            continue
+        if now - max(mtimes) > ARCHIVE_STALE_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
 
-# 内存溢出阈值（行数）
-MAX_LOG_LINES = 50000
-# UI最大保留行数
-MAX_UI_LINES = 2000
 
 class LogcatTab(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, scheduler, post):
         super().__init__(parent)
         self.pack(fill='both', expand=True)
+        # 后台探针调度器（ProbeScheduler）：清空设备缓存、打开 logcat 流等阻塞调用都在其中执行
+        self.scheduler = scheduler
+        # 后台线程 -> 界面线程的投递函数（主窗口的 _post），Tk 控件不能在其他线程中调用
+        self._post = post
         # 初始化服务
-        self.service = LogcatService()
+        _sweep_stale_archives()
+        self.archive_dir = os.path.join(ARCHIVE_ROOT, time.strftime("%Y%m%d_%H%M%S"))
+        self.service = LogcatService(archive_dir=self.archive_dir, max_segments=ARCHIVE_MAX_SEGMENTS)
+        # 会话回放时使用的独立服务（只写入、不抓取），实时抓取的日志保持不动
+        self.playback = None
+        # 用户是否处于“抓取中”（设备断开时服务会停止，但重连后应自动继续）
+        self._capturing = False
+        # 抓取正在调度线程中启动（含续读），期间不重复启动
+        self._starting = False
+        # 等待在调度线程中生效的过滤条件（连续修改时只应用最新的）
+        self._pending_filter = None
         self._setup_ui()
+        self._unsubscribe = ADBManager.device_registry().subscribe(self._on_device_event)
 
     def _setup_ui(self):
         top_bar = ttk.Frame(self)
@@ -25,17 +71,33 @@ class LogcatTab(ttk.Frame):
         self.btn_export = ttk.Button(top_bar, text="导出TXT", command=self.export_logs)
         self.btn_export.pack(side='left', padx=5, pady=5)
 
+        # 过滤条件：回车后在线生效，无需重新开始抓取
+        ttk.Label(top_bar, text="过滤:").pack(side='left')
+        self.entry_filter = ttk.Entry(top_bar, width=30)
+        self.entry_filter.pack(side='left', padx=5)
+        self.entry_filter.bind("<Return>", self._apply_filter)
+
+        # 跳转到指定时间
+        ttk.Label(top_bar, text="跳转:").pack(side='left')
+        self.entry_jump = ttk.Entry(top_bar, width=10)
+        self.entry_jump.pack(side='left', padx=5)
+        self.entry_jump.bind("<Return>", self._jump_to_time)
+
+        # 检索已抓取的日志（语法见 LogQuery），清空后回车回到实时日志
+        ttk.Label(top_bar, text="搜索:").pack(side='left')
+        self.entry_search = ttk.Entry(top_bar, width=30)
+        self.entry_search.pack(side='left', padx=5)
+        self.entry_search.bind("<Return>", self._search)
+        self.entry_search.bind("<Escape>", self._clear_search)
+
         # 状态标签
         self.status_label = ttk.Label(top_bar, text="日志: 0 行")
         self.status_label.pack(side='left', padx=10)
 
-        self.text_area = scrolledtext.ScrolledText(self)
-        self.text_area.pack(fill='both', expand=True)
-
-        # 配置颜色 tag
-        self.text_area.tag_config("E", foreground="red")
-        self.text_area.tag_config("W", foreground="orange")
-        self.text_area.tag_config("I", foreground="green")
+        # 虚拟化日志视图：只渲染可见行，完整日志保存在 service.store 中
+        self.log_view = VirtualLogView(self, self.service.store)
+        self.log_view.pack(fill='both', expand=True)
+        self.text_area = self.log_view.text
 
         # 绑定右键菜单
         self.text_area.bind("<Button-3>", self._show_context_menu)
@@ -46,56 +108,176 @@ class LogcatTab(ttk.Frame):
         self.context_menu.add_separator()
         self.context_menu.add_command(label="清除日志", command=self.clear_logs)
 
-        # 自动滚动控制
-        self._auto_scroll = True
-        # 服务端日志行数统计
-        self._service_line_count = 0
+    @property
+    def recorder(self):
+        """会话录制（SessionRecorder），与其他标签页一致的接口，实际挂在日志服务上"""
+        return self.service.recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        self.service.recorder = recorder
 
     def stop(self):
         """停止监控（切换 Tab 时调用）"""
+        self._capturing = False
         self.service.stop_capture()
-        self._auto_scroll = False
+        self.log_view.follow = False
         if self.btn_start.cget('text') == "停止":
             self.btn_start.config(text="开始")
 
+    def close(self):
+        """退出时取消设备订阅、关闭抓取与回放，并删除本次运行的归档目录"""
+        self._unsubscribe()
+        self.end_playback()
+        self.service.close()
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
     def stop_auto_scroll(self):
         """停止自动滚动"""
-        self._auto_scroll = False
+        self.log_view.follow = False
 
     def toggle(self):
-        if not self.service.is_running():
-            self.service.start_capture()
-            self.btn_start.config(text="停止")
-            self._ui_update_loop()
+        if self._starting:
+            return
+        if not self._capturing:
+            log_filter = self._parse_filter()
+            if log_filter is None:
+                return
+            self._capturing = True
+            self._start_capture(log_filter)
         else:
+            self._capturing = False
             self.service.stop_capture()
             self.btn_start.config(text="开始")
+            self.log_view.refresh()
+
+    def _start_capture(self, log_filter, resume=False):
+        """在调度线程中启动抓取（清空设备缓存、打开 adb 流都会阻塞），结果回到界面线程"""
+        self._starting = True
+        self.btn_start.config(state='disabled')
+        self.scheduler.submit("logcat_start",
+                              lambda: self.service.start_capture(log_filter=log_filter, resume=resume),
+                              lambda result, error: self._on_capture_started(resume, error))
+
+    def _on_capture_started(self, resume, error):
+        """界面线程：启动失败时恢复状态并提示；启动期间已停止（如进入回放）的立即停掉"""
+        self._starting = False
+        if not self.winfo_exists():
+            return
+        self.btn_start.config(state='disabled' if self.playback is not None else 'normal')
+        if not self._capturing:
+            self.service.stop_capture()
+            return
+        if error is not None:
+            if resume:
+                # 保持“抓取中”，下一次设备事件时再续读
+                self.status_label.config(text=f"续读 logcat 失败: {error}", foreground="red")
+            else:
+                self._capturing = False
+                messagebox.showerror("错误", f"无法启动 logcat:\n{error}")
+            return
+        self.btn_start.config(text="停止")
+        self._ui_update_loop()
 
-    def _ui_update_loop(self):
-        if not self.service.is_running(): return
+    def _on_device_event(self, event):
+        """设备注册表回调（后台线程），只关心本服务的目标设备"""
+        if self.service.serial is None or event.serial == self.service.serial:
+            self._post(lambda result, error: self._sync_device_state(), None, None)
 
-        self.text_area.config(state='normal')
+    def _sync_device_state(self):
+        """界面线程：目标设备不可用时暂停抓取，恢复后从断开处续读"""
+        if not self._capturing or self._starting or not self.winfo_exists():
+            return
+        if not ADBManager.device_registry().is_online(self.service.serial):
+            self.service.stop_capture()
+            self.status_label.config(text="设备已断开，重连后自动继续抓取", foreground="red")
+        elif not self.service.is_running():
+            self._start_capture(self.service.log_filter, resume=True)
 
-        # 从 Service 批量获取数据
-        new_logs = self.service.get_logs()
-        for line in new_logs:
-            tag = "I"
-            if " E " in line: tag = "E"
-            elif " W " in line: tag = "W"
-            self.text_area.insert(tk.END, line, tag)
-            self._service_line_count += 1
+    def _parse_filter(self):
+        """解析过滤框中的条件（语法见 LogcatFilter.parse），无效时提示并返回 None"""
+        try:
+            return LogcatFilter.parse(self.entry_filter.get())
+        except ValueError as e:
+            messagebox.showerror("错误", f"过滤条件无效:\n{str(e)}")
+            return None
+
+    def _apply_filter(self, event=None):
+        log_filter = self._parse_filter()
+        if log_filter is None:
+            return
+        # 设备端参数变化时要重连 logcat 流，放到调度线程执行
+        self._pending_filter = log_filter
+        self.scheduler.submit("logcat_filter", self._set_pending_filter, self._on_filter_applied)
+
+    def _set_pending_filter(self):
+        """调度器线程：执行期间又修改了过滤条件时，继续应用最新的一个"""
+        while True:
+            log_filter = self._pending_filter
+            self.service.set_filter(log_filter)
+            if self._pending_filter is log_filter:
+                return
+
+    def _on_filter_applied(self, result, error):
+        if error is not None and self.winfo_exists():
+            messagebox.showerror("错误", f"重连 logcat 失败，过滤条件未生效:\n{error}")
+
+    def _view_service(self):
+        """当前视图展示的日志来源：回放中为回放服务，否则为实时抓取"""
+        return self.playback if self.playback is not None else self.service
+
+    def _jump_to_time(self, event=None):
+        """按 HH:MM[:SS] 跳转，日期取最新一条日志所在的日期"""
+        text = self.entry_jump.get().strip()
+        store = self._view_service().store
+        latest = store.get(store.next_seq - 1)
+        if not text or latest is None:
+            return
+        try:
+            parts = [int(p) for p in text.split(":")]
+            h, m, sec = (parts + [0, 0])[:3]
+        except ValueError:
+            messagebox.showerror("错误", "时间格式应为 HH:MM[:SS]")
+            return
+        day = time.localtime(latest.ts)
+        ts = time.mktime((day.tm_year, day.tm_mon, day.tm_mday, h, m, sec, 0, 0, -1))
+        self.log_view.jump_to_time(ts)
+
+    def _search(self, event=None):
+        text = self.entry_search.get().strip()
+        if not text:
+            self._clear_search()
+            return
+        try:
+            records = self._view_service().query(text, limit=SEARCH_LIMIT)
+        except ValueError as e:
+            messagebox.showerror("错误", f"搜索条件无效:\n{str(e)}")
+            return
+        self.log_view.show_results(records)
+        self.status_label.config(text=f"搜索: {len(records)} 条")
 
-        # 自动清理旧日志（UI 保护逻辑）
-        current_lines = int(self.text_area.index('end-1c').split('.')[0])
-        if current_lines > MAX_UI_LINES:
-            self.text_area.delete('1.0', f'{current_lines - MAX_UI_LINES + 100}.0')
+    def _clear_search(self, event=None):
+        self.entry_search.delete(0, tk.END)
+        self.log_view.show_live()
+        self.status_label.config(text=self._status_text())
 
-        if self._auto_scroll:
-            self.text_area.see(tk.END)
-        self.text_area.config(state='disabled')
+    def _status_text(self):
+        """行数 + 读取队列统计（接收 / 丢弃 / 送达）"""
+        service = self._view_service()
+        stats = service.queue_stats()
+        return (f"日志: {len(service.store)} 行  "
+                f"接收 {stats['received']} / 丢弃 {stats['dropped']} / 送达 {stats['delivered']}")
 
-        # 更新状态栏
-        self.status_label.config(text=f"日志: {self._service_line_count} 行")
+    def _ui_update_loop(self):
+        if not self.service.is_running(): return
+
+        # 显示检索结果时不刷新视图与行数，抓取仍在后台继续
+        if not self.log_view.in_results():
+            # 只重绘可见行；级别已在抓取线程解析好
+            self.log_view.refresh()
+
+            # 更新状态栏
+            self.status_label.config(text=self._status_text())
 
         # 内存溢出风险检测
         risk_msg = self._check_memory_risk()
@@ -108,6 +290,47 @@ class LogcatTab(ttk.Frame):
 
         self.after(100, self._ui_update_loop)
 
+    # ============ 会话回放 ============
+
+    def begin_playback(self):
+        """
+        进入会话回放：停止实时抓取，视图切换到独立的回放存储；
+        已抓取的日志（内存存储、索引与磁盘归档）保持不动，退出回放后恢复显示
+        """
+        self.stop()
+        self.playback = LogcatService(memory_budget=PLAYBACK_MEMORY_BUDGET)
+        self.btn_start.config(state='disabled')
+        self.entry_search.delete(0, tk.END)
+        self.log_view.set_store(self.playback.store)
+        self.status_label.config(text=self._status_text())
+
+    def reset_playback(self):
+        """回放跳转时清空回放存储（不影响实时抓取的日志）"""
+        if self.playback is not None:
+            self.playback.clear()
+            self.log_view.show_live()
+
+    def end_playback(self):
+        """退出回放，恢复显示实时抓取的日志"""
+        if self.playback is None:
+            return
+        self.playback.close()
+        self.playback = None
+        self.btn_start.config(state='normal')
+        self.entry_search.delete(0, tk.END)
+        self.log_view.set_store(self.service.store)
+        self.status_label.config(text=self._status_text())
+
+    def show_playback(self, lines):
+        """回放录制的日志行（list[bytes]）：写入回放存储并刷新视图，不经过设备"""
+        if self.playback is None:
+            return
+        if lines:
+            self.playback.ingest(lines)
+        if not self.log_view.in_results():
+            self.log_view.refresh()
+            self.status_label.config(text=self._status_text())
+
     # ============ 右键菜单相关方法 ============
 
     def _show_context_menu(self, event):
@@ -131,7 +354,8 @@ class LogcatTab(ttk.Frame):
 
     def export_logs(self):
         """导出日志到TXT文件"""
-        if self.text_area.get('1.0', tk.END).strip() == "":
+        store = self.service.store
+        if len(store) == 0:
             messagebox.showwarning("警告", "没有日志可导出")
             return
 
@@ -143,25 +367,27 @@ class LogcatTab(ttk.Frame):
 
         if file_path:
             try:
-                content = self.text_area.get('1.0', tk.END)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                # 流式导出完整归档，不经过界面控件
+                self.service.export(file_path)
                 messagebox.showinfo("成功", f"日志已导出到:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("错误", f"导出失败:\n{str(e)}")
 
     def clear_logs(self):
-        """清除日志控制台"""
-        self.text_area.config(state='normal')
-        self.text_area.delete('1.0', tk.END)
-        self.text_area.config(state='disabled')
-        self._service_line_count = 0
-        self.status_label.config(text="日志: 0 行")
+        """清除日志控制台（回放中只清空回放存储）"""
+        self._view_service().clear()
+        self.entry_search.delete(0, tk.END)
+        self.log_view.show_live()
+        self.status_label.config(text=self._status_text())
 
     # ============ 内存溢出风险检测 ============
 
     def _check_memory_risk(self):
-        """检查内存溢出风险并返回警告信息"""
-        if self._service_line_count >= MAX_LOG_LINES:
-            return f"警告: 日志数量已达 {self._service_line_count} 行，接近内存限制 ({MAX_LOG_LINES} 行)，建议清除或导出日志"
+        """检查日志存储是否已写满（最旧的日志开始被覆盖）或读取队列有丢弃，并返回警告信息"""
+        store = self.service.store
+        if store.evicted > 0:
+            return f"警告: 日志存储已满 ({len(store)} 行)，最早的 {store.evicted} 行已被覆盖，建议导出日志"
+        dropped = self.service.queue_stats()["dropped"]
+        if dropped:
+            return f"警告: 处理跟不上日志速度，已丢弃 {dropped} 行"
         return None
\ No newline at end of file
@@ -0,0 +1,243 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.devices import OnlineDevices
+from androidToolbox.services.monitor_agent import MonitorAgent
+from androidToolbox.services.monitor_service import MonitorService
+from androidToolbox.services.process_service import ProcessTracker
+from androidToolbox.services.session_record import STREAM_MONITOR
+from androidToolbox.services.timeseries import TimeSeriesStore
+from gui.widget.chart import TimeSeriesChart
+
+# 可选的显示时间跨度
+WINDOWS = {"5 分钟": 300, "1 小时": 3600, "6 小时": 6 * 3600, "24 小时": 24 * 3600}
+# 采样间隔与单次采样的截止时间（秒）
+SAMPLE_INTERVAL = 2
+SAMPLE_DEADLINE = 8
+# 设备端代理模式：采样频率（Hz）、界面刷新间隔（毫秒）与代理断开后的重连间隔（秒）
+AGENT_RATE = 10
+AGENT_REFRESH_MS = 500
+AGENT_RETRY_INTERVAL = 3
+# 进程列表：采样间隔、截止时间（秒）与显示的进程数
+PROCESS_INTERVAL = 1
+PROCESS_DEADLINE = 5
+PROCESS_TOP = 15
+PROCESS_COLUMNS = (("pid", "PID", 60), ("name", "进程", 220), ("cpu", "CPU%", 60),
+                   ("rss_mb", "RSS (MB)", 80), ("state", "状态", 45))
+
+
+class MonitorTab(ttk.Frame):
+    def __init__(self, parent, scheduler, metrics=None):
+        super().__init__(parent)
+        # 后台探针调度器（ProbeScheduler），所有 adb 调用都在其中执行
+        self.scheduler = scheduler
+        self.pack(fill='both', expand=True, padx=10, pady=10)
+        self.running = False
+        # 指标历史（与网络页共享），图表按时间跨度读取对应的汇总级别
+        self.metrics = metrics if metrics is not None else TimeSeriesStore()
+        # 设备端采样代理（仅代理模式下存在）
+        self.agent = None
+        self._agent_started_at = 0
+        # 代理模式刷新的 after 任务，停止（含切换模式）时取消，避免叠加多条刷新循环
+        self._agent_job = None
+        # 按进程的 CPU / 内存统计，排序列可点击表头切换
+        self.processes = ProcessTracker()
+        self.process_sort = "cpu"
+        # 可选的会话录制（SessionRecorder），每个样本同时写入
+        self.recorder = None
+        self._recorded_ts = None
+        # 订阅注册表维护的在线设备，采样前据此跳过，不再每轮查询注册表
+        self.devices = OnlineDevices(ADBManager.device_registry())
+        self._setup_ui()
+
+    def _setup_ui(self):
+        # 仪表盘
+        panel = ttk.Frame(self)
+        panel.pack(fill='x', pady=5)
+        self.lbl_ram = ttk.Label(panel, text="RAM: --", font=("Arial", 11, "bold"))
+        self.lbl_ram.pack(side='left', padx=10)
+        self.lbl_disk = ttk.Label(panel, text="Disk: --", font=("Arial", 11, "bold"))
+        self.lbl_disk.pack(side='left', padx=10)
+        self.lbl_cpu = ttk.Label(panel, text="CPU: --", font=("Arial", 11, "bold"))
+        self.lbl_cpu.pack(side='left', padx=10)
+
+        self.window_var = tk.StringVar(value="5 分钟")
+        window_box = ttk.Combobox(panel, textvariable=self.window_var, values=list(WINDOWS),
+                                  state='readonly', width=8)
+        window_box.pack(side='right', padx=10)
+        window_box.bind("<<ComboboxSelected>>", self._on_window_change)
+        ttk.Label(panel, text="时间跨度:").pack(side='right')
+        # 高频模式：设备端代理持续推送内存 / CPU / 网络计数，不再逐次 adb 调用
+        self.agent_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(panel, text=f"高频 ({AGENT_RATE}Hz 代理)", variable=self.agent_mode,
+                        command=self._on_mode_change).pack(side='right', padx=10)
+
+        # 绘图区：内存（左轴）、RSSI（右轴）、磁盘与信号格数各自独立缩放
+        self.chart = TimeSeriesChart(self, window=WINDOWS[self.window_var.get()], height=260,
+                                     bd=1, relief="solid")
+        self.chart.pack(fill='both', expand=True, pady=10)
+        self.chart.add_axis("mb", "left", " MB")
+        self.chart.add_axis("dbm", "right", " dBm")
+        self.chart.add_axis("disk")
+        self.chart.add_axis("level", fixed=(0, 4))
+        self.chart.add_axis("percent", fixed=(0, 100))
+        self.chart.add_series("ram_available_mb", "#007bff", "mb", "可用内存")
+        self.chart.add_series("disk_free_mb", "#6f42c1", "disk", "磁盘可用")
+        self.chart.add_series("wifi_rssi", "#28a745", "dbm", "WiFi RSSI")
+        self.chart.add_series("signal_level", "#fd7e14", "level", "信号格数")
+        self.chart.add_series("cpu_percent", "#dc3545", "percent", "CPU")
+
+        # 进程列表（类似 top）
+        self.process_table = ttk.Treeview(self, columns=[c[0] for c in PROCESS_COLUMNS],
+                                          show='headings', height=8)
+        for key, title, width in PROCESS_COLUMNS:
+            self.process_table.heading(key, text=title)
+            self.process_table.column(key, width=width, anchor='w' if key == "name" else 'e')
+        self.process_table.heading("cpu", command=lambda: self._sort_processes("cpu"))
+        self.process_table.heading("rss_mb", command=lambda: self._sort_processes("rss"))
+        self.process_table.pack(fill='x')
+
+    def start(self):
+        if self._agent_job is not None:
+            return
+        self.running = True
+        self.scheduler.add("processes", self._sample_processes, PROCESS_INTERVAL, self._on_processes,
+                           deadline=PROCESS_DEADLINE)
+        if self.agent_mode.get():
+            self._start_agent()
+            self._agent_job = self.after(AGENT_REFRESH_MS, self._agent_loop)
+        else:
+            self.scheduler.add("monitor", self._sample, SAMPLE_INTERVAL, self._on_sample,
+                               deadline=SAMPLE_DEADLINE)
+
+    def stop(self):
+        self.running = False
+        self.scheduler.cancel("monitor")
+        self.scheduler.cancel("processes")
+        # 停止期间的差值没有意义，重新开始时从头计算
+        self.processes.reset()
+        if self._agent_job is not None:
+            self.after_cancel(self._agent_job)
+            self._agent_job = None
+        if self.agent is not None:
+            self.agent.stop()
+            self.agent = None
+
+    def close(self):
+        """退出时停止采集（含设备端代理），并取消设备订阅"""
+        self.stop()
+        self.devices.close()
+
+    def _on_mode_change(self):
+        if self.running:
+            self.stop()
+            self.start()
+
+    def _on_window_change(self, event=None):
+        self.chart.window = WINDOWS[self.window_var.get()]
+        self.chart.refresh_from(self.metrics)
+
+    def _sample(self):
+        """调度器线程：一次 adb 往返采集全部指标并写入历史"""
+        if not self.devices.is_online():
+            return None
+        sample = MonitorService.sample(store=self.metrics)
+        return {"resources": sample["resources"], "metrics": sample["metrics"]}
+
+    def _on_sample(self, sample, error):
+        """界面线程：刷新数值与图表"""
+        if not self.running or not self.winfo_exists(): return
+
+        if sample is not None:
+            self._record(sample)
+        self.show_sample(sample)
+
+    def _record(self, sample):
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(STREAM_MONITOR, sample)
+
+    def show_sample(self, sample, store=None, now=None):
+        """
+        展示一个样本 {"resources"?, "metrics"} 并刷新图表；
+        回放录制的会话时传入回放用的 store 与回放时刻 now
+        """
+        if sample is not None:
+            resources = sample.get("resources")
+            metrics = sample["metrics"]
+            if resources is not None:
+                self.lbl_ram.config(text=f"RAM可用: {resources['ram_available_mb']} MB")
+                self.lbl_disk.config(text=f"Disk可用: {resources['disk_info']}")
+            elif metrics.get("ram_available_mb") is not None:
+                self.lbl_ram.config(text=f"RAM可用: {metrics['ram_available_mb']} MB")
+            if metrics.get("cpu_percent") is not None:
+                self.lbl_cpu.config(text=f"CPU: {metrics['cpu_percent']:.0f}%  负载: {metrics['load1']}")
+
+        # 只有数据或尺寸变化时才会真正重绘
+        self.chart.refresh_from(self.metrics if store is None else store, now)
+
+    # ============ 进程列表 ============
+
+    def _sort_processes(self, key):
+        """按 CPU 或内存排序，下一轮采样生效"""
+        self.process_sort = key
+
+    def _sample_processes(self):
+        """调度器线程：一次 adb 往返读取全部进程的 stat"""
+        if not self.devices.is_online():
+            return None
+        return self.processes.sample(PROCESS_TOP, self.process_sort)
+
+    def _on_processes(self, rows, error):
+        if not self.running or not self.winfo_exists() or rows is None:
+            return
+        self.process_table.delete(*self.process_table.get_children())
+        for row in rows:
+            self.process_table.insert('', tk.END, values=tuple(
+                "-" if row[key] is None else row[key] for key, _, _ in PROCESS_COLUMNS))
+
+    # ============ 代理模式 ============
+
+    def _start_agent(self):
+        """在调度线程中启动代理（推送脚本、打开 adb 流），结果回到界面线程；失败时由刷新循环定期重试"""
+        self._agent_started_at = time.monotonic()
+        self.scheduler.submit("agent_start", self._open_agent, self._on_agent_started)
+
+    def _open_agent(self):
+        """调度器线程：没有可用设备时不发起任何 adb 调用"""
+        if not self.devices.is_online():
+            return None
+        agent = MonitorAgent(rate=AGENT_RATE, store=self.metrics).start()
+        if not self.running:
+            # 启动期间已停止（如窗口关闭），回调可能不再执行，在这里直接停掉
+            agent.stop()
+            return None
+        return agent
+
+    def _on_agent_started(self, agent, error):
+        """界面线程：启动期间已停止或切换了模式的，直接停掉新代理"""
+        if agent is None:
+            return
+        if not self.running or not self.agent_mode.get():
+            agent.stop()
+        elif agent is not self.agent:
+            if self.agent is not None:
+                self.agent.stop()
+            self.agent = agent
+
+    def _agent_loop(self):
+        """界面线程：读取代理最新样本刷新数值与图表；代理断开（如设备重连）后定期重启"""
+        self._agent_job = None
+        if not self.running or not self.agent_mode.get() or not self.winfo_exists():
+            return
+        if (self.agent is None or not self.agent.running) and \
+                time.monotonic() - self._agent_started_at >= AGENT_RETRY_INTERVAL:
+            self._start_agent()
+        sample = self.agent.latest() if self.agent is not None else None
+        if sample is not None and sample["ts"] != self._recorded_ts:
+            self._recorded_ts = sample["ts"]
+            # 录制按界面刷新的节奏抽样，不逐条写入代理的高频样本
+            self._record({"metrics": sample["metrics"]})
+        self.show_sample(sample)
+        self._agent_job = self.after(AGENT_REFRESH_MS, self._agent_loop)
@@ -1,14 +1,64 @@
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-import threading
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.devices import OnlineDevices
 # 引入业务服务
-from androidToolbox.services.network_service import NetworkService
+from androidToolbox.services.latency_service import LatencyProber
+from androidToolbox.services.monitor_service import MonitorService
+from androidToolbox.services.session_record import STREAM_NETWORK
+from androidToolbox.services.throughput_service import ThroughputSampler
+from androidToolbox.services.timeseries import TimeSeriesStore
+from gui.widget.chart import TimeSeriesChart
+
+# 采样间隔与单次采样的截止时间（秒）
+SAMPLE_INTERVAL = 3
+SAMPLE_DEADLINE = 8
+# 延迟探测：默认目标、单次探测的包数、界面刷新间隔（毫秒）与回包日志保留行数
+PING_TARGETS = "www.baidu.com 223.5.5.5 8.8.8.8"
+PING_COUNT = 10
+PING_REFRESH_MS = 500
+PING_LOG_LINES = 500
+# 吞吐量：采样间隔（秒）、图表时间跨度（秒）、界面刷新间隔（毫秒）与采样断开后的重连间隔（秒）
+THROUGHPUT_INTERVAL = 1
+THROUGHPUT_WINDOW = 300
+THROUGHPUT_REFRESH_MS = 1000
+THROUGHPUT_RETRY_INTERVAL = 3
+# 按网卡出现的顺序分配颜色，接收为实色、发送为浅色
+THROUGHPUT_COLORS = (("#007bff", "#80bdff"), ("#28a745", "#8fd19e"), ("#fd7e14", "#fec08a"),
+                     ("#6f42c1", "#b7a1e0"))
+PING_COLUMNS = (
+    ("target", "目标", 120), ("sent", "发送", 45), ("loss", "丢包%", 55), ("min", "最小", 50),
+    ("avg", "平均", 50), ("p50", "P50", 50), ("p95", "P95", 50), ("p99", "P99", 50), ("jitter", "抖动", 50),
+)
 
 class NetworkTab(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, scheduler, metrics=None):
         super().__init__(parent)
+        # 后台探针调度器（ProbeScheduler），所有 adb 调用都在其中执行
+        self.scheduler = scheduler
         self.pack(fill='both', expand=True, padx=5, pady=5)
         self.running = False
+        # RSSI、信号格数、可用内存等指标的历史（与监控页共享，由主窗口负责落盘）
+        self.metrics = metrics if metrics is not None else TimeSeriesStore()
+        # 延迟探测器及其回包（读取线程写入，界面线程定时取出）
+        self.prober = None
+        self._replies = queue.SimpleQueue()
+        self._ping_job = None
+        # 探测正在调度线程中启动，期间不接受新的探测
+        self._ping_starting = False
+        # 吞吐量刷新的 after 任务，停止时取消，避免重复启动后出现多条刷新循环
+        self._throughput_job = None
+        # 按网卡的吞吐量采样（标签页可见时运行）
+        self.throughput = ThroughputSampler(interval=THROUGHPUT_INTERVAL,
+                                            history=THROUGHPUT_WINDOW // THROUGHPUT_INTERVAL)
+        self._throughput_started_at = 0
+        self._rate_series = set()
+        # 可选的会话录制（SessionRecorder），每次采样的网络状态同时写入
+        self.recorder = None
+        # 订阅注册表维护的在线设备，采样前据此跳过，不再每轮查询注册表
+        self.devices = OnlineDevices(ADBManager.device_registry())
         self._setup_ui()
 
     def _setup_ui(self):
@@ -24,29 +74,85 @@ class NetworkTab(ttk.Frame):
         
         self.lbl_diag = ttk.Label(self.info_frame, text="诊断: ...")
         self.lbl_diag.pack(anchor='w', pady=15)
+
+        self.lbl_rates = ttk.Label(self.info_frame, text="吞吐量: ...", justify='left')
+        self.lbl_rates.pack(anchor='w')
+        self.rate_chart = TimeSeriesChart(self.info_frame, window=THROUGHPUT_WINDOW, height=180,
+                                          bd=1, relief="solid")
+        self.rate_chart.add_axis("kbps", "left", " kbps")
+        self.rate_chart.pack(fill='both', expand=True, pady=5)
         
-        # Ping UI 部分...
+        # Ping UI 部分：多目标并发探测，回包逐条显示，统计按目标汇总
         self.ping_frame = ttk.LabelFrame(self, text="连通性 (Ping)")
-        self.ping_frame.pack(side='right', fill='y', padx=5)
+        self.ping_frame.pack(side='right', fill='both', padx=5)
+
+        bar = ttk.Frame(self.ping_frame)
+        bar.pack(fill='x', pady=2)
+        self.ping_targets = tk.StringVar(value=PING_TARGETS)
+        ttk.Entry(bar, textvariable=self.ping_targets, width=30).pack(side='left', fill='x', expand=True)
+        self.ping_continuous = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="持续", variable=self.ping_continuous).pack(side='left', padx=2)
+        self.btn_ping = ttk.Button(bar, text="开始", command=self.toggle_ping)
+        self.btn_ping.pack(side='left')
+
+        self.ping_table = ttk.Treeview(self.ping_frame, columns=[c[0] for c in PING_COLUMNS],
+                                       show='headings', height=4)
+        for key, title, width in PING_COLUMNS:
+            self.ping_table.heading(key, text=title)
+            self.ping_table.column(key, width=width, anchor='w' if key == "target" else 'e')
+        self.ping_table.pack(fill='x', pady=2)
+
         self.ping_log = scrolledtext.ScrolledText(self.ping_frame, width=35, height=10)
         self.ping_log.pack(fill='both', expand=True)
-        
-        ttk.Button(self.ping_frame, text="Ping Baidu", command=lambda: self.run_ping("www.baidu.com")).pack()
 
     def start(self):
+        if self._throughput_job is not None:
+            return
         self.running = True
-        self._refresh_ui_loop()
+        # 采样在后台调度器中执行，结果回到界面线程后再刷新
+        self.scheduler.add("network", self._sample, SAMPLE_INTERVAL, self._on_sample,
+                           deadline=SAMPLE_DEADLINE)
+        self._start_throughput()
+        self._throughput_job = self.after(THROUGHPUT_REFRESH_MS, self._throughput_loop)
 
     def stop(self):
         self.running = False
+        self.scheduler.cancel("network")
+        self.throughput.stop()
+        if self._throughput_job is not None:
+            self.after_cancel(self._throughput_job)
+            self._throughput_job = None
 
-    def _refresh_ui_loop(self):
-        """UI 刷新循环：只负责拿数据和展示"""
+    def close(self):
+        """退出时停止探测与采样，并取消设备订阅"""
+        self.stop_ping()
+        self.stop()
+        self.devices.close()
+
+    def _sample(self):
+        """调度器线程：没有可用设备时不发起任何 adb 调用"""
+        if not self.devices.is_online():
+            return None
+        # 网络与资源指标一次 adb 往返采集，数值指标同时写入历史
+        return MonitorService.sample(store=self.metrics)["network"]
+
+    def _on_sample(self, status, error):
+        """界面线程：只负责展示"""
         if not self.running or not self.winfo_exists(): return
 
-        # === 核心变化：调用 Service 获取纯数据 ===
-        status = NetworkService.analyze_network_status()
-        
+        if error is not None:
+            self.lbl_diag.config(text=f"诊断: 采样失败 ({error})", foreground="gray")
+            return
+        if status is None:
+            self.lbl_diag.config(text="诊断: 设备未连接", foreground="gray")
+            return
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(STREAM_NETWORK, status)
+        self.show_status(status)
+
+    def show_status(self, status):
+        """展示一次网络状态（实时采样或回放录制的会话）"""
         # === 界面逻辑：根据数据决定显示什么颜色 ===
         # 1. WiFi
         self.lbl_wifi.config(text=f"WiFi RSSI: {status['wifi_rssi']} dBm")
@@ -61,14 +167,133 @@ class NetworkTab(ttk.Frame):
         else:
             self.lbl_diag.config(text="诊断: 网络状态正常", foreground="green")
 
-        # 定时刷新
-        self.after(3000, self._refresh_ui_loop)
+    # ============ 吞吐量 ============
+
+    def _start_throughput(self):
+        """在调度线程中打开采样的 adb 流；打不开时由刷新循环定期重试"""
+        self._throughput_started_at = time.monotonic()
+        self.scheduler.submit("throughput_start", self._open_throughput, self._on_throughput_started)
+
+    def _open_throughput(self):
+        """调度器线程：没有可用设备时不发起任何 adb 调用"""
+        if self.devices.is_online():
+            self.throughput.start()
 
-    def run_ping(self, target):
-        def task():
-            self.ping_log.insert(tk.END, f"\n--- Ping {target} ---\n")
-            # 调用 Service
-            res = NetworkService.ping_target(target)
-            self.ping_log.insert(tk.END, res)
+    def _on_throughput_started(self, result, error):
+        """界面线程：启动期间标签页已隐藏（stop）的，立即停止采样"""
+        if not self.running:
+            self.throughput.stop()
+
+    def _throughput_loop(self):
+        """界面线程：刷新各网卡速率与图表；采样断开（如设备重连）后定期重启"""
+        self._throughput_job = None
+        if not self.running or not self.winfo_exists():
+            return
+        if not self.throughput.running and \
+                time.monotonic() - self._throughput_started_at >= THROUGHPUT_RETRY_INTERVAL:
+            self._start_throughput()
+        rates = self.throughput.rates
+        # 只显示有流量的网卡，首次出现时加入图表
+        active = [name for name in sorted(rates) if name in self._rate_series or
+                  rates[name]["rx_kbps"] or rates[name]["tx_kbps"]]
+        for name in active:
+            if name not in self._rate_series:
+                rx_color, tx_color = THROUGHPUT_COLORS[len(self._rate_series) % len(THROUGHPUT_COLORS)]
+                self.rate_chart.add_series(f"{name}.rx_kbps", rx_color, "kbps", f"{name} ↓")
+                self.rate_chart.add_series(f"{name}.tx_kbps", tx_color, "kbps", f"{name} ↑")
+                self._rate_series.add(name)
+        text = "\n".join(f"{name}: ↓ {rates[name]['rx_kbps']:.0f} kbps ({rates[name]['rx_pps']:.0f} pps)  "
+                         f"↑ {rates[name]['tx_kbps']:.0f} kbps ({rates[name]['tx_pps']:.0f} pps)"
+                         for name in active if name in rates)
+        self.lbl_rates.config(text=f"吞吐量:\n{text}" if text else "吞吐量: 无流量")
+        self.rate_chart.refresh_from(self.throughput.history)
+        self._throughput_job = self.after(THROUGHPUT_REFRESH_MS, self._throughput_loop)
+
+    # ============ 延迟探测 ============
+
+    def toggle_ping(self):
+        if self.prober is not None and self.prober.running:
+            self.stop_ping()
+        else:
+            self.run_ping(self.ping_targets.get().replace(",", " ").split())
+
+    def run_ping(self, targets):
+        """并发探测多个目标；勾选“持续”时一直探测直到手动停止"""
+        if not targets or self._ping_starting:
+            return
+        self.stop_ping()
+        if self._ping_job is not None:
+            self.after_cancel(self._ping_job)
+            self._ping_job = None
+        count = None if self.ping_continuous.get() else PING_COUNT
+        self.ping_log.insert(tk.END, f"\n--- Ping {' '.join(targets)} ---\n")
+        self.ping_table.delete(*self.ping_table.get_children())
+        for target in dict.fromkeys(targets):
+            self.ping_table.insert('', tk.END, iid=target, values=(target,))
+        # 回包在读取线程中到达，先放入队列，由界面线程统一刷新（每次探测换新队列，旧探测的残留不混入）
+        replies = self._replies = queue.SimpleQueue()
+        prober = self.prober = LatencyProber(targets, count=count, on_reply=lambda *reply: replies.put(reply))
+        # 打开 adb 流会阻塞，放到调度线程执行，启动完成前按钮不可用
+        self._ping_starting = True
+        self.btn_ping.config(state='disabled')
+        self.scheduler.submit("ping_start", prober.start,
+                              lambda result, error: self._on_ping_started(prober, error))
+
+    def _on_ping_started(self, prober, error):
+        """界面线程：启动成功后开始刷新回包与统计"""
+        self._ping_starting = False
+        if not self.winfo_exists():
+            prober.stop()
+            return
+        self.btn_ping.config(state='normal')
+        if error is not None:
+            self.ping_log.insert(tk.END, f"Error: {error}\n")
+            self.prober = None
+            return
+        self.btn_ping.config(text="停止")
+        self._ping_job = self.after(PING_REFRESH_MS, self._refresh_ping)
+
+    def stop_ping(self):
+        """停止探测；刷新循环会在下一轮输出最终统计后自行结束"""
+        if self.prober is not None:
+            self.prober.stop()
+
+    def _refresh_ping(self):
+        """界面线程：输出新回包、刷新统计表；探测结束后最后刷新一次并停止"""
+        self._ping_job = None
+        if not self.winfo_exists() or self.prober is None:
+            return
+        prober = self.prober
+        running = prober.running
+        lines = []
+        while True:
+            try:
+                target, seq, rtt = self._replies.get_nowait()
+            except queue.Empty:
+                break
+            lines.append(f"{target} #{seq}: " + (f"{rtt:.1f} ms" if rtt is not None else "超时") + "\n")
+        if lines:
+            self.ping_log.insert(tk.END, "".join(lines))
+            # 持续探测时日志只保留最近的若干行
+            extra = int(self.ping_log.index('end-1c').split('.')[0]) - PING_LOG_LINES
+            if extra > 0:
+                self.ping_log.delete('1.0', f'{extra + 1}.0')
             self.ping_log.see(tk.END)
-        threading.Thread(target=task).start()
\ No newline at end of file
+
+        for target, stats in prober.snapshot().items():
+            self.ping_table.item(target, values=tuple(self._format_stat(key, stats[key])
+                                                      for key, _, _ in PING_COLUMNS))
+        if running:
+            self._ping_job = self.after(PING_REFRESH_MS, self._refresh_ping)
+        else:
+            self.btn_ping.config(text="开始")
+
+    @staticmethod
+    def _format_stat(key, value):
+        if value is None:
+            return "-"
+        if key == "loss":
+            return f"{value:.0f}"
+        if isinstance(value, float):
+            return f"{value:.1f}"
+        return value
@@ -0,0 +1,7 @@
+"""GUI Widgets - 可复用控件"""
+
+from gui.widget.chart import TimeSeriesChart
+from gui.widget.log_view import VirtualLogView
+from gui.widget.session_bar import SessionBar
+
+__all__ = ["TimeSeriesChart", "VirtualLogView", "SessionBar"]
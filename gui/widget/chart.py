@@ -0,0 +1,229 @@
+import time
+import tkinter as tk
+
+# 绘图区四周留白（像素）：左、上、右、下
+MARGIN = (52, 22, 52, 22)
+# 纵轴刻度数
+Y_TICKS = 4
+
+
+def decimate(points, t0, t1, width):
+    """
+    把任意数量的 (ts, min, max, mean) 降采样到 width 列：每列保留最小值与最大值，
+    返回 [(列号, 最小, 最大), ...]。折线依次经过每列的最大、最小值，尖峰不会因降采样丢失
+    """
+    if width <= 0 or t1 <= t0:
+        return []
+    scale = width / (t1 - t0)
+    columns = []
+    last_col, low, high = None, 0.0, 0.0
+    for ts, p_min, p_max, _ in points:
+        if ts < t0 or ts > t1:
+            continue
+        col = min(width - 1, int((ts - t0) * scale))
+        if col != last_col:
+            if last_col is not None:
+                columns.append((last_col, low, high))
+            last_col, low, high = col, p_min, p_max
+        else:
+            if p_min < low:
+                low = p_min
+            if p_max > high:
+                high = p_max
+    if last_col is not None:
+        columns.append((last_col, low, high))
+    return columns
+
+
+class _Series:
+    __slots__ = ("name", "label", "color", "axis", "points", "item", "legend", "version")
+
+    def __init__(self, name, label, color, axis):
+        self.name = name
+        self.label = label
+        self.color = color
+        self.axis = axis
+        self.points = []
+        self.item = None
+        self.legend = None
+        # 数据版本，set_data 时递增，用于判断是否需要重绘
+        self.version = 0
+
+
+class _Axis:
+    __slots__ = ("name", "side", "unit", "fixed", "labels")
+
+    def __init__(self, name, side, unit, fixed):
+        self.name = name
+        # left / right / None（不显示刻度，只用于独立缩放）
+        self.side = side
+        self.unit = unit
+        # 固定范围 (lo, hi)，None 表示按可见数据自动缩放
+        self.fixed = fixed
+        self.labels = []
+
+
+class TimeSeriesChart(tk.Canvas):
+    """
+    增量绘制的多序列折线图：
+    - 每个序列只有一个 line 条目，数据变化时用 coords() 原地更新，不删除重建；
+    - 任意数量的样本按像素列做 min/max 降采样，每帧点数与数据量无关；
+    - 每个序列挂在一个纵轴上，左右两侧各可显示一个轴的刻度；
+    - 只有数据、时间窗口或尺寸变化时才重绘。
+    数据格式与 TimeSeriesStore.query 一致：[(ts, min, max, mean), ...]。
+    """
+
+    def __init__(self, parent, window=300, **options):
+        options.setdefault("bg", "white")
+        options.setdefault("highlightthickness", 0)
+        super().__init__(parent, **options)
+        # 显示的时间跨度（秒），终点为各序列最新样本的时间
+        self.window = window
+        self._series = {}
+        self._axes = {}
+        self._drawn = None
+        self._frame = self.create_rectangle(0, 0, 0, 0, outline="#ccc")
+        self._time_labels = [self.create_text(0, 0, text="", anchor='n', fill="#888", font=("Arial", 8))
+                             for _ in range(2)]
+        self.bind("<Configure>", lambda e: self.redraw())
+
+    # ============ 配置 ============
+
+    def add_axis(self, name, side=None, unit="", fixed=None):
+        axis = _Axis(name, side, unit, fixed)
+        if side:
+            axis.labels = [self.create_text(0, 0, text="", fill="#888", font=("Arial", 8),
+                                            anchor='e' if side == "left" else 'w')
+                           for _ in range(Y_TICKS + 1)]
+        self._axes[name] = axis
+        return self
+
+    def add_series(self, name, color, axis=None, label=None):
+        if axis is None:
+            if not self._axes:
+                self.add_axis("default", "left")
+            axis = next(iter(self._axes))
+        series = _Series(name, label or name, color, axis)
+        series.item = self.create_line(0, 0, 0, 0, fill=color, width=1.5, state='hidden')
+        series.legend = self.create_text(0, 0, text=series.label, fill=color, anchor='nw',
+                                         font=("Arial", 9, "bold"))
+        self._series[name] = series
+        self._layout_legend()
+        return self
+
+    def set_window(self, seconds):
+        self.window = seconds
+        self.redraw()
+
+    # ============ 数据 ============
+
+    def set_data(self, name, points):
+        """替换某序列的数据（按时间升序），之后调用 redraw() 或 refresh_from()"""
+        series = self._series[name]
+        series.points = points
+        series.version += 1
+
+    def refresh_from(self, store, now=None):
+        """
+        从 TimeSeriesStore 拉取当前窗口的数据并重绘；
+        每个序列最多读取与绘图区宽度相当的点数，由存储选择合适的汇总级别
+        """
+        t1 = time.time() if now is None else now
+        t0 = t1 - self.window
+        width = self._plot_box()[2] - self._plot_box()[0]
+        for name, series in self._series.items():
+            points = store.query(name, t0, t1, max_points=max(2, width))
+            if points != series.points:
+                self.set_data(name, points)
+        self.redraw()
+
+    # ============ 绘制 ============
+
+    def _plot_box(self):
+        width, height = self.winfo_width(), self.winfo_height()
+        left, top, right, bottom = MARGIN
+        return left, top, max(left + 1, width - right), max(top + 1, height - bottom)
+
+    def _time_range(self):
+        latest = max((s.points[-1][0] for s in self._series.values() if s.points), default=None)
+        if latest is None:
+            return None
+        return latest - self.window, latest
+
+    def redraw(self, force=False):
+        """数据、时间窗口、尺寸都没有变化时直接返回"""
+        box = self._plot_box()
+        span = self._time_range()
+        key = (box, span, tuple(s.version for s in self._series.values()))
+        if not force and key == self._drawn:
+            return
+        self._drawn = key
+
+        x0, y0, x1, y1 = box
+        self.coords(self._frame, x0, y0, x1, y1)
+        if span is None:
+            for series in self._series.values():
+                self.itemconfig(series.item, state='hidden')
+            return
+        t0, t1 = span
+        width, height = x1 - x0, y1 - y0
+
+        # 每个序列先降采样，再按轴统计可见范围
+        columns = {name: decimate(s.points, t0, t1, width) for name, s in self._series.items()}
+        ranges = {}
+        for name, series in self._series.items():
+            if not columns[name]:
+                continue
+            lo = min(c[1] for c in columns[name])
+            hi = max(c[2] for c in columns[name])
+            old = ranges.get(series.axis)
+            ranges[series.axis] = (lo, hi) if old is None else (min(old[0], lo), max(old[1], hi))
+        for name, axis in self._axes.items():
+            if axis.fixed:
+                ranges[name] = axis.fixed
+            lo, hi = ranges.get(name, (0.0, 1.0))
+            if hi - lo < 1e-9:
+                lo, hi = lo - 1, hi + 1
+            ranges[name] = (lo, hi)
+            self._draw_axis(axis, lo, hi, box)
+
+        for name, series in self._series.items():
+            cols = columns[name]
+            if not cols:
+                self.itemconfig(series.item, state='hidden')
+                continue
+            lo, hi = ranges[series.axis]
+            ky = height / (hi - lo)
+            coords = []
+            for col, c_min, c_max in cols:
+                x = x0 + col
+                coords += (x, y1 - (c_max - lo) * ky, x, y1 - (c_min - lo) * ky)
+            if len(coords) == 4 and coords[1] == coords[3]:
+                # 只有一个点时画一小段横线，保证可见
+                coords[2] += 1
+            self.coords(series.item, *coords)
+            self.itemconfig(series.item, state='normal')
+
+        self.coords(self._time_labels[0], x0, y1 + 4)
+        self.itemconfig(self._time_labels[0], text=time.strftime("%H:%M:%S", time.localtime(t0)))
+        self.coords(self._time_labels[1], x1, y1 + 4)
+        self.itemconfig(self._time_labels[1], text=time.strftime("%H:%M:%S", time.localtime(t1)))
+
+    def _draw_axis(self, axis, lo, hi, box):
+        if not axis.labels:
+            return
+        x0, y0, x1, y1 = box
+        x = x0 - 4 if axis.side == "left" else x1 + 4
+        for i, label in enumerate(axis.labels):
+            value = lo + (hi - lo) * i / Y_TICKS
+            y = y1 - (y1 - y0) * i / Y_TICKS
+            self.coords(label, x, y)
+            text = f"{value:.0f}" if abs(hi - lo) >= Y_TICKS else f"{value:.1f}"
+            self.itemconfig(label, text=f"{text}{axis.unit}" if i == Y_TICKS else text)
+
+    def _layout_legend(self):
+        x = MARGIN[0]
+        for series in self._series.values():
+            self.coords(series.legend, x, 4)
+            bbox = self.bbox(series.legend)
+            x = (bbox[2] if bbox else x) + 16
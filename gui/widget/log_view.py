@@ -0,0 +1,174 @@
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk, font as tkfont
+
+# 级别 -> 颜色 tag（与原 ScrolledText 的配色一致）
+LEVEL_TAGS = {"E": "E", "F": "E", "W": "W", "I": "I"}
+
+
+class _RecordList:
+    """把一组 LogRecord（如检索结果）包装成与 LogStore 相同的读取接口，下标即 seq"""
+
+    def __init__(self, records):
+        self.records = records
+        self.first_seq = 0
+        self.next_seq = len(records)
+
+    def read(self, start, end=None):
+        return self.records[start:end]
+
+    def find_time(self, ts):
+        return bisect_left([record.ts for record in self.records], ts)
+
+
+class VirtualLogView(ttk.Frame):
+    """
+    虚拟化日志视图：Text 控件只容纳当前可见的若干行，
+    滚动条位置由 LogStore 的 seq 区间换算，而不是由控件内容决定。
+    每次刷新只读取并渲染可见行，代价与日志总量无关。
+    """
+
+    def __init__(self, parent, store, **text_options):
+        super().__init__(parent)
+        self.store = store
+        # 当前显示的数据源：实时日志时为 store，检索结果模式下为 _RecordList
+        self.source = store
+        # 跟随最新日志（自动滚动）
+        self.follow = True
+        # 可见区域第一行的 seq
+        self.top_seq = 0
+        self._rows = 1
+        # 上一次渲染的 (top, bottom, first_seq)，未变化时跳过重绘
+        self._rendered = None
+
+        self.text = tk.Text(self, wrap='none', state='disabled', **text_options)
+        self.vbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.hbar = ttk.Scrollbar(self, orient='horizontal', command=self.text.xview)
+        self.text.config(xscrollcommand=self.hbar.set)
+        self.vbar.pack(side='right', fill='y')
+        self.hbar.pack(side='bottom', fill='x')
+        self.text.pack(side='left', fill='both', expand=True)
+
+        self.text.tag_config("E", foreground="red")
+        self.text.tag_config("W", foreground="orange")
+        self.text.tag_config("I", foreground="green")
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.text.bind("<Prior>", lambda e: self.scroll_rows(-self._rows))
+        self.text.bind("<Next>", lambda e: self.scroll_rows(self._rows))
+        self.text.bind("<Control-End>", lambda e: self.set_follow(True))
+
+    # ============ 对外接口 ============
+
+    def refresh(self, force=False):
+        """按当前位置重绘可见行（数据或位置未变化时不做任何事）"""
+        first, last = self.source.first_seq, self.source.next_seq
+        if self.follow:
+            self.top_seq = max(first, last - self._rows)
+        else:
+            self.top_seq = min(max(self.top_seq, first), max(first, last - self._rows))
+        bottom = min(last, self.top_seq + self._rows)
+
+        key = (self.top_seq, bottom, first)
+        if force or key != self._rendered:
+            self._render(self.top_seq, bottom)
+            self._rendered = key
+        self._update_scrollbar(first, last)
+
+    def set_follow(self, follow=True):
+        self.follow = follow
+        self.refresh()
+
+    def scroll_rows(self, delta):
+        """按行滚动；滚到底部时恢复自动跟随"""
+        first, last = self.source.first_seq, self.source.next_seq
+        self.top_seq = min(max(first, self.top_seq + delta), max(first, last - self._rows))
+        self.follow = self.top_seq + self._rows >= last
+        self.refresh()
+
+    def jump_to_seq(self, seq):
+        self.follow = False
+        self.top_seq = seq
+        self.refresh()
+
+    def jump_to_time(self, ts):
+        """定位到第一条时间戳 >= ts 的日志"""
+        self.jump_to_seq(self.source.find_time(ts))
+
+    def visible_rows(self):
+        return self._rows
+
+    def show_results(self, records):
+        """切换到检索结果模式，显示给定的 LogRecord 列表"""
+        self.source = _RecordList(records)
+        self.follow = False
+        self.top_seq = 0
+        self.refresh(force=True)
+
+    def set_store(self, store):
+        """切换底层存储（如会话回放时换成回放用的 LogStore），原存储的内容不受影响"""
+        self.store = store
+        self.show_live()
+
+    def show_live(self):
+        """回到实时日志"""
+        self.source = self.store
+        self.follow = True
+        self.refresh(force=True)
+
+    def in_results(self):
+        return self.source is not self.store
+
+    # ============ 内部实现 ============
+
+    def _render(self, top, bottom):
+        records = self.source.read(top, bottom)
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join(record.line for record in records))
+
+        # 相同级别的连续行合并为一个区间打 tag
+        run_tag, run_start = None, 0
+        for row, record in enumerate(records):
+            tag = LEVEL_TAGS.get(record.level)
+            if tag != run_tag:
+                if run_tag:
+                    self.text.tag_add(run_tag, f"{run_start + 1}.0", f"{row + 1}.0")
+                run_tag, run_start = tag, row
+        if run_tag:
+            self.text.tag_add(run_tag, f"{run_start + 1}.0", tk.END)
+        self.text.config(state='disabled')
+
+    def _update_scrollbar(self, first, last):
+        total = last - first
+        if total <= 0:
+            self.vbar.set(0.0, 1.0)
+            return
+        lo = (self.top_seq - first) / total
+        hi = min(1.0, (self.top_seq - first + self._rows) / total)
+        self.vbar.set(lo, hi)
+
+    def _on_scrollbar(self, action, *args):
+        first, last = self.source.first_seq, self.source.next_seq
+        if action == "moveto":
+            target = first + int(float(args[0]) * (last - first))
+            self.scroll_rows(target - self.top_seq)
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self.scroll_rows(amount * (self._rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        # Windows 每格 120，macOS 为 1~几
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-3 * step)
+        return "break"
+
+    def _on_resize(self, event):
+        line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace") or 1
+        rows = max(1, event.height // line_height)
+        if rows != self._rows:
+            self._rows = rows
+            self.refresh(force=True)
@@ -0,0 +1,238 @@
+import os
+import time
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.services.session_record import (
+    STREAM_LOGCAT, STREAM_MONITOR, STREAM_NETWORK, SessionPlayer, SessionReader, SessionRecorder)
+from androidToolbox.services.timeseries import TimeSeriesStore
+
+# 录制文件的默认目录与扩展名
+SESSION_ROOT = os.path.join(os.path.expanduser("~"), ".androidToolbox", "sessions")
+SESSION_EXT = ".atsess"
+# 可选的回放倍速
+SPEEDS = {"0.5x": 0.5, "1x": 1.0, "2x": 2.0, "5x": 5.0, "20x": 20.0, "100x": 100.0}
+# 跳转时重建视图所回看的时长（秒）：日志与监控图表
+LOG_REWIND = 120
+METRIC_REWIND = 3600
+
+
+class SessionBar(ttk.Frame):
+    """
+    会话录制 / 回放工具条：
+    - 录制：logcat 行、监控样本、网络状态写入同一个录制文件（SessionRecorder）；
+    - 回放：打开录制文件后停止实时采集，通过同样的日志、网络、监控视图按任意倍速回放，
+      进度条可任意拖动，无需连接设备。
+    回放记录由回放线程经 post 投递到界面线程。
+    """
+
+    def __init__(self, parent, post, get_tab, on_playback_end=None):
+        super().__init__(parent)
+        self._post = post
+        # get_tab(name, create=True)：按名称（"log" / "net" / "mon"）取标签页，未创建的按需创建
+        self.get_tab = get_tab
+        self.on_playback_end = on_playback_end
+        self.recorder = None
+        self.reader = None
+        self.player = None
+        # 回放用的指标历史，不写入实时的指标存储
+        self._playback_metrics = None
+        self._scrubbing = False
+        self._setup_ui()
+
+    def _setup_ui(self):
+        self.btn_record = ttk.Button(self, text="⏺ 录制", command=self.toggle_record)
+        self.btn_record.pack(side='left', padx=2)
+        self.btn_open = ttk.Button(self, text="📂 回放", command=self.open_playback)
+        self.btn_open.pack(side='left', padx=2)
+
+        # 以下控件只在回放时可用
+        self.btn_play = ttk.Button(self, text="⏸", width=3, command=self.toggle_pause, state='disabled')
+        self.btn_play.pack(side='left', padx=2)
+        self.speed_var = tk.StringVar(value="1x")
+        self.speed_box = ttk.Combobox(self, textvariable=self.speed_var, values=list(SPEEDS),
+                                      state='disabled', width=5)
+        self.speed_box.pack(side='left', padx=2)
+        self.speed_box.bind("<<ComboboxSelected>>", self._on_speed)
+        self.scale = ttk.Scale(self, from_=0, to=1, orient='horizontal', state='disabled')
+        self.scale.pack(side='left', fill='x', expand=True, padx=5)
+        self.scale.bind("<ButtonPress-1>", lambda e: setattr(self, "_scrubbing", True))
+        self.scale.bind("<ButtonRelease-1>", self._on_scrub)
+        self.lbl_time = ttk.Label(self, text="", width=20)
+        self.lbl_time.pack(side='left')
+        self.btn_close = ttk.Button(self, text="退出回放", command=self.close_playback, state='disabled')
+        self.btn_close.pack(side='left', padx=2)
+
+    # 回放需要展示全部视图，取用时按需创建；录制只挂到已创建的页面，之后创建的由主窗口挂上
+    @property
+    def tab_log(self):
+        return self.get_tab("log")
+
+    @property
+    def tab_net(self):
+        return self.get_tab("net")
+
+    @property
+    def tab_mon(self):
+        return self.get_tab("mon")
+
+    @property
+    def playing(self):
+        return self.player is not None
+
+    # ============ 录制 ============
+
+    def toggle_record(self):
+        if self.recorder is not None:
+            self.stop_record()
+            return
+        os.makedirs(SESSION_ROOT, exist_ok=True)
+        path = filedialog.asksaveasfilename(
+            initialdir=SESSION_ROOT,
+            initialfile=time.strftime("session_%Y%m%d_%H%M%S") + SESSION_EXT,
+            defaultextension=SESSION_EXT,
+            filetypes=[("Session files", "*" + SESSION_EXT), ("All files", "*.*")],
+            title="录制会话")
+        if not path:
+            return
+        devices = ADBManager.device_registry().online()
+        try:
+            self.recorder = SessionRecorder(path, {"devices": devices, "app": "androidToolbox"})
+        except OSError as e:
+            messagebox.showerror("错误", f"无法创建录制文件:\n{str(e)}")
+            return
+        self._attach(self.recorder)
+        self.btn_record.config(text="⏹ 停止录制")
+        self.btn_open.config(state='disabled')
+
+    def stop_record(self):
+        if self.recorder is None:
+            return
+        self._attach(None)
+        self.recorder.close()
+        self.recorder = None
+        self.btn_record.config(text="⏺ 录制")
+        self.btn_open.config(state='normal')
+
+    def _attach(self, recorder):
+        for name in ("log", "net", "mon"):
+            tab = self.get_tab(name, create=False)
+            if tab is not None:
+                tab.recorder = recorder
+
+    # ============ 回放 ============
+
+    def open_playback(self):
+        path = filedialog.askopenfilename(
+            initialdir=SESSION_ROOT if os.path.isdir(SESSION_ROOT) else None,
+            filetypes=[("Session files", "*" + SESSION_EXT), ("All files", "*.*")],
+            title="打开录制的会话")
+        if not path:
+            return
+        try:
+            reader = SessionReader(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"无法打开录制文件:\n{str(e)}")
+            return
+        span = reader.time_range()
+        if span is None:
+            reader.close()
+            messagebox.showwarning("警告", "录制文件中没有记录")
+            return
+        self.close_playback(notify=False)
+
+        # 停止实时采集，视图改为展示录制内容
+        self.tab_net.stop()
+        self.tab_mon.stop()
+        self.tab_log.begin_playback()
+
+        self.reader = reader
+        self.player = SessionPlayer(
+            reader,
+            on_records=lambda records: self._post(self._apply_records, records, None),
+            speed=SPEEDS[self.speed_var.get()],
+            on_seek=lambda ts: self._post(self._rebuild, ts, None))
+        self.scale.config(from_=span[0], to=max(span[1], span[0] + 1))
+        for widget in (self.btn_play, self.scale, self.btn_close):
+            widget.config(state='normal')
+        self.speed_box.config(state='readonly')
+        self.btn_record.config(state='disabled')
+        self.btn_play.config(text="⏸")
+        self._rebuild(span[0], None)
+        self.player.play()
+
+    def close_playback(self, notify=True):
+        if self.player is None:
+            return
+        self.player.stop()
+        self.reader.close()
+        self.player = self.reader = None
+        self._playback_metrics = None
+        self.tab_log.end_playback()
+        for widget in (self.btn_play, self.scale, self.btn_close):
+            widget.config(state='disabled')
+        self.speed_box.config(state='disabled')
+        self.btn_record.config(state='normal')
+        self.lbl_time.config(text="")
+        if notify and self.on_playback_end is not None:
+            self.on_playback_end()
+
+    def toggle_pause(self):
+        if self.player is None:
+            return
+        if self.player.paused:
+            if self.player.finished:
+                self.player.seek(self.player.start_ts)
+            self.player.resume()
+            self.btn_play.config(text="⏸")
+        else:
+            self.player.pause()
+            self.btn_play.config(text="▶")
+
+    def _on_speed(self, event=None):
+        if self.player is not None:
+            self.player.speed = SPEEDS[self.speed_var.get()]
+
+    def _on_scrub(self, event=None):
+        self._scrubbing = False
+        if self.player is not None:
+            self.player.seek(float(self.scale.get()))
+
+    def _rebuild(self, ts, error):
+        """跳转后重建视图：日志回看 LOG_REWIND 秒，图表回看 METRIC_REWIND 秒，网络状态取最后一次"""
+        if self.reader is None:
+            return
+        self.tab_log.reset_playback()
+        self._playback_metrics = TimeSeriesStore()
+        # 日志只回看较短的一段，较早的部分只读监控与网络记录
+        records = list(self.reader.read(ts - METRIC_REWIND, ts - LOG_REWIND, (STREAM_MONITOR, STREAM_NETWORK)))
+        records += self.reader.read(ts - LOG_REWIND, ts)
+        self._apply_records(records, None, now=ts)
+
+    def _apply_records(self, records, error, now=None):
+        """界面线程：把一批回放记录分发给各视图"""
+        if self.player is None or self._playback_metrics is None:
+            return
+        lines, status, sample = [], None, None
+        for ts, stream, payload in records:
+            if stream == STREAM_LOGCAT:
+                lines.append(payload)
+            elif stream == STREAM_NETWORK:
+                status = payload
+            elif stream == STREAM_MONITOR:
+                sample = payload
+                self._playback_metrics.record(payload.get("metrics", {}), ts)
+        if now is None:
+            now = records[-1][0] if records else self.player.position
+        self.tab_log.show_playback(lines)
+        if status is not None:
+            self.tab_net.show_status(status)
+        self.tab_mon.show_sample(sample, self._playback_metrics, now)
+
+        if not self._scrubbing:
+            self.scale.set(now)
+        self.lbl_time.config(text=time.strftime("%m-%d %H:%M:%S", time.localtime(now)))
+        if self.player.finished and not self.player.paused:
+            self.player.pause()
+            self.btn_play.config(text="▶")
@@ -1,7 +1,12 @@
+import time
+# 启动耗时以入口开始执行为起点（包含之后全部模块的导入）
+_STARTED = time.perf_counter()
+
+from androidToolbox.core.trace import startup_trace
+startup_trace.origin = _STARTED
+import os
 import sys
 import logging
-import tkinter as tk
-from gui.main_window import MainWindow
 from androidToolbox.core.adb import ADBManager
 
 # 配置日志
@@ -25,10 +30,20 @@ def check_environment():
 def init_adb():
     """ADB 初始化：检测路径并打印状态"""
     adb_source = ADBManager.init()
+    startup_trace.mark("adb_init")
     logger.info(f"ADB 来源: {adb_source}")
     return adb_source
 
 
+def start_metrics_dump():
+    """环境变量 ANDROIDTOOLBOX_METRICS_DUMP=文件路径 时，定期把 adb 命令耗时统计追加到该文件"""
+    path = os.environ.get("ANDROIDTOOLBOX_METRICS_DUMP")
+    if path:
+        interval = float(os.environ.get("ANDROIDTOOLBOX_METRICS_INTERVAL", 60))
+        ADBManager.start_metrics_dump(path, interval)
+        logger.info(f"ADB 命令统计每 {interval:g}s 写入: {path}")
+
+
 def setup_global_exception_handler():
     """全局异常捕获"""
     def handle_exception(exc_type, exc_value, exc_traceback):
@@ -39,15 +54,28 @@ def setup_global_exception_handler():
 
 
 if __name__ == "__main__":
+    # 无界面模式：python main.py --headless [参数]，不导入 tkinter，参数见 androidToolbox.cli
+    if "--headless" in sys.argv[1:]:
+        from androidToolbox.cli import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    startup_trace.mark("import")
+
     # 1. 环境检查
     check_environment()
 
     # 2. 全局异常处理
     setup_global_exception_handler()
 
-    # 3. ADB 初始化
+    # 3. ADB 初始化（只在这里检测一次，结果交给主窗口）
     adb_source = init_adb()
+    start_metrics_dump()
 
-    # 4. 启动 UI
-    app = MainWindow()
-    app.mainloop()
\ No newline at end of file
+    # 4. 启动 UI（GUI 模块在此才导入，无界面模式不加载 tkinter）
+    # --startup-trace 或环境变量 ANDROIDTOOLBOX_STARTUP_TRACE=1：拿到首次设备列表后输出启动耗时
+    from gui.main_window import MainWindow
+    startup_trace.mark("import_gui")
+    print_trace = "--startup-trace" in sys.argv[1:] or os.environ.get("ANDROIDTOOLBOX_STARTUP_TRACE") == "1"
+    app = MainWindow(adb_source, print_trace=print_trace)
+    app.mainloop()
+    ADBManager.metrics.stop_dump()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import socket
+import threading
+
+
+class FakeAdbServer:
+    """
+    在本机随机端口上模拟 adb server 的 smart-socket 协议，供客户端测试使用。
+    handlers 为 {服务名: handler(server, sock)}，服务名以 ":" 结尾时按前缀匹配；
+    handler 负责回复 OKAY / FAIL 及后续数据，返回后连接关闭。
+    host:transport* 默认回复 OKAY 后继续读取同一连接上的下一个请求。
+    """
+
+    def __init__(self, handlers=None, serials=("emu-1",)):
+        self.handlers = dict(handlers or {})
+        self.serials = list(serials)
+        self.requests = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        # 先 shutdown 唤醒阻塞在 accept() 中的线程，端口随即不再监听
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._thread.join(1)
+
+    @staticmethod
+    def recv_exact(sock, size):
+        buf = b""
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise EOFError
+            buf += chunk
+        return buf
+
+    @staticmethod
+    def block(data):
+        data = data.encode() if isinstance(data, str) else data
+        return b"%04x" % len(data) + data
+
+    @classmethod
+    def okay(cls, sock, data=None):
+        sock.sendall(b"OKAY" + (cls.block(data) if data is not None else b""))
+
+    @classmethod
+    def fail(cls, sock, message):
+        sock.sendall(b"FAIL" + cls.block(message))
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            try:
+                while True:
+                    service = self.recv_exact(conn, int(self.recv_exact(conn, 4), 16)).decode()
+                    self.requests.append(service)
+                    if service.startswith("host:transport"):
+                        serial = service.rpartition(":")[2]
+                        if service != "host:transport-any" and serial not in self.serials:
+                            self.fail(conn, f"device '{serial}' not found")
+                            return
+                        self.okay(conn)
+                        continue
+                    handler = self.handlers.get(service) or next(
+                        (h for name, h in self.handlers.items() if name.endswith(":") and service.startswith(name)),
+                        None)
+                    if handler is None:
+                        self.fail(conn, f"unknown service {service}")
+                    else:
+                        handler(self, conn, service)
+                    return
+            except (EOFError, OSError):
+                return
@@ -0,0 +1,58 @@
+import unittest
+
+from androidToolbox.core.adb_client import AdbClient, AdbProtocolError
+from tests.fake_server import FakeAdbServer
+
+
+def shell(server, sock, service):
+    server.okay(sock)
+    sock.sendall(f"ran {service[len('shell:'):]}\r\nline 2\r\n".encode())
+
+
+def exec_out(server, sock, service):
+    server.okay(sock)
+    sock.sendall(b"\x00\x01\r\n\xff")
+
+
+class AdbClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAdbServer({
+            "host:version": lambda server, sock, _: server.okay(sock, "0029"),
+            "host:devices": lambda server, sock, _: server.okay(sock, "emu-1\tdevice\nR58M\tunauthorized\n"),
+            "shell:": shell,
+            "exec:": exec_out,
+        })
+        self.addCleanup(self.server.close)
+        self.client = AdbClient(port=self.server.port, timeout=2)
+
+    def test_available(self):
+        self.assertTrue(self.client.is_available())
+        self.server.close()
+        self.assertFalse(AdbClient(port=self.server.port).is_available())
+
+    def test_devices(self):
+        self.assertEqual(self.client.devices(), [("emu-1", "device"), ("R58M", "unauthorized")])
+        self.assertEqual(self.client.devices_text(),
+                         "List of devices attached\nemu-1\tdevice\nR58M\tunauthorized")
+
+    def test_shell_switches_transport(self):
+        self.assertEqual(self.client.shell("getprop ro.x", "emu-1"), "ran getprop ro.x\nline 2\n")
+        self.assertEqual(self.server.requests[-2:], ["host:transport:emu-1", "shell:getprop ro.x"])
+        self.client.shell("id")
+        self.assertEqual(self.server.requests[-2], "host:transport-any")
+
+    def test_exec_out_is_binary_safe(self):
+        self.assertEqual(self.client.exec_out("screencap -p", "emu-1"), b"\x00\x01\r\n\xff")
+
+    def test_fail_message(self):
+        with self.assertRaisesRegex(AdbProtocolError, "device 'nope' not found"):
+            self.client.shell("id", "nope")
+        with self.assertRaisesRegex(AdbProtocolError, "unknown service"):
+            self.client.open_service("sync:", "emu-1")
+
+    def test_parse_devices(self):
+        self.assertEqual(AdbClient.parse_devices("List of devices attached\nabc\toffline\n\n"), [("abc", "offline")])
+
+
+if __name__ == "__main__":
+    unittest.main()
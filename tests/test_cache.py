@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+
+from androidToolbox.core.cache import MISSING, TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    def test_expiry(self):
+        cache = TTLCache()
+        cache.put("k", None, ttl=0.05)
+        self.assertIsNone(cache.get("k"))
+        time.sleep(0.06)
+        self.assertIs(cache.get("k"), MISSING)
+
+    def test_zero_ttl_is_not_cached(self):
+        cache = TTLCache()
+        cache.put("k", 1, ttl=0)
+        self.assertIs(cache.get("k"), MISSING)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2)
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.get("a")
+        cache.put("c", 3, 10)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_single_flight(self):
+        cache = TTLCache()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader, 10)))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        followers = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader, 10)))
+                     for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        # 等跟随者都进入等待后再放行加载
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+        stats = cache.stats()
+        self.assertEqual((stats["misses"], stats["coalesced"]), (1, 4))
+        self.assertEqual(cache.get_or_load("k", loader, 10), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_loader_error_is_shared_and_not_cached(self):
+        cache = TTLCache()
+        started, release = threading.Event(), threading.Event()
+        errors = []
+
+        def loader():
+            started.set()
+            release.wait(5)
+            raise OSError("adb gone")
+
+        def call():
+            try:
+                cache.get_or_load("k", loader, 10)
+            except OSError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        threads.append(threading.Thread(target=call))
+        threads[1].start()
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(errors, ["adb gone"] * 2)
+        self.assertIs(cache.get("k"), MISSING)
+
+    def test_cacheable(self):
+        cache = TTLCache()
+        value = cache.get_or_load("k", lambda: "Error: x", 10, cacheable=lambda v: not v.startswith("Error"))
+        self.assertEqual(value, "Error: x")
+        self.assertIs(cache.get("k"), MISSING)
+
+    def test_invalidate(self):
+        cache = TTLCache()
+        for key in ("shell a", "shell b", "devices"):
+            cache.put(key, 1, 10)
+        self.assertEqual(cache.invalidate(lambda key: key.startswith("shell")), 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.invalidate(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
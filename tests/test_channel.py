@@ -0,0 +1,76 @@
+import queue
+import threading
+import unittest
+
+from androidToolbox.core.channel import BoundedChannel
+
+
+def drain(channel):
+    lines = []
+    while not channel.empty():
+        lines += channel.get(timeout=0)
+    return lines
+
+
+class BoundedChannelTest(unittest.TestCase):
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            BoundedChannel(policy="nope")
+
+    def test_get_timeout(self):
+        with self.assertRaises(queue.Empty):
+            BoundedChannel().get(timeout=0.01)
+
+    def test_block_times_out_when_full(self):
+        channel = BoundedChannel(max_lines=4)
+        self.assertTrue(channel.put([1, 2, 3]))
+        self.assertFalse(channel.put([4, 5], timeout=0.01))
+        # 超时的批次不计入统计
+        self.assertEqual(channel.stats()["received"], 3)
+
+    def test_block_oversized_batch_into_empty_channel(self):
+        channel = BoundedChannel(max_lines=4)
+        self.assertTrue(channel.put(list(range(10)), timeout=0.01))
+        self.assertEqual(len(channel.get(timeout=0)), 10)
+
+    def test_block_resumes_after_get(self):
+        channel = BoundedChannel(max_lines=4)
+        channel.put([1, 2, 3])
+        done = []
+        producer = threading.Thread(target=lambda: done.append(channel.put([4, 5], timeout=5)))
+        producer.start()
+        self.assertEqual(channel.get(timeout=1), [1, 2, 3])
+        producer.join(5)
+        self.assertEqual(done, [True])
+        self.assertEqual(channel.get(timeout=1), [4, 5])
+        self.assertEqual(channel.stats()["dropped"], 0)
+
+    def test_drop_oldest(self):
+        channel = BoundedChannel(max_lines=5, policy=BoundedChannel.DROP_OLDEST)
+        channel.put([1, 2])
+        channel.put([3, 4])
+        channel.put([5, 6, 7])
+        self.assertEqual(drain(channel), [3, 4, 5, 6, 7])
+        stats = channel.stats()
+        self.assertEqual((stats["received"], stats["dropped"], stats["delivered"]), (7, 2, 5))
+
+    def test_drop_newest_keeps_samples(self):
+        channel = BoundedChannel(max_lines=10, policy=BoundedChannel.DROP_NEWEST, sample_every=5)
+        channel.put(list(range(10)))
+        channel.put(list(range(100, 120)))
+        channel.put(list(range(200, 220)))
+        # 写满后每 5 行保留一行，采样额度为 max_lines // sample_every
+        self.assertEqual(drain(channel), list(range(10)) + [100, 105])
+        stats = channel.stats()
+        self.assertEqual((stats["received"], stats["dropped"], stats["delivered"]), (50, 38, 12))
+
+    def test_clear_counts_pending_as_dropped(self):
+        channel = BoundedChannel(max_lines=10)
+        channel.put([1, 2, 3])
+        channel.clear()
+        self.assertTrue(channel.empty())
+        self.assertEqual(channel.stats()["dropped"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
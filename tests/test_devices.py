@@ -0,0 +1,119 @@
+import queue
+import unittest
+
+from androidToolbox.core.adb_client import AdbClient
+from androidToolbox.core.devices import DeviceEvent, DeviceRegistry, OnlineDevices
+from tests.fake_server import FakeAdbServer
+
+
+class DeviceRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.pushes = queue.Queue()
+        self.server = FakeAdbServer({"host:track-devices": self.track})
+        self.addCleanup(self.server.close)
+        self.events = queue.Queue()
+
+    def track(self, server, sock, service):
+        """推送流：每次从 pushes 取出一份完整设备列表发送，取到 None 时断开"""
+        server.okay(sock)
+        while True:
+            devices = self.pushes.get()
+            if devices is None:
+                return
+            sock.sendall(server.block("".join(f"{serial}\t{state}\n" for serial, state in devices)))
+
+    def start(self, **kwargs):
+        registry = DeviceRegistry(AdbClient(port=self.server.port), **kwargs)
+        registry.subscribe(self.events.put, replay=False)
+        registry.start()
+        self.addCleanup(registry.stop)
+        return registry
+
+    def next_event(self):
+        event = self.events.get(timeout=5)
+        return event.kind, event.serial, event.state
+
+    def test_push_events(self):
+        registry = self.start()
+        self.pushes.put([("emu-1", "device")])
+        self.assertEqual(self.next_event(), (DeviceEvent.CONNECTED, "emu-1", "device"))
+        self.assertTrue(registry.is_online("emu-1"))
+        self.pushes.put([("emu-1", "offline"), ("R58M", "unauthorized")])
+        self.assertEqual({self.next_event(), self.next_event()},
+                         {(DeviceEvent.STATE_CHANGED, "emu-1", "offline"),
+                          (DeviceEvent.CONNECTED, "R58M", "unauthorized")})
+        self.assertFalse(registry.is_online())
+        self.pushes.put([])
+        self.assertEqual({self.next_event(), self.next_event()},
+                         {(DeviceEvent.DISCONNECTED, "emu-1", None), (DeviceEvent.DISCONNECTED, "R58M", None)})
+        self.assertEqual(registry.devices(), {})
+        self.pushes.put(None)
+
+    def test_reconnects_after_server_restart(self):
+        registry = self.start()
+        self.pushes.put([("emu-1", "device")])
+        self.next_event()
+        # server 断开后重连，首次推送重新同步，状态未变时不重复派发
+        self.pushes.put(None)
+        self.pushes.put([("emu-1", "device"), ("emu-2", "device")])
+        self.assertEqual(self.next_event(), (DeviceEvent.CONNECTED, "emu-2", "device"))
+        self.assertEqual(sorted(registry.online()), ["emu-1", "emu-2"])
+        self.pushes.put(None)
+
+    def test_replay_and_unsubscribe(self):
+        registry = self.start()
+        self.pushes.put([("emu-1", "device")])
+        self.next_event()
+        replayed = []
+        unsubscribe = registry.subscribe(replayed.append)
+        self.assertEqual([(e.kind, e.serial) for e in replayed], [(DeviceEvent.CONNECTED, "emu-1")])
+        unsubscribe()
+        self.pushes.put([])
+        self.next_event()
+        self.assertEqual(len(replayed), 1)
+        self.pushes.put(None)
+
+    def test_poll_fallback(self):
+        self.server.close()
+        started, polls = [], queue.Queue()
+        polls.put([("emu-1", "device")])
+        polls.put([])
+        registry = self.start(start_server=lambda: started.append(True),
+                              poll=lambda: polls.get(timeout=5) if not polls.empty() else [], poll_interval=0.01)
+        self.assertEqual(self.next_event(), (DeviceEvent.CONNECTED, "emu-1", "device"))
+        self.assertEqual(self.next_event(), (DeviceEvent.DISCONNECTED, "emu-1", None))
+        self.assertEqual(started, [True])
+        self.assertEqual(registry.devices(), {})
+
+    def test_online_devices(self):
+        registry = self.start()
+        self.pushes.put([("emu-1", "device")])
+        self.next_event()
+        online = OnlineDevices(registry)
+        # 订阅者按顺序回调，排在后面的回调到达时 online 已更新
+        after = queue.Queue()
+        registry.subscribe(after.put, replay=False)
+        self.assertTrue(online.is_online())
+        self.assertTrue(online.is_online("emu-1"))
+        self.pushes.put([("emu-1", "offline"), ("emu-2", "device")])
+        after.get(timeout=5)
+        after.get(timeout=5)
+        self.assertEqual((online.is_online("emu-1"), online.is_online("emu-2")), (False, True))
+        online.close()
+        self.pushes.put([])
+        after.get(timeout=5)
+        after.get(timeout=5)
+        # 取消订阅后不再更新
+        self.assertTrue(online.is_online("emu-2"))
+        self.pushes.put(None)
+
+    def test_subscriber_error_is_isolated(self):
+        registry = self.start()
+        registry.subscribe(lambda event: 1 / 0, replay=False)
+        self.pushes.put([("emu-1", "device")])
+        self.assertEqual(self.next_event()[0], DeviceEvent.CONNECTED)
+        self.pushes.put(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
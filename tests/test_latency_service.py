@@ -0,0 +1,82 @@
+import unittest
+
+from androidToolbox.services.latency_service import LatencyProber, LatencyStats
+
+
+class LatencyStatsTest(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        ordered = list(range(1, 11))
+        self.assertEqual([LatencyStats._percentile(ordered, p) for p in (0, 10, 25, 50, 90, 95, 99, 100)],
+                         [1, 1, 3, 5, 9, 10, 10, 10])
+        self.assertEqual(LatencyStats._percentile([7], 50), 7)
+        # 恰好落在整数秩上时不应向上取下一个
+        ordered = list(range(1, 101))
+        self.assertEqual([LatencyStats._percentile(ordered, p) for p in (50, 95, 99)], [50, 95, 99])
+
+    def test_snapshot(self):
+        stats = LatencyStats("8.8.8.8")
+        for seq, rtt in enumerate((10.0, 30.0, 20.0), start=1):
+            stats.on_reply(seq, rtt)
+        self.assertEqual(list(stats.on_reply(6, 40.0)), [4, 5])
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot["sent"], snapshot["received"]), (6, 4))
+        self.assertAlmostEqual(snapshot["loss"], 100 * 2 / 6)
+        self.assertEqual((snapshot["min"], snapshot["avg"], snapshot["p50"], snapshot["p99"]),
+                         (10.0, 25.0, 20.0, 40.0))
+        self.assertEqual(snapshot["last"], 40.0)
+
+    def test_late_reply_reverses_loss(self):
+        stats = LatencyStats("gw")
+        self.assertEqual(list(stats.on_reply(3, 5.0)), [1, 2])
+        self.assertEqual(stats.on_reply(2, 1.0), ())
+        # 重复的回包不再计数
+        self.assertIsNone(stats.on_reply(2, 1.0))
+        self.assertEqual((stats.sent, stats.received), (3, 2))
+        self.assertAlmostEqual(stats.snapshot()["loss"], 100 / 3)
+
+    def test_window(self):
+        stats = LatencyStats("gw", window=4)
+        for seq in range(1, 11):
+            stats.on_reply(seq, float(seq))
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot["min"], snapshot["loss"]), (7.0, 0.0))
+
+    def test_late_reply_after_window_is_ignored(self):
+        stats = LatencyStats("gw", window=4)
+        stats.on_reply(10, 5.0)
+        self.assertIsNone(stats.on_reply(2, 1.0))
+        self.assertEqual(stats.received, 1)
+
+    def test_empty(self):
+        snapshot = LatencyStats("gw").snapshot()
+        self.assertEqual((snapshot["p50"], snapshot["loss"], snapshot["jitter"]), (None, 0.0, None))
+
+
+
+class LatencyProberTest(unittest.TestCase):
+    def test_expire_from_last_reply(self):
+        prober = LatencyProber(["a", "b"], interval=1.0)
+        prober._started_at = 100.0
+        prober.stats["a"].on_reply(5, 10.0, at=110.0)
+        prober.expire(now=112.0)
+        # a 以第 5 个回包的到达时刻为基准，尚未超时；b 没有任何回包，以启动时刻为基准
+        self.assertEqual((prober.stats["a"].sent, prober.stats["b"].sent), (5, 10))
+        prober.expire(now=115.0)
+        self.assertEqual(prober.stats["a"].sent, 7)
+        self.assertEqual(prober.stats["a"].on_reply(6, 30.0, at=115.0), ())
+        self.assertEqual(prober.stats["a"].received, 2)
+
+    def test_expire_respects_count(self):
+        prober = LatencyProber(["a"], interval=1.0, count=3)
+        prober._started_at = 0.0
+        prober.expire(now=100.0)
+        self.assertEqual(prober.stats["a"].sent, 3)
+        # 刚启动时不判丢
+        prober = LatencyProber(["a"], interval=1.0)
+        prober._started_at = 0.0
+        prober.expire(now=2.9)
+        self.assertEqual(prober.stats["a"].sent, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
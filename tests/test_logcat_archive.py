@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from androidToolbox.services.logcat_archive import LogArchive
+from androidToolbox.services.logcat_store import parse_logcat_line
+
+
+def line(i):
+    return f"01-02 10:{i // 60 % 60:02d}:{i % 60:02d}.000 I/Tag( 123): message {i}".encode()
+
+
+class LogArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.archive = self.open()
+
+    def open(self, **kwargs):
+        archive = LogArchive(os.path.join(self.dir.name, "archive"), block_lines=50, **kwargs)
+        self.addCleanup(archive.close)
+        return archive
+
+    def write(self, archive, start, count, batch=7):
+        for first in range(start, start + count, batch):
+            archive.write(first, [line(i) for i in range(first, min(start + count, first + batch))])
+        self.assertTrue(archive.flush())
+
+    def test_blocks_and_read_seq(self):
+        self.write(self.archive, 0, 230)
+        blocks = list(self.archive.iter_blocks())
+        self.assertEqual([entry[3] for entry, _ in blocks], [50, 50, 50, 50, 30])
+        self.assertEqual([l for _, lines in blocks for l in lines], [line(i) for i in range(230)])
+        for seq in (0, 49, 50, 229):
+            self.assertEqual(self.archive.read_seq(seq), line(seq))
+        self.assertIsNone(self.archive.read_seq(230))
+
+    def test_read_time_range(self):
+        self.write(self.archive, 0, 600)
+        t0, t1 = parse_logcat_line(line(120))[0], parse_logcat_line(line(179))[0]
+        self.assertEqual(list(self.archive.read_time_range(t0, t1)), [line(i) for i in range(120, 180)])
+
+    def test_export(self):
+        self.write(self.archive, 0, 120)
+        path = os.path.join(self.dir.name, "export.txt")
+        self.archive.export(path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read().splitlines(), [line(i) for i in range(120)])
+
+    def test_max_segments_drops_oldest(self):
+        archive = self.open(segment_size=2048, max_segments=2)
+        self.write(archive, 0, 2000)
+        segments = [name for name in os.listdir(archive.directory) if name.startswith("seg_")]
+        self.assertEqual(len(segments), 2)
+        self.assertIsNone(archive.read_seq(0))
+        self.assertEqual(archive.read_seq(1999), line(1999))
+        lines = [l for _, lines in archive.iter_blocks() for l in lines]
+        self.assertEqual(lines, [line(i) for i in range(2000 - len(lines), 2000)])
+
+    def test_reset(self):
+        self.write(self.archive, 0, 100)
+        self.archive.reset()
+        self.assertEqual(list(self.archive.iter_blocks()), [])
+        self.write(self.archive, 100, 10)
+        self.assertEqual(self.archive.read_seq(105), line(105))
+        self.assertIsNone(self.archive.read_seq(5))
+
+    def test_write_with_stamps(self):
+        lines = [line(i) for i in range(50)]
+        self.archive.write(0, lines, [1000.0 + i for i in range(50)])
+        self.assertTrue(self.archive.flush())
+        entry, blocks = next(self.archive.iter_blocks())
+        self.assertEqual((entry[0], entry[1]), (1000.0, 1049.0))
+        self.assertEqual(blocks, lines)
+
+    def test_scan(self):
+        self.write(self.archive, 0, 230)
+        self.assertEqual(list(self.archive.scan(stop_seq=60)), [(i, line(i)) for i in range(60)])
+        t0 = parse_logcat_line(line(100))[0]
+        scanned = list(self.archive.scan(t0, t0 + 5))
+        self.assertIn((100, line(100)), scanned)
+        self.assertTrue(all(seq == int(raw.rsplit(b" ", 1)[1]) for seq, raw in scanned))
+
+    def test_first_seq_follows_rotation(self):
+        archive = self.open(segment_size=2048, max_segments=2)
+        self.assertEqual(archive.first_seq, 0)
+        self.write(archive, 0, 2000)
+        first = next(archive.iter_blocks())[0][2]
+        self.assertGreater(archive.first_seq, 0)
+        self.assertEqual(archive.first_seq, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import random
+import unittest
+
+from androidToolbox.services.logcat_filter import LogcatFilter, MultiPatternMatcher
+
+
+class MultiPatternMatcherTest(unittest.TestCase):
+    def test_matches_like_any_substring(self):
+        rnd = random.Random(1)
+        alphabet = b"abc.*("
+        for _ in range(200):
+            patterns = [bytes(rnd.choice(alphabet) for _ in range(rnd.randint(1, 4))) for _ in range(rnd.randint(1, 6))]
+            data = bytes(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20)))
+            with self.subTest(patterns=patterns, data=data):
+                self.assertEqual(MultiPatternMatcher(patterns).search(data), any(p in data for p in patterns))
+
+    def test_ignore_case_and_unicode(self):
+        matcher = MultiPatternMatcher(["FATAL", "崩溃"], ignore_case=True)
+        self.assertTrue(matcher.search(b"fatal exception"))
+        self.assertTrue(matcher.search("应用崩溃了".encode()))
+        self.assertFalse(matcher.search(b"all good"))
+
+    def test_empty(self):
+        matcher = MultiPatternMatcher(["", None])
+        self.assertFalse(matcher)
+        self.assertFalse(matcher.search(b"anything"))
+
+
+class LogcatFilterTest(unittest.TestCase):
+    def test_parse_device_args(self):
+        log_filter = LogcatFilter.parse('tag=ActivityManager:W tag=GC level=E pid=42 "re=am_.*"')
+        self.assertEqual(log_filter.device_args(),
+                         ["--pid=42", "--regex=am_.*", "ActivityManager:W", "GC:E", "*:S"])
+        self.assertEqual(LogcatFilter.parse("level=w").device_args(), ["*:W"])
+        self.assertEqual(LogcatFilter.parse("level=V").device_args(), [])
+
+    def test_host_patterns(self):
+        log_filter = LogcatFilter.parse('crash "out of memory" -chatty')
+        lines = [b"I/App: crash here", b"E/chatty: crash x", b"W/VM: out of memory", b"I/App: fine"]
+        self.assertEqual(log_filter.apply(lines), [b"I/App: crash here", b"W/VM: out of memory"])
+        self.assertTrue(log_filter.has_host_patterns())
+
+    def test_no_host_patterns_passes_batch_through(self):
+        lines = [b"a", b"b"]
+        self.assertIs(LogcatFilter.parse("tag=GC").apply(lines), lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
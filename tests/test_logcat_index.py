@@ -0,0 +1,139 @@
+import time
+import unittest
+
+from androidToolbox.services.logcat_index import LogIndex, LogQuery, indexable, tokenize
+from androidToolbox.services.logcat_store import LEVELS, LogStore
+
+TAGS = ("Alpha", "Beta", "Gamma")
+WORDS = ("connect", "timeout", "render")
+
+
+def line(i):
+    level, tag, word = LEVELS[i % len(LEVELS)], TAGS[i % len(TAGS)], WORDS[i % len(WORDS)]
+    return (f"01-02 10:{i // 60:02d}:{i % 60:02d}.000 {level}/{tag}({100 + i % 4:5d}): "
+            f"{word} id=0x{i:04x} n={i}").encode()
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.store = LogStore(memory_budget=1024 * 1024)
+        self.store.extend(line(i) for i in range(600))
+        self.index = LogIndex()
+        self.index.add_records(self.store.scan(0))
+        self.ref = self.store.get(0).ts
+
+    def expected(self, query, after=0):
+        return [seq for seq, ts, pid, level, tag, raw in self.store.scan(after)
+                if query.matches(ts, pid, level, tag, raw)]
+
+    def search(self, text, limit=10000):
+        """索引只给出候选，最终结果按 matches 精确校验"""
+        query = LogQuery.parse(text, ref_ts=self.ref)
+        candidates = self.index.search(query, limit=limit)
+        self.assertEqual(candidates, sorted(candidates))
+        rows = {row[0]: row for row in self.store.scan(0)}
+        return [seq for seq in candidates if query.matches(*rows[seq][1:])], query
+
+    def test_matches_full_scan(self):
+        for text in ("tag=Beta", "pid=101", "level>=W", "level=E", "timeout",
+                     "tag=Gamma AND level>=E", "connect level=V",
+                     "level>=W between 10:02 and 10:04", "tag=Alpha after 10:09:30",
+                     "render before 10:00:30"):
+            with self.subTest(text=text):
+                found, query = self.search(text)
+                self.assertEqual(found, self.expected(query))
+                self.assertTrue(found)
+
+    def test_level_only_range_is_sorted_and_bounded(self):
+        query = LogQuery.parse("level>=E between 10:03 and 10:03", ref_ts=self.ref)
+        candidates = self.index.search(query)
+        self.assertEqual(candidates, sorted(candidates))
+        # 候选限制在时间范围所在的桶内，不扫描整个索引
+        self.assertTrue(all(170 <= seq < 250 for seq in candidates))
+        self.assertEqual([seq for seq in candidates if 180 <= seq < 240],
+                         [seq for seq in range(180, 240) if LEVELS[seq % 6] in "EF"])
+
+    def test_unknown_tag_or_term(self):
+        self.assertEqual(self.search("tag=Nope")[0], [])
+        self.assertEqual(self.search("nothinglikethis")[0], [])
+
+    def test_numeric_terms_are_not_indexed(self):
+        self.assertFalse(indexable(b"0x01f3"))
+        self.assertFalse(indexable(b"123"))
+        self.assertTrue(indexable(b"timeout"))
+        self.assertLess(self.index.stats()["terms"], 20)
+        # 数字类的词仍可检索，由 matches 精确校验
+        found, query = self.search("timeout 0x0007")
+        self.assertEqual(found, [7])
+
+    def test_chinese_terms(self):
+        store = LogStore(memory_budget=1024 * 1024)
+        store.extend([b"01-02 10:00:00.000 E/Tag(  100): \xe5\x8f\x91\xe7\x94\x9f\xe9\x94\x99\xe8\xaf\xaf\xe4\xba\x86",
+                      "01-02 10:00:01.000 I/Tag(  100): 一切正常".encode()])
+        index = LogIndex()
+        index.add_records(store.scan(0))
+        rows = {row[0]: row for row in store.scan(0)}
+        # 关键词出现在长串中间、单个汉字也能检索到
+        for text, expected in (("错误", [0]), ("发生错误", [0]), ("错", [0]), ("正常", [1]), ("错误了吗", [])):
+            with self.subTest(text=text):
+                query = LogQuery.parse(text)
+                found = [seq for seq in index.search(query) if query.matches(*rows[seq][1:])]
+                self.assertEqual(found, expected)
+
+    def test_short_words_are_matched_as_substrings(self):
+        found, query = self.search("id=0x0007")
+        self.assertEqual(found, [7])
+        found, query = self.search("render n=59")
+        self.assertEqual(found, [59, 590, 593, 596, 599])
+        self.assertFalse(self.search("zz")[0])
+
+    def test_limit_and_after(self):
+        query = LogQuery.parse("tag=Alpha", ref_ts=self.ref)
+        first = self.index.search(query, limit=5)
+        self.assertEqual(first, [0, 3, 6, 9, 12])
+        self.assertEqual(self.index.search(query, limit=2, after=first[-1] + 1), [15, 18])
+
+    def test_prune(self):
+        self.index.prune(300)
+        query = LogQuery.parse("tag=Alpha", ref_ts=self.ref)
+        self.assertEqual(self.index.search(query, limit=1), [300])
+        self.assertEqual(self.index.search(LogQuery.parse("level=V", ref_ts=self.ref), limit=1), [300])
+
+    def test_term_cap_keeps_results_correct(self):
+        index = LogIndex(max_terms=3)
+        index.add_records(self.store.scan(0))
+        # 词典已满后出现的词没有倒排表，不能据此判定为不存在
+        for text in ("render", "connect", "tag=Beta render"):
+            with self.subTest(text=text):
+                query = LogQuery.parse(text, ref_ts=self.ref)
+                rows = {row[0]: row for row in self.store.scan(0)}
+                found = [seq for seq in index.search(query, limit=10000) if query.matches(*rows[seq][1:])]
+                self.assertEqual(found, self.expected(query))
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual(self.index.search(LogQuery.parse("tag=Alpha", ref_ts=self.ref)), [])
+        self.store.extend(line(i) for i in range(3))
+        self.index.add_records(self.store.scan(600))
+        self.assertEqual(self.index.search(LogQuery.parse("tag=Alpha", ref_ts=self.ref)), [600])
+
+
+class LogQueryTest(unittest.TestCase):
+    def test_parse(self):
+        ref = time.mktime((2024, 1, 2, 12, 0, 0, 0, 0, -1))
+        query = LogQuery.parse("tag=ActivityManager AND level>=W pid=42 Crash between 10:02 and 10:05", ref)
+        self.assertEqual((query.tag, query.pid, query.levels, query.terms),
+                         ("ActivityManager", 42, {"W", "E", "F"}, tokenize(b"crash")))
+        self.assertAlmostEqual(query.t1 - query.t0, 3 * 60 + 59.999, places=3)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            LogQuery.parse("pid=abc")
+        with self.assertRaises(ValueError):
+            LogQuery.parse("level=X")
+        with self.assertRaises(ValueError):
+            LogQuery.parse("after 10h")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.services.logcat_index import LogQuery
+from androidToolbox.services.logcat_service import LogcatService
+
+FAKE_ADB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_adb.py")
+
+
+@unittest.skipIf(os.name == 'nt', "模拟 adb 的启动脚本只支持类 Unix 系统")
+class LogcatServiceTest(unittest.TestCase):
+    """用 tools/fake_adb.py 模拟设备，走完整的抓取 -> 存储 / 索引 / 归档链路"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        launcher = os.path.join(self.dir.name, "adb")
+        with open(launcher, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_ADB}" "$@"\n')
+        os.chmod(launcher, os.stat(launcher).st_mode | stat.S_IEXEC)
+        # 只走一次性进程，不连接本机可能存在的真实 adb server
+        patches = [mock.patch.object(ADBManager, "use_socket", False),
+                   mock.patch.object(ADBManager, "use_session", False),
+                   mock.patch.object(ADBManager, "use_cache", False),
+                   mock.patch.object(ADBManager, "_ADB_PATH", launcher),
+                   mock.patch.dict(os.environ, {"FAKE_ADB_RATE": "4000", "FAKE_ADB_DURATION": "1"})]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.service = LogcatService(archive_dir=os.path.join(self.dir.name, "archive"))
+        self.addCleanup(self.dir.cleanup)
+        self.addCleanup(self.service.close)
+
+    def capture(self):
+        self.service.start_capture()
+        deadline = time.monotonic() + 10
+        while self.service.is_running() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        ingest = self.service.ingest_thread
+        self.service.stop_capture()
+        # 解析线程处理完剩余的批次后才退出
+        ingest.join(10)
+
+    def test_capture_and_query(self):
+        self.capture()
+        store = self.service.store
+        self.assertGreater(len(store), 1000)
+        stats = self.service.queue_stats()
+        self.assertEqual(stats["dropped"], 0)
+        self.assertEqual(stats["delivered"], stats["received"])
+
+        records = store.read(store.first_seq)
+        for text in ("level>=E", "tag=ActivityManager", "tag=OkHttp AND level=W", "frames"):
+            with self.subTest(text=text):
+                query = LogQuery.parse(text, ref_ts=records[-1].ts)
+                expected = [r.seq for r in records
+                            if query.matches(r.ts, r.pid, r.level, r.tag, r.raw)]
+                self.assertEqual([r.seq for r in self.service.query(text, limit=len(records))], expected)
+
+    def test_export_from_archive(self):
+        self.capture()
+        path = os.path.join(self.dir.name, "export.txt")
+        self.service.export(path)
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), self.service.store.next_seq)
+
+    def test_clear_during_capture(self):
+        self.service.start_capture()
+        deadline = time.monotonic() + 10
+        while len(self.service.store) < 500 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.service.clear()
+        cleared = self.service.store.next_seq
+        while self.service.is_running() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        ingest = self.service.ingest_thread
+        self.service.stop_capture()
+        ingest.join(10)
+        archive = self.service.archive
+        self.assertTrue(archive.flush())
+        # 清空后归档只含之后写入的行，且一行不缺
+        self.assertEqual([seq for seq, _ in archive.scan()], list(range(cleared, self.service.store.next_seq)))
+
+    def test_start_without_clearing_device(self):
+        with mock.patch.object(ADBManager, "run") as run:
+            self.service.start_capture(clear_device=False)
+            self.service.stop_capture()
+            run.assert_not_called()
+            self.service.start_capture()
+            self.service.stop_capture()
+            run.assert_called_once_with("logcat -c", serial=None)
+
+    def test_start_failure_can_be_retried(self):
+        with mock.patch.object(ADBManager, "open_logcat", side_effect=FileNotFoundError("adb")):
+            with self.assertRaises(OSError):
+                self.service.start_capture()
+        self.assertFalse(self.service.is_running())
+        self.assertIsNone(self.service.ingest_thread)
+        self.capture()
+        self.assertGreater(len(self.service.store), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from androidToolbox.services.logcat_store import LogStore, LEVEL_RAW
+
+
+def line(i, level="I", tag="Tag", message=None):
+    return f"01-02 10:{i // 60 % 60:02d}:{i % 60:02d}.000 {level}/{tag}( 123): {message or f'msg {i}'}".encode()
+
+
+class LogStoreTest(unittest.TestCase):
+    def test_parse_fields(self):
+        store = LogStore(memory_budget=64 * 1024)
+        seq = store.append(line(5, "E", "ActivityManager", "boom"))
+        record = store.get(seq)
+        self.assertEqual((record.level, record.tag, record.pid, record.message),
+                         ("E", "ActivityManager", 123, "boom"))
+
+    def test_unparsed_line_keeps_previous_timestamp(self):
+        store = LogStore(memory_budget=64 * 1024)
+        store.append(line(5))
+        record = store.get(store.append(b"--------- beginning of main"))
+        self.assertEqual(record.level, LEVEL_RAW)
+        self.assertEqual(record.ts, store.get(0).ts)
+
+    def test_evicts_oldest_by_capacity(self):
+        store = LogStore(memory_budget=16 * (LogStore.RECORD_BYTES + 96))
+        self.assertEqual(store.capacity, 16)
+        store.extend(line(i) for i in range(40))
+        self.assertEqual(len(store), 16)
+        self.assertEqual((store.first_seq, store.next_seq, store.evicted), (24, 40, 24))
+        self.assertIsNone(store.get(23))
+        self.assertEqual(store.get(24).message, "msg 24")
+        self.assertEqual([r.seq for r in store.read(0, limit=3)], [24, 25, 26])
+
+    def test_evicts_when_arena_is_overwritten(self):
+        store = LogStore(memory_budget=16 * (LogStore.RECORD_BYTES + 96))
+        big = "x" * 1500
+        store.extend(line(i, message=f"{i} {big}") for i in range(5))
+        # arena 只有 4096 字节，只能同时容纳两条长消息
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.evicted, 3)
+        self.assertTrue(store.get(4).message.startswith("4 "))
+        self.assertTrue(store.get(3).message.startswith("3 "))
+
+    def test_clear_keeps_seq_monotonic(self):
+        store = LogStore(memory_budget=64 * 1024)
+        store.extend(line(i) for i in range(10))
+        store.clear()
+        self.assertEqual((len(store), store.first_seq, store.evicted), (0, 10, 0))
+        self.assertEqual(store.append(line(1)), 10)
+
+    def test_find_time(self):
+        store = LogStore(memory_budget=64 * 1024)
+        store.extend(line(i) for i in range(0, 100, 10))
+        self.assertEqual(store.find_time(store.get(3).ts), 3)
+        self.assertEqual(store.find_time(store.get(3).ts + 1), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
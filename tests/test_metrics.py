@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from androidToolbox.core import metrics
+from androidToolbox.core.metrics import CommandMetrics, command_family
+
+
+class CommandFamilyTest(unittest.TestCase):
+    def test_family(self):
+        self.assertEqual(command_family("shell dumpsys wifi | grep RSSI"), "shell dumpsys wifi")
+        self.assertEqual(command_family("shell dumpsys -l"), "shell dumpsys")
+        self.assertEqual(command_family("shell getprop ro.build.version.sdk"), "shell getprop")
+        self.assertEqual(command_family("devices"), "devices")
+        self.assertEqual(command_family(""), "?")
+
+
+class CommandMetricsTest(unittest.TestCase):
+    def measure(self, metrics_, family, elapsed_ms, result):
+        clock = iter([0.0, elapsed_ms / 1000])
+        with mock.patch.object(metrics.time, "perf_counter", lambda: next(clock)):
+            return metrics_.measure(family, lambda: result)
+
+    def test_snapshot(self):
+        stats = CommandMetrics()
+        for ms in (3, 4, 4, 15, 40, 800):
+            self.assertEqual(self.measure(stats, "shell getprop", ms, "ok"), "ok")
+        self.measure(stats, "shell getprop", 5000, "Error: command timed out")
+        family = stats.snapshot()["shell getprop"]
+        self.assertEqual((family["count"], family["errors"], family["timeouts"], family["in_flight"]), (7, 1, 1, 0))
+        # 百分位取所在直方图桶的上界
+        self.assertEqual((family["p50_ms"], family["p95_ms"], family["max_ms"]), (20, 5000, 5000.0))
+        self.assertEqual(family["histogram"], [(5, 3), (20, 1), (50, 1), (1000, 1), (5000, 1)])
+        self.assertEqual(family["last_error"], "Error: command timed out")
+        self.assertEqual(family["bytes_max"], len("Error: command timed out"))
+
+    def test_exception_counts_as_error(self):
+        stats = CommandMetrics()
+        with self.assertRaises(OSError):
+            stats.measure("devices", lambda: (_ for _ in ()).throw(OSError("adb missing")))
+        family = stats.snapshot()["devices"]
+        self.assertEqual((family["count"], family["errors"], family["last_error"]), (1, 1, "exception"))
+
+    def test_reset_keeps_in_flight(self):
+        stats = CommandMetrics()
+
+        def call():
+            stats.reset()
+            return "ok"
+
+        stats.measure("shell df", call)
+        family = stats.snapshot()["shell df"]
+        # reset 时进行中的一次保留，结束后正常计入
+        self.assertEqual((family["count"], family["in_flight"]), (1, 0))
+
+    def test_dump(self):
+        stats = CommandMetrics()
+        stats.measure("devices", lambda: "emu-1\tdevice")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sub", "metrics.jsonl")
+            stats.start_dump(path, interval=60, extra=lambda: {"cache": {"hits": 1}})
+            stats.stop_dump()
+            stats.dump(path)
+            with open(path, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["cache"], {"hits": 1})
+        self.assertEqual(records[1]["commands"]["devices"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+
+from androidToolbox.core.pool import PoolExhausted, TransportPool
+
+
+class FakeChannel:
+    def __init__(self, serial):
+        self.serial = serial
+        self.last_used = time.monotonic()
+        self.alive = True
+        self.healthy = True
+        self.closed = False
+
+    def is_alive(self):
+        return self.alive and not self.closed
+
+    def ping(self):
+        return self.healthy
+
+    def close(self):
+        self.closed = True
+
+
+class TransportPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.pool = TransportPool(self.factory, max_transports=3, max_per_device=2,
+                                  idle_timeout=60, health_interval=15)
+        self.addCleanup(self.pool.close_all)
+
+    def factory(self, serial):
+        channel = FakeChannel(serial)
+        self.created.append(channel)
+        return channel
+
+    def test_reuses_returned_channel(self):
+        with self.pool.borrow("a") as first:
+            pass
+        with self.pool.borrow("a") as second:
+            self.assertIs(second, first)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.pool.stats(), {"total": 1, "devices": {"a": (1, 1)}})
+
+    def test_per_device_limit(self):
+        held = [self.pool.acquire("a"), self.pool.acquire("a")]
+        with self.assertRaises(PoolExhausted):
+            self.pool.acquire("a", timeout=0.05)
+        # 其他设备不受影响
+        self.pool.release(self.pool.acquire("b"))
+        for channel in held:
+            self.pool.release(channel)
+
+    def test_waiter_gets_released_channel(self):
+        held = [self.pool.acquire("a"), self.pool.acquire("a")]
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.acquire("a", timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        self.pool.release(held[0])
+        waiter.join(5)
+        self.assertEqual(got, [held[0]])
+
+    def test_global_limit_evicts_other_device_idle(self):
+        a = [self.pool.acquire("a"), self.pool.acquire("a")]
+        b = self.pool.acquire("b")
+        self.pool.release(a[0])
+        a[0].last_used -= 10
+        self.pool.release(b)
+        # 全局名额已满：回收其他设备最久未用的空闲通道
+        c = self.pool.acquire("c", timeout=0.05)
+        self.assertTrue(a[0].closed)
+        self.assertFalse(b.closed)
+        self.assertEqual(self.pool.stats()["total"], 3)
+        self.pool.release(c)
+        self.pool.release(a[1])
+
+    def test_broken_and_dead_channels_are_closed(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.borrow("a") as channel:
+                raise RuntimeError("io error")
+        self.assertTrue(channel.closed)
+        dead = self.pool.acquire("a")
+        dead.alive = False
+        self.pool.release(dead)
+        self.assertTrue(dead.closed)
+        self.assertEqual(self.pool.stats()["total"], 0)
+
+    def test_health_check_before_lending(self):
+        with self.pool.borrow("a") as stale:
+            pass
+        stale.last_used -= 30
+        stale.healthy = False
+        with self.pool.borrow("a") as fresh:
+            self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+
+    def test_idle_eviction(self):
+        with self.pool.borrow("a") as channel:
+            pass
+        channel.last_used -= 120
+        self.assertEqual(self.pool.evict_idle(), 1)
+        self.assertTrue(channel.closed)
+        self.assertEqual(self.pool.stats()["total"], 0)
+
+    def test_factory_error_frees_slot(self):
+        def broken(serial):
+            raise OSError("adb missing")
+        pool = TransportPool(broken, max_transports=1)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.acquire("a", timeout=0.05)
+        self.assertEqual(pool.stats()["total"], 0)
+
+    def test_close_device(self):
+        with self.pool.borrow("a") as channel:
+            pass
+        self.pool.close_device("a")
+        self.assertTrue(channel.closed)
+        self.assertEqual(self.pool.stats()["devices"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
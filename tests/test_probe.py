@@ -0,0 +1,59 @@
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.cache import TTLCache
+from androidToolbox.core.probe import ProbeBundle
+
+
+def run_local(script, timeout=5, serial=None):
+    """在本机 sh 中执行合并后的脚本，代替设备端执行"""
+    return subprocess.run(["sh", "-c", script], capture_output=True, text=True, timeout=timeout).stdout
+
+
+@unittest.skipIf(os.name == 'nt', "需要 POSIX sh")
+class ProbeBundleTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(ADBManager, "run_script", side_effect=run_local)
+        self.run_script = patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_one_round_trip_per_bundle(self):
+        bundle = ProbeBundle({"a": "echo alpha", "b": "printf 'no newline'", "c": "echo one; echo two"})
+        self.assertEqual(bundle.run(), {"a": "alpha", "b": "no newline", "c": "one\ntwo"})
+        self.assertEqual(self.run_script.call_count, 1)
+
+    def test_failed_command_does_not_break_others(self):
+        bundle = ProbeBundle({"bad": "no_such_command_xyz", "quoted": "echo \"it's | fine\"", "ok": "echo ok"})
+        self.assertEqual(bundle.run(), {"bad": "", "quoted": "it's | fine", "ok": "ok"})
+
+    def test_collect_sections(self):
+        results = ProbeBundle.collect({"mem": {"total": "echo 100"}, "net": {"total": "echo 5", "rssi": "echo -60"}})
+        self.assertEqual(results, {"mem": {"total": "100"}, "net": {"total": "5", "rssi": "-60"}})
+        self.assertEqual(self.run_script.call_count, 1)
+
+    def test_split_missing_sections(self):
+        output = "\n@@m a\r\nx\r\n@@m b\n"
+        self.assertEqual(ProbeBundle.split(output, "@@m", ["a", "b", "c"]), {"a": "x", "b": "", "c": ""})
+        self.assertEqual(ProbeBundle.split("Error: device offline", "@@m", ["a"]), {"a": ""})
+
+    def test_cached_probes_are_not_resent(self):
+        with mock.patch.object(ADBManager, "cache", TTLCache()), \
+                mock.patch.object(ADBManager, "CACHE_TTLS", (("shell echo", 60),)), \
+                mock.patch.object(ADBManager, "use_cache", True):
+            bundle = ProbeBundle({"cached": "echo once", "fresh": "date +%N"})
+            first = bundle.run()
+            self.assertIn("fresh", self.run_script.call_args[0][0])
+            second = bundle.run()
+            self.assertEqual(second["cached"], first["cached"])
+            # 第二次只下发未缓存的探针
+            self.assertNotIn("echo once", self.run_script.call_args[0][0])
+            self.assertEqual(self.run_script.call_count, 2)
+            ProbeBundle({"cached": "echo once"}).run()
+            self.assertEqual(self.run_script.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
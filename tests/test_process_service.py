@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from androidToolbox.services import process_service
+from androidToolbox.services.process_service import ProcessTracker
+
+
+def stat_line(pid, name, utime, stime, rss_pages, state="S"):
+    # pid (comm) state 后依次为 ppid ... utime(14) stime(15) ... rss(24)
+    fields = [state] + ["0"] * 10 + [str(utime), str(stime)] + ["0"] * 8 + [str(rss_pages), "0"]
+    return f"{pid} ({name}) " + " ".join(fields)
+
+
+def outputs(total, procs):
+    stat = f"cpu  {total} 0 0 0 0 0 0 0 0 0\ncpu0 1 0 0 0\ncpu1 1 0 0 0"
+    return {"stat": stat, "procs": "\n".join(stat_line(*proc) for proc in procs)}
+
+
+class ProcessTrackerTest(unittest.TestCase):
+    def check(self):
+        tracker = ProcessTracker()
+        first = tracker.update(outputs(1000, [(1, "init", 10, 0, 256), (42, "com.app (main)", 100, 50, 25600),
+                                              (77, "sh", 5, 5, 128)]), top=2)
+        # 首轮没有差值：按内存排序，CPU 为 None
+        self.assertEqual([(row["pid"], row["name"], row["cpu"], row["rss_mb"]) for row in first],
+                         [(42, "com.app (main)", None, 100.0), (1, "init", None, 1.0)])
+
+        # 总计 200 jiffies、2 个核心：进程 42 多用了 50，即单核 50%
+        second = tracker.update(outputs(1200, [(1, "init", 10, 0, 256), (42, "com.app (main)", 130, 70, 25600),
+                                               (99, "new", 500, 0, 128)]), top=3)
+        self.assertEqual([(row["pid"], row["cpu"]) for row in second], [(42, 50.0), (1, 0.0), (99, 0.0)])
+        by_rss = tracker.update(outputs(1300, [(1, "init", 10, 0, 256), (42, "x", 130, 70, 25600)]),
+                                top=1, sort="rss")
+        self.assertEqual(by_rss[0]["pid"], 42)
+
+    def test_array_backend(self):
+        with mock.patch.object(process_service, "np", None):
+            self.check()
+
+    @unittest.skipIf(process_service.np is None, "未安装 NumPy")
+    def test_numpy_backend(self):
+        self.check()
+
+    def test_parse_skips_garbage(self):
+        pids, ticks, rss, names, states = ProcessTracker.parse_processes(
+            "garbage\n" + stat_line(7, "a) b", 1, 2, 3, "R") + "\n12 (short) S 1 2")
+        self.assertEqual((list(pids), list(ticks), list(rss), names, states), ([7], [3], [3], ["a) b"], ["R"]))
+        self.assertEqual(ProcessTracker.parse_cpu(""), (0, 1))
+        self.assertEqual(ProcessTracker().update({}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
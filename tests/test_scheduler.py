@@ -0,0 +1,98 @@
+import asyncio
+import queue
+import threading
+import time
+import unittest
+
+from androidToolbox.core.scheduler import ProbeBusy, ProbeScheduler, ProbeTimeout
+
+
+class ProbeSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.results = queue.Queue()
+        # 模拟界面线程的投递队列
+        self.scheduler = ProbeScheduler(post=lambda callback, result, error: self.results.put((result, error)))
+        self.scheduler.start()
+        self.addCleanup(self.scheduler.stop)
+
+    def callback(self, result, error):
+        raise AssertionError("post 已提供时回调不应在调度线程中执行")
+
+    def next_result(self, timeout=2):
+        return self.results.get(timeout=timeout)
+
+    def test_periodic_runs_off_caller_thread(self):
+        threads = []
+
+        def probe():
+            threads.append(threading.current_thread())
+            return len(threads)
+
+        self.scheduler.add("tick", probe, 0.02, self.callback, jitter=0)
+        self.assertEqual([self.next_result()[0] for _ in range(3)], [1, 2, 3])
+        self.assertNotIn(threading.current_thread(), threads)
+        self.scheduler.cancel("tick")
+        time.sleep(0.05)
+        while not self.results.empty():
+            self.results.get()
+        time.sleep(0.06)
+        self.assertTrue(self.results.empty())
+        self.assertFalse(self.scheduler.is_scheduled("tick"))
+
+    def test_coroutine_probe(self):
+        async def probe():
+            await asyncio.sleep(0.01)
+            return "async"
+
+        self.scheduler.submit("once", probe, self.callback)
+        self.assertEqual(self.next_result(), ("async", None))
+
+    def test_deadline(self):
+        release = threading.Event()
+        self.scheduler.submit("slow", lambda: release.wait(5), self.callback, deadline=0.05)
+        result, error = self.next_result()
+        self.assertIsInstance(error, ProbeTimeout)
+        # 超时的调用仍未返回时，同名请求不再叠加
+        self.scheduler.submit("slow", lambda: "again", self.callback)
+        self.assertIsInstance(self.next_result()[1], ProbeBusy)
+        release.set()
+        time.sleep(0.05)
+        self.scheduler.submit("slow", lambda: "again", self.callback)
+        self.assertEqual(self.next_result(), ("again", None))
+        self.assertEqual(self.scheduler.stats["slow"]["timeouts"], 1)
+
+    def test_in_flight_dedup(self):
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def probe():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "shared"
+
+        self.scheduler.submit("dedup", probe, self.callback)
+        self.assertTrue(started.wait(2))
+        self.scheduler.submit("dedup", probe, self.callback)
+        time.sleep(0.02)
+        release.set()
+        self.assertEqual([self.next_result(), self.next_result()], [("shared", None)] * 2)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.scheduler.stats["dedup"]["skipped"], 1)
+
+    def test_errors_are_delivered(self):
+        self.scheduler.submit("boom", lambda: 1 / 0, self.callback)
+        self.assertIsInstance(self.next_result()[1], ZeroDivisionError)
+        self.assertEqual(self.scheduler.stats["boom"]["errors"], 1)
+
+    def test_stop_cancels_probes(self):
+        self.scheduler.add("tick", lambda: 1, 0.01, self.callback)
+        self.next_result()
+        self.scheduler.stop()
+        while not self.results.empty():
+            self.results.get()
+        time.sleep(0.05)
+        self.assertTrue(self.results.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from androidToolbox.services.session_record import (SessionReader, SessionRecorder, STREAM_LOGCAT,
+                                                    STREAM_MONITOR, STREAM_NETWORK)
+
+
+class SessionRecordTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "session.atsess")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def record(self, close=True):
+        recorder = SessionRecorder(self.path, metadata={"serial": "emu-1"}, block_records=16)
+        for i in range(100):
+            ts = 1000.0 + i
+            recorder.record_many(STREAM_LOGCAT, [f"line {i}a".encode(), f"line {i}b".encode()], ts)
+            if i % 10 == 0:
+                recorder.record(STREAM_MONITOR, {"mem": i}, ts)
+                recorder.record(STREAM_NETWORK, {"rssi": -i}, ts)
+        if close:
+            recorder.close()
+        else:
+            recorder.flush()
+        return recorder
+
+    def test_round_trip(self):
+        self.record()
+        reader = SessionReader(self.path)
+        try:
+            self.assertEqual(reader.metadata["serial"], "emu-1")
+            self.assertEqual(len(reader), 220)
+            self.assertEqual(reader.time_range(), (1000.0, 1099.0))
+            records = list(reader.read())
+            self.assertEqual(records[0], (1000.0, STREAM_LOGCAT, b"line 0a"))
+            self.assertEqual(records[2], (1000.0, STREAM_MONITOR, {"mem": 0}))
+            self.assertEqual(records[3], (1000.0, STREAM_NETWORK, {"rssi": 0}))
+            self.assertEqual([r[0] for r in records], sorted(r[0] for r in records))
+        finally:
+            reader.close()
+
+    def test_read_range_and_streams(self):
+        self.record()
+        reader = SessionReader(self.path)
+        try:
+            records = list(reader.read(1050.0, 1053.0))
+            self.assertEqual({r[0] for r in records}, {1050.0, 1051.0, 1052.0})
+            self.assertEqual(len(records), 8)
+            monitor = list(reader.read(streams=[STREAM_MONITOR]))
+            self.assertEqual([payload["mem"] for _, _, payload in monitor], list(range(0, 100, 10)))
+        finally:
+            reader.close()
+
+    def test_timestamps_never_go_backwards(self):
+        recorder = SessionRecorder(self.path)
+        recorder.record(STREAM_MONITOR, {"n": 1}, 10.0)
+        recorder.record(STREAM_MONITOR, {"n": 2}, 5.0)
+        recorder.close()
+        reader = SessionReader(self.path)
+        try:
+            self.assertEqual([r[0] for r in reader.read()], [10.0, 10.0])
+        finally:
+            reader.close()
+
+    def test_unfinished_recording_is_readable(self):
+        recorder = self.record(close=False)
+        try:
+            reader = SessionReader(self.path)
+            try:
+                # 没有文件尾索引时按块头扫描重建
+                self.assertEqual(len(reader), 220)
+                self.assertEqual(list(reader.read(1099.0))[-1], (1099.0, STREAM_LOGCAT, b"line 99b"))
+            finally:
+                reader.close()
+        finally:
+            recorder.close()
+
+    def test_not_a_recording(self):
+        for content in (b"garbage" * 10, b"short", b""):
+            with self.subTest(content=content):
+                with open(self.path, 'wb') as f:
+                    f.write(content)
+                with self.assertRaises(ValueError):
+                    SessionReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+from androidToolbox.core.shell_session import ShellSession, ShellSessionError
+
+FAKE_ADB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_adb.py")
+
+
+@unittest.skipIf(os.name == 'nt', "模拟 adb 的启动脚本只支持类 Unix 系统")
+class ShellSessionTest(unittest.TestCase):
+    """用 tools/fake_adb.py 的交互 sh 模拟设备端 shell"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        launcher = os.path.join(self.dir.name, "adb")
+        with open(launcher, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_ADB}" "$@"\n')
+        os.chmod(launcher, os.stat(launcher).st_mode | stat.S_IEXEC)
+        self.session = ShellSession(launcher).start()
+        self.addCleanup(self.session.close)
+
+    def test_execute(self):
+        self.assertEqual(self.session.execute("echo hello", timeout=10), "hello")
+        self.assertEqual(self.session.execute("printf 'a\\nb'", timeout=10), "a\nb")
+
+    def test_close_reaps_process(self):
+        self.session.execute("true", timeout=10)
+        proc = self.session._proc
+        self.session.close()
+        # 进程已被回收，管道已关闭
+        self.assertIsNotNone(proc.returncode)
+        self.assertTrue(proc.stdout.closed)
+        self.assertTrue(proc.stdin.closed)
+        self.assertFalse(self.session.is_alive())
+        with self.assertRaises(ShellSessionError):
+            self.session.execute("true")
+
+
+if __name__ == "__main__":
+    unittest.main()
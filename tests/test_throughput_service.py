@@ -0,0 +1,80 @@
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.services.throughput_service import ThroughputSampler, WRAP_32, counter_delta
+
+
+def frame(uptime, wlan, uid=None):
+    """一轮设备端输出：wlan 为 (rx_bytes, rx_packets, tx_bytes, tx_packets)"""
+    rx_bytes, rx_packets, tx_bytes, tx_packets = wlan
+    lines = [f"@ {uptime}".encode(),
+             f"n wlan0 {rx_bytes} {rx_packets} 0 0 0 0 0 0 {tx_bytes} {tx_packets} 0 0 0 0 0 0".encode(),
+             b"n lo 999 9 0 0 0 0 0 0 999 9 0 0 0 0 0 0"]
+    if uid is not None:
+        lines.append(f"u wlan0 10123 {uid} 1 0 0".encode())
+        lines.append(f"u rmnet0 10123 {uid} 1 0 0".encode())
+    return lines + [b"."]
+
+
+class FakeStream:
+    def __init__(self, batches):
+        self.batches = batches
+        self.closed = False
+
+    def iter_batches(self, size):
+        yield from self.batches
+
+    def close(self):
+        self.closed = True
+
+
+class ThroughputSamplerTest(unittest.TestCase):
+    def run_sampler(self, batches, **kwargs):
+        samples = []
+        sampler = ThroughputSampler(on_sample=lambda ts, rates, uid_rates: samples.append((rates, uid_rates)),
+                                    **kwargs)
+        with mock.patch.object(ADBManager, "open_shell_stream", return_value=FakeStream(batches)):
+            sampler.start()
+            sampler._thread.join(2)
+        return sampler, samples
+
+    def test_rates(self):
+        sampler, samples = self.run_sampler(
+            [frame(100.0, (0, 0, 0, 0), uid=0), frame(102.0, (250000, 200, 50000, 100), uid=1000)], per_uid=True)
+        self.assertEqual(len(samples), 1)
+        rates, uid_rates = samples[0]
+        self.assertEqual(rates, {"wlan0": {"rx_kbps": 1000.0, "tx_kbps": 200.0, "rx_pps": 100.0, "tx_pps": 50.0}})
+        # 同一 UID 在多个网卡上的计数合并
+        self.assertEqual(uid_rates[10123]["rx_kbps"], 8.0)
+        self.assertEqual(sampler.interfaces(), ["wlan0"])
+        self.assertEqual(sampler.history.names(), ["wlan0.rx_kbps", "wlan0.rx_pps", "wlan0.tx_kbps", "wlan0.tx_pps"])
+
+    def test_partial_frame_is_dropped(self):
+        broken = frame(101.0, (100, 1, 100, 1))[:-1] + [b"n wlan0 garbage"]
+        _, samples = self.run_sampler([frame(100.0, (0, 0, 0, 0)), broken, frame(102.0, (1000, 10, 0, 0))])
+        self.assertEqual(samples[0][0]["wlan0"]["rx_pps"], 5.0)
+
+    def test_counter_delta(self):
+        self.assertEqual(counter_delta(10, 4), 6)
+        self.assertEqual(counter_delta(5, WRAP_32 - 5), 10)
+        self.assertIsNone(counter_delta(5, 1 << 40))
+        self.assertIsNone(counter_delta(0, WRAP_32 // 4))
+
+    @unittest.skipUnless(os.path.exists("/proc/net/dev"), "需要 /proc/net/dev")
+    def test_device_script_runs_in_sh(self):
+        sampler = ThroughputSampler(interval=0.1)
+        try:
+            output = subprocess.run(["sh", "-c", sampler.command()], capture_output=True, timeout=0.35).stdout
+        except subprocess.TimeoutExpired as e:
+            output = e.stdout or b""
+        lines = output.splitlines()
+        self.assertTrue(lines[0].startswith(b"@ "))
+        self.assertIn(b".", lines)
+        self.assertTrue(any(line.startswith(b"n lo ") for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from androidToolbox.services.timeseries import TimeSeries, TimeSeriesStore
+
+LEVELS = ((10, 100), (60, 100))
+
+
+class TimeSeriesTest(unittest.TestCase):
+    def setUp(self):
+        self.series = TimeSeries(levels=LEVELS, raw_capacity=1000)
+        for ts in range(120):
+            self.series.append(float(ts), float(ts))
+
+    def test_raw_when_points_fit(self):
+        points = self.series.query(max_points=600)
+        self.assertEqual(len(points), 120)
+        self.assertEqual(points[5], (5.0, 5.0, 5.0, 5.0))
+
+    def test_rollups(self):
+        points = self.series.query(max_points=20)
+        self.assertEqual(len(points), 12)
+        self.assertEqual(points[0], (0.0, 0.0, 9.0, 4.5))
+        self.assertEqual(points[-1], (110.0, 110.0, 119.0, 114.5))
+        self.assertEqual(self.series.query(max_points=5), [(0.0, 0.0, 59.0, 29.5), (60.0, 60.0, 119.0, 89.5)])
+
+    def test_time_range(self):
+        points = self.series.query(30, 59, max_points=5)
+        self.assertEqual([p[0] for p in points], [20.0, 30.0, 40.0, 50.0])
+
+    def test_out_of_order_sample_is_dropped(self):
+        self.series.append(50.0, 1000.0)
+        self.assertEqual(self.series.latest(), (119.0, 119.0))
+        self.assertEqual(max(p[2] for p in self.series.query(max_points=5)), 119.0)
+
+    def test_overwritten_raw_falls_back_to_rollup(self):
+        series = TimeSeries(levels=LEVELS, raw_capacity=50)
+        for ts in range(120):
+            series.append(float(ts), float(ts))
+        # 原始环只剩最近 50 个采样，查询更早的时间时改用汇总
+        self.assertEqual(series.query(0, 119, max_points=600)[0], (0.0, 0.0, 9.0, 4.5))
+        self.assertEqual(series.query(100, 119, max_points=600)[0][0], 100.0)
+
+
+class TimeSeriesStoreTest(unittest.TestCase):
+    def test_record_skips_none(self):
+        store = TimeSeriesStore(levels=LEVELS)
+        store.record({"rssi": -60, "mem": None}, ts=1.0)
+        self.assertEqual(store.names(), ["rssi"])
+        self.assertEqual(store.latest("rssi"), (1.0, -60.0))
+        self.assertEqual(store.query("missing"), [])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = TimeSeriesStore(directory, levels=LEVELS, raw_capacity=50)
+            for ts in range(120):
+                store.append("net/rssi", -ts, ts=float(ts))
+            store.close()
+            self.assertTrue(any(name.endswith(".ts") for name in os.listdir(directory)))
+            loaded = TimeSeriesStore(directory, levels=LEVELS, raw_capacity=50)
+            self.assertEqual(loaded.names(), ["net/rssi"])
+            for max_points in (600, 20, 5):
+                self.assertEqual(loaded.query("net/rssi", max_points=max_points),
+                                 store.query("net/rssi", max_points=max_points))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+logcat 抓取链路端到端基准：模拟 adb（tools/fake_adb.py）→ ADBManager.open_logcat → LogcatService
+（→ VirtualLogView，--tk 时）。
+
+报告持续吞吐（行/秒）、队列积压、端到端延迟分位数（日志时间戳 → 进入 LogStore / 显示到界面）、
+丢弃行数与 RSS 增长。--min-rate / --max-p99 / --max-dropped 任一不满足时以非零状态退出，
+可放进 CI 捕获抓取链路的性能回退。
+
+  python tools/bench_logcat.py --rate 20000 --duration 10
+  python tools/bench_logcat.py --rate 0 --policy drop_oldest --json
+  python tools/bench_logcat.py --rate 5000 --burst 5:1:10 --tk
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from androidToolbox.core.adb import ADBManager
+from androidToolbox.core.channel import BoundedChannel
+from androidToolbox.services.logcat_service import LogcatService
+
+FAKE_ADB = os.path.join(ROOT, "tools", "fake_adb.py")
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.1
+
+
+def rss_bytes():
+    """当前进程常驻内存；非 Linux 时退化为峰值 RSS"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def fake_adb_path():
+    """返回可执行的模拟 adb 路径（Windows 下生成一个 .bat 包装）"""
+    if os.name != 'nt':
+        return FAKE_ADB
+    wrapper = os.path.join(tempfile.gettempdir(), "androidToolbox_fake_adb.bat")
+    with open(wrapper, 'w') as f:
+        f.write(f'@"{sys.executable}" "{FAKE_ADB}" %*\n')
+    return wrapper
+
+
+class Sampler:
+    """周期性采样 LogcatService 的状态"""
+
+    def __init__(self, service):
+        self.service = service
+        self.latencies = []
+        self.depths = []
+        self.render_times = []
+
+    def sample(self, shown=None):
+        """shown 为界面当前显示的最后一条记录；无界面时取 LogStore 最新一条"""
+        store = self.service.store
+        record = shown if shown is not None else store.get(store.next_seq - 1)
+        if record is not None and record.ts:
+            self.latencies.append(time.time() - record.ts)
+        self.depths.append(self.service.queue_stats()["pending"])
+
+
+def run_headless(service, sampler, duration):
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        time.sleep(SAMPLE_INTERVAL)
+        sampler.sample()
+
+
+def run_tk(service, sampler, duration):
+    import tkinter as tk
+    from gui.widget.log_view import VirtualLogView
+
+    root = tk.Tk()
+    root.geometry("1000x700")
+    view = VirtualLogView(root, service.store)
+    view.pack(fill='both', expand=True)
+    deadline = time.monotonic() + duration
+
+    def tick():
+        if time.monotonic() >= deadline:
+            root.quit()
+            return
+        # 与 LogcatTab._ui_update_loop 相同的刷新方式
+        start = time.perf_counter()
+        view.refresh()
+        root.update_idletasks()
+        sampler.render_times.append(time.perf_counter() - start)
+        bottom = min(service.store.next_seq, view.top_seq + view.visible_rows())
+        sampler.sample(service.store.get(bottom - 1))
+        root.after(int(SAMPLE_INTERVAL * 1000), tick)
+
+    root.after(0, tick)
+    root.mainloop()
+    root.destroy()
+
+
+def run(args):
+    os.environ["FAKE_ADB_RATE"] = str(args.rate)
+    os.environ["FAKE_ADB_LEVELS"] = args.levels
+    os.environ["FAKE_ADB_BURST"] = args.burst or ""
+    os.environ["FAKE_ADB_DURATION"] = "0"
+    ADBManager.init(fake_adb_path())
+    # 模拟 adb 不是 adb server，统一走子进程路径
+    ADBManager.use_socket = False
+    ADBManager.use_session = False
+
+    service = LogcatService(memory_budget=args.memory_mb * 1024 * 1024,
+                            queue_lines=args.queue_lines, queue_policy=args.policy)
+    sampler = Sampler(service)
+    rss_start = rss_bytes()
+
+    service.start_capture()
+    # 预热：等到第一批日志入库再开始计时
+    warmup_deadline = time.monotonic() + 5
+    while len(service.store) == 0 and time.monotonic() < warmup_deadline:
+        time.sleep(0.01)
+    first_seq = service.store.next_seq
+    started = time.monotonic()
+    if args.tk:
+        run_tk(service, sampler, args.duration)
+    else:
+        run_headless(service, sampler, args.duration)
+    elapsed = time.monotonic() - started
+    ingested = service.store.next_seq - first_seq
+    rss_end = rss_bytes()
+    service.stop_capture()
+    stats = service.queue_stats()
+
+    report = {
+        "mode": "tk" if args.tk else "headless",
+        "target_rate": args.rate,
+        "burst": args.burst,
+        "policy": args.policy,
+        "duration": round(elapsed, 2),
+        "lines_per_sec": round(ingested / elapsed) if elapsed else 0,
+        "ingested": ingested,
+        "received": stats["received"],
+        "dropped": stats["dropped"],
+        "queue_depth_max": max(sampler.depths, default=0),
+        "queue_depth_avg": round(sum(sampler.depths) / len(sampler.depths)) if sampler.depths else 0,
+        "latency_ms": {p: round(percentile(sampler.latencies, p) * 1000, 1) for p in (50, 90, 99)},
+        "rss_start_mb": round(rss_start / 1048576, 1),
+        "rss_growth_mb": round((rss_end - rss_start) / 1048576, 1),
+    }
+    if sampler.render_times:
+        report["render_ms"] = {p: round(percentile(sampler.render_times, p) * 1000, 2) for p in (50, 99)}
+    return report
+
+
+def check(report, args):
+    """返回未通过的阈值说明列表"""
+    failures = []
+    if args.min_rate and report["lines_per_sec"] < args.min_rate:
+        failures.append(f"吞吐 {report['lines_per_sec']} < {args.min_rate} 行/秒")
+    if args.max_p99 and report["latency_ms"][99] > args.max_p99:
+        failures.append(f"p99 延迟 {report['latency_ms'][99]} > {args.max_p99} ms")
+    if args.max_dropped is not None and report["dropped"] > args.max_dropped:
+        failures.append(f"丢弃 {report['dropped']} > {args.max_dropped} 行")
+    return failures
+
+
+def print_report(report):
+    latency = report["latency_ms"]
+    print(f"模式            {report['mode']}  (策略 {report['policy']}, 目标 {report['target_rate'] or '不限'} 行/秒"
+          f"{', 突发 ' + report['burst'] if report['burst'] else ''})")
+    print(f"持续吞吐        {report['lines_per_sec']} 行/秒  ({report['ingested']} 行 / {report['duration']} 秒)")
+    print(f"接收 / 丢弃     {report['received']} / {report['dropped']}")
+    print(f"队列积压        最大 {report['queue_depth_max']}  平均 {report['queue_depth_avg']} 行")
+    print(f"端到端延迟      p50 {latency[50]} ms  p90 {latency[90]} ms  p99 {latency[99]} ms")
+    if "render_ms" in report:
+        print(f"界面刷新        p50 {report['render_ms'][50]} ms  p99 {report['render_ms'][99]} ms")
+    print(f"RSS             起始 {report['rss_start_mb']} MB  增长 {report['rss_growth_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="logcat 抓取链路端到端基准")
+    parser.add_argument("--rate", type=int, default=20000, help="模拟 adb 每秒行数，0 表示不限速")
+    parser.add_argument("--duration", type=float, default=10, help="测量时长（秒）")
+    parser.add_argument("--levels", default="V:10,D:30,I:40,W:15,E:5", help="级别权重")
+    parser.add_argument("--burst", default="", help="突发模式 周期:持续:倍数，如 5:1:10")
+    parser.add_argument("--policy", default=BoundedChannel.BLOCK, choices=BoundedChannel.POLICIES)
+    parser.add_argument("--queue-lines", type=int, default=200000)
+    parser.add_argument("--memory-mb", type=int, default=64, help="LogStore 内存预算")
+    parser.add_argument("--tk", action="store_true", help="同时驱动 VirtualLogView 渲染（需要图形环境）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--min-rate", type=int, default=0, help="吞吐低于该值时失败")
+    parser.add_argument("--max-p99", type=float, default=0, help="p99 延迟（毫秒）高于该值时失败")
+    parser.add_argument("--max-dropped", type=int, default=None, help="丢弃行数高于该值时失败")
+    args = parser.parse_args()
+
+    report = run(args)
+    failures = check(report, args)
+    if args.json:
+        report["failures"] = failures
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report)
+        for failure in failures:
+            print(f"未通过: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+模拟 adb 可执行文件，用于在没有真机的情况下压测 logcat 抓取链路。
+
+支持的子命令：devices、start-server / kill-server、shell（无参数时进入交互 sh）、
+exec-out、logcat；logcat 按以下环境变量生成 -v time 格式的日志：
+
+  FAKE_ADB_RATE      每秒行数，0 表示不限速（默认 5000）
+  FAKE_ADB_LEVELS    级别权重，如 "V:10,D:30,I:40,W:15,E:5"
+  FAKE_ADB_BURST     突发模式 "周期秒:持续秒:倍数"，如 "5:1:10" 表示每 5 秒中有 1 秒速率 ×10
+  FAKE_ADB_DURATION  输出持续秒数，0 表示直到被关闭
+  FAKE_ADB_SERIAL    devices 中报告的序列号（默认 emulator-5554）
+  FAKE_ADB_SEED      日志内容的随机种子（默认 1）
+
+--install-assets / --uninstall-assets 在 androidToolbox/assets/ 下放置或删除指向本脚本的 adb 启动器，
+ADBManager.init 会优先使用 assets 下的 adb（仅限类 Unix 系统）。
+"""
+import os
+import random
+import subprocess
+import sys
+import time
+
+LAUNCHER_MARK = "# fake-adb launcher"
+ASSETS_ADB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "androidToolbox", "assets", "adb")
+
+TAGS = [
+    ("ActivityManager", 1021), ("WindowManager", 1021), ("PackageManager", 1021),
+    ("InputDispatcher", 1021), ("SurfaceFlinger", 512), ("chatty", 1021),
+    ("wpa_supplicant", 874), ("ConnectivityService", 1021), ("NetworkMonitor", 1890),
+    ("BluetoothAdapter", 2210), ("AudioFlinger", 633), ("CameraService", 702),
+    ("OkHttp", 4312), ("MainActivity", 4312), ("RecyclerView", 4312), ("GC", 4312),
+]
+MESSAGES = [
+    "Start proc {n}:com.example.app/u0a{n} for activity",
+    "Displayed com.example.app/.MainActivity: +{n}ms",
+    "Background concurrent copying GC freed {n}(2MB) AllocSpace objects",
+    "uid={n} identical 12 lines",
+    "Skipped {n} frames!  The application may be doing too much work on its main thread.",
+    "--> GET https://api.example.com/v1/items?page={n}",
+    "<-- 200 OK https://api.example.com/v1/items ({n}ms)",
+    "wlan0: CTRL-EVENT-SIGNAL-CHANGE above=1 signal=-{n} noise=9999 txrate=72200",
+    "NetworkAgentInfo [WIFI () - {n}] validation passed",
+    "Input event injection from pid {n} failed",
+    "setRequestedOrientation {n} for ActivityRecord",
+    "onLayout took {n} ms",
+]
+# 预生成的行主体（时间戳之后的部分），避免生成端成为瓶颈
+BODY_POOL = 4096
+
+
+def parse_levels(text):
+    weights = {}
+    for item in (text or "V:10,D:30,I:40,W:15,E:5").split(","):
+        level, _, weight = item.partition(":")
+        if level and weight:
+            weights[level.strip().upper()[:1]] = float(weight)
+    return weights
+
+
+def parse_burst(text):
+    """'周期:持续:倍数' -> (period, length, factor)，未设置时返回 None"""
+    if not text:
+        return None
+    period, length, factor = (float(v) for v in text.split(":"))
+    return period, length, factor
+
+
+def build_bodies(weights, rnd):
+    levels = list(weights)
+    bodies = []
+    for _ in range(BODY_POOL):
+        level = rnd.choices(levels, [weights[lv] for lv in levels])[0]
+        tag, pid = rnd.choice(TAGS)
+        message = rnd.choice(MESSAGES).format(n=rnd.randint(1, 99999))
+        bodies.append(f" {level}/{tag}({pid:5d}): {message}\n".encode('utf-8'))
+    return bodies
+
+
+def stream_logcat(out, env=os.environ):
+    rate = float(env.get("FAKE_ADB_RATE", "5000"))
+    burst = parse_burst(env.get("FAKE_ADB_BURST"))
+    duration = float(env.get("FAKE_ADB_DURATION", "0"))
+    rnd = random.Random(int(env.get("FAKE_ADB_SEED", "1")))
+    bodies = build_bodies(parse_levels(env.get("FAKE_ADB_LEVELS")), rnd)
+
+    tick = 0.01
+    start = last = time.time()
+    due = 0.0
+    index = 0
+    while True:
+        now = time.time()
+        elapsed = now - start
+        if duration and elapsed >= duration:
+            break
+        if rate > 0:
+            current = rate
+            if burst and elapsed % burst[0] < burst[1]:
+                current *= burst[2]
+            # 按实际经过的时间累计应发行数，sleep 误差不影响平均速率
+            due += current * (now - last)
+            count = int(due)
+            due -= count
+        else:
+            count = 2000
+        last = now
+        if count:
+            # 同一 tick 内的行共用一个毫秒时间戳
+            stamp = time.strftime("%m-%d %H:%M:%S", time.localtime(now)).encode('ascii') \
+                + b".%03d" % int(now % 1 * 1000)
+            chunk = []
+            for _ in range(count):
+                chunk.append(stamp)
+                chunk.append(bodies[index])
+                index = (index + 1) % BODY_POOL
+            out.write(b"".join(chunk))
+            out.flush()
+        if rate > 0:
+            delay = now + tick - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def run_shell(args):
+    """shell / exec-out：logcat 走生成器，其余命令交给本机 sh 执行"""
+    if not args:
+        os.execvp("sh", ["sh"])
+    command = " ".join(args)
+    if command.split()[0] == "logcat":
+        return run_logcat(command.split()[1:])
+    return subprocess.call(["sh", "-c", command])
+
+
+def run_logcat(args):
+    if "-c" in args:
+        return 0
+    try:
+        stream_logcat(sys.stdout.buffer)
+    except (BrokenPipeError, KeyboardInterrupt):
+        # 读取端关闭：静默退出（重定向 stdout，避免解释器退出时再次刷新报错）
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+def install():
+    if os.name == 'nt':
+        print("Windows 下 ADBManager 查找 adb.exe，请改用 ANDROIDTOOLBOX_ADB 环境变量指定启动脚本")
+        return 1
+    if os.path.exists(ASSETS_ADB) and not _is_launcher(ASSETS_ADB):
+        print(f"{ASSETS_ADB} 已存在且不是模拟 adb，未覆盖")
+        return 1
+    os.makedirs(os.path.dirname(ASSETS_ADB), exist_ok=True)
+    with open(ASSETS_ADB, 'w') as f:
+        f.write(f'#!/bin/sh\n{LAUNCHER_MARK}\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(ASSETS_ADB, 0o755)
+    print(f"已安装: {ASSETS_ADB}")
+    return 0
+
+
+def uninstall():
+    if os.path.exists(ASSETS_ADB) and _is_launcher(ASSETS_ADB):
+        os.remove(ASSETS_ADB)
+        print(f"已移除: {ASSETS_ADB}")
+    return 0
+
+
+def _is_launcher(path):
+    try:
+        with open(path, 'r', errors='ignore') as f:
+            return LAUNCHER_MARK in f.read(256)
+    except OSError:
+        return False
+
+
+def main(argv):
+    # 跳过 -s <serial> / -P <port> 等全局选项
+    while len(argv) >= 2 and argv[0] in ("-s", "-P", "-H", "-t"):
+        argv = argv[2:]
+    if not argv:
+        print("usage: fake_adb.py [-s serial] devices|shell|exec-out|logcat|--install-assets|--uninstall-assets ...")
+        return 1
+    command, args = argv[0], argv[1:]
+    if command == "devices":
+        serial = os.environ.get("FAKE_ADB_SERIAL", "emulator-5554")
+        sys.stdout.write(f"List of devices attached\n{serial}\tdevice\n\n")
+        return 0
+    if command in ("start-server", "kill-server", "wait-for-device"):
+        return 0
+    if command in ("shell", "exec-out"):
+        return run_shell(args)
+    if command == "logcat":
+        return run_logcat(args)
+    if command == "--install-assets":
+        return install()
+    if command == "--uninstall-assets":
+        return uninstall()
+    sys.stderr.write(f"fake adb: unsupported command {command}\n")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))